@@ -1,105 +1,112 @@
+import argparse
 import asyncio
-import sys
 import time
 from collections import Counter
+from functools import partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable
 from uuid import UUID
 
 from prefect.client.orchestration import get_client
-from prefect.client.schemas.filters import TaskRunFilter, TaskRunFilterId
 from prefect.states import StateType
 
-from . import chaos, tasks
+from . import chaos
+from .lifecycle import STAGES, Lifecycle
+from .report import build_report, write_report
+from .results import ResultVerifier
+from .stats import format_histogram, format_summary
+from .submission import (
+    MODES,
+    Submission,
+    SubmissionStats,
+    TokenBucket,
+    submit_concurrently,
+    submit_in_processes,
+    submit_serially,
+)
+from .supervisor import WorkerSupervisor
+from .tracking import CompletionTracker
 
-FINAL_STATES = {StateType.COMPLETED, StateType.FAILED, StateType.CRASHED}
+Submitter = Callable[[Iterable[int], Callable[[Submission], None]], Awaitable[None]]
 
 
-async def main(iterations: int):
+async def main(
+    iterations: int, submit: Submitter, result_workers: int, config: dict[str, Any]
+) -> dict[str, Any]:
+    async with (
+        get_client() as client,
+        CompletionTracker(client) as tracker,
+        ResultVerifier(client, result_workers) as verifier,
+    ):
+        return await run_chaos(iterations, submit, tracker, verifier, config)
+
+
+async def run_chaos(
+    iterations: int,
+    submit: Submitter,
+    tracker: CompletionTracker,
+    verifier: ResultVerifier,
+    config: dict[str, Any],
+) -> dict[str, Any]:
+    chaos.scoreboard.clear()
     havoc = asyncio.create_task(chaos.wreak_havoc())
 
     start = time.monotonic()
 
-    submission_failures = 0
-
+    stats = SubmissionStats()
     task_runs: dict[UUID, int] = {}
-    for i in range(iterations):
-        await asyncio.sleep(0)
-        try:
-            future = tasks.ping.delay(i)
-        except Exception as exc:
-            print(f"Failed to submit task run {i}: {exc}")
-            submission_failures += 1
-            continue
-        if (i + 1) % 10 == 0:
-            if i == iterations - 1:
-                submission_duration = time.monotonic() - start
-                print(
-                    "Submitted run", i + 1, "tasks in", submission_duration, "seconds"
-                )
-            else:
-                print("Submitted run", i + 1, "tasks")
-
-        task_runs[future.task_run_id] = i
-
-    submission_duration = time.monotonic() - start
-
-    if iterations % 10 != 0:
-        print("Submitted", iterations, "tasks in", submission_duration, "seconds")
+
+    def on_submitted(submission: Submission) -> None:
+        stats.record(submission)
+        if not submission.task_run_id:
+            print(
+                f"Failed to submit task run {submission.sequence}: {submission.error}"
+            )
+            return
+
+        task_runs[submission.task_run_id] = submission.sequence
+        tracker.expect(submission.task_run_id)
+        if len(stats.latencies) % 10 == 0:
+            print("Submitted run", len(stats.latencies), "tasks")
+
+    await submit(range(iterations), on_submitted)
+
+    # Submission is timed from the first one, so that starting any submitter
+    # processes doesn't count against the rate
+    submission_duration = (
+        time.time() - stats.started if stats.started else time.monotonic() - start
+    )
+    print("Submitted", iterations, "tasks in", submission_duration, "seconds")
 
     task_results: Counter[tuple[StateType, str]] = Counter()
-    observed_retries: Counter[UUID] = Counter()
-    polling_failures, result_failures = 0, 0
-
-    async with get_client() as client:
-        while task_runs:
-            await asyncio.sleep(1)
-
-            try:
-                runs = await client.read_task_runs(
-                    task_run_filter=TaskRunFilter(
-                        id=TaskRunFilterId(
-                            any_=[id for id in task_runs.keys()],
-                        )
-                    )
-                )
-            except Exception as exc:
-                print(f"Failed to poll task runs: {exc}")
-                polling_failures += 1
-                continue
-
-            summary: Counter[tuple[StateType, str]] = Counter(
-                (run.state.type, run.state.name) for run in runs
+    stages: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    last_report = 0.0
+
+    async for runs in tracker.finished():
+        for run in runs:
+            sequence = task_runs.pop(run.id)
+
+            if run.state.type == StateType.COMPLETED:
+                verifier.verify(run, sequence)
+
+            task_results[(run.state.type, run.state.name)] += 1
+            lifecycle = Lifecycle.of(run, tracker.history.pop(run.id, []))
+            for stage, seconds in lifecycle.stages().items():
+                stages[stage].append(seconds)
+
+        if task_runs and time.monotonic() - last_report >= 1:
+            last_report = time.monotonic()
+            summary_report = ", ".join(
+                f"{count} {type.value}:{name}"
+                for (type, name), count in sorted(tracker.summary.items())
             )
+            print(f"{len(task_runs)} task runs remaining, {summary_report}")
 
-            for run in runs:
-                sequence = task_runs[run.id]
-
-                if "Retry" in run.state.name:
-                    observed_retries[run.id] += 1
-
-                if run.state.type == StateType.COMPLETED:
-                    result = run.state.result()
-                    try:
-                        reply, result_sequence = await result.get()
-                    except Exception as exc:
-                        print(f"Failed to fetch result for task run {sequence}: {exc}")
-                        result_failures += 1
-                        continue
-
-                    assert (
-                        sequence == result_sequence
-                    ), f"Expected {sequence}, got {result_sequence}"
-                    assert reply == "pong", f"Expected 'pong', got {reply}"
-
-                if run.state.type in FINAL_STATES:
-                    task_results[(run.state.type, run.state.name)] += 1
-                    del task_runs[run.id]
-
-            if task_runs:
-                summary_report = ", ".join(
-                    f"{count} {type.value}:{name}"
-                    for (type, name), count in sorted(summary.items())
-                )
-                print(f"{len(task_runs)} task runs remaining, {summary_report}")
+    tracked = time.monotonic()
+    if verifier.pending:
+        print("Waiting for", verifier.pending, "results to be verified")
+    await verifier.join()
+    verification_tail = time.monotonic() - tracked
 
     duration = time.monotonic() - start
 
@@ -107,11 +114,21 @@ async def main(iterations: int):
     for agent in sorted(chaos.scoreboard, key=chaos.scoreboard.get, reverse=True):
         count = chaos.scoreboard[agent]
         print(f"  {agent.__name__}: {count}")
-    print("Submission failures:", submission_failures)
-    print("Polling failures:", polling_failures)
-    print("Tasks that retried:", len(observed_retries))
+    print("Submission failures:", stats.failures)
+    print("Read failures:", tracker.read_failures)
+    print("Result failures:", verifier.fetch_failures)
+    print("Result mismatches:", verifier.mismatches)
+    print("Reconciliations:", tracker.reconciliations)
+    print("Tasks that retried:", len(tracker.retried))
     print("Task results:", task_results)
     print("Submission rate:", iterations / submission_duration, "tasks per second")
+    print("Submission latency:", format_summary(stats.latencies))
+    print("Result fetch latency:", format_summary(verifier.fetch_latencies))
+    print("Results verified after tracking:", verification_tail, "seconds")
+    for stage, seconds in stages.items():
+        print(f"Task run {stage.replace('_', ' ')}:", format_summary(seconds))
+        for line in format_histogram(seconds):
+            print(line)
     print("Total rate:", iterations / duration, "tasks per second")
 
     havoc.cancel()
@@ -120,6 +137,168 @@ async def main(iterations: int):
     except asyncio.CancelledError:
         pass
 
+    finals: Counter[StateType] = Counter()
+    for (type, _), count in task_results.items():
+        finals[type] += count
+    return build_report(
+        config,
+        {
+            "iterations": iterations,
+            "duration_s": duration,
+            "chaos_events": sum(chaos.scoreboard.values()),
+            "submission_failures": stats.failures,
+            "read_failures": tracker.read_failures,
+            "result_failures": verifier.fetch_failures,
+            "result_mismatches": verifier.mismatches,
+            "reconciliations": tracker.reconciliations,
+            "retried": len(tracker.retried),
+            "completed": finals[StateType.COMPLETED],
+            "failed": finals[StateType.FAILED],
+            "crashed": finals[StateType.CRASHED],
+            "submission_rate": iterations / submission_duration,
+            "total_rate": iterations / duration,
+        },
+        {
+            "submission": stats.latencies,
+            "result_fetch": verifier.fetch_latencies,
+            **stages,
+        },
+    )
+
+
+async def run(
+    args: argparse.Namespace, config: dict[str, Any], workers: int
+) -> dict[str, Any]:
+    """Runs the duck once, with `workers` task workers of its own, or with none,
+    against the task workers that are already running, like the `tasks` service."""
+    if not workers:
+        return await main(args.iterations, submitter(args), args.result_workers, config)
+
+    config = {**config, "local_workers": workers}
+    async with WorkerSupervisor(workers, log_dir=args.worker_logs) as supervisor:
+        report = await main(
+            args.iterations, submitter(args), args.result_workers, config
+        )
+    report["summary"]["worker_restarts"] = supervisor.restarts
+    return report
+
+
+async def sweep(args: argparse.Namespace, config: dict[str, Any]) -> list[dict]:
+    """Runs the duck with 1, 2, 4, ... and finally `args.sweep` task workers of its
+    own, and reports how its throughput scaled."""
+    counts = [1 << power for power in range(args.sweep.bit_length())]
+    if counts[-1] != args.sweep:
+        counts.append(args.sweep)
+
+    reports = []
+    for workers in counts:
+        print(f"🦆 Running with {workers} task workers")
+        reports.append(await run(args, config, workers))
+
+    base_workers = counts[0]
+    base_rate = reports[0]["summary"]["total_rate"]
+    print(f"{'Workers':>7} {'Total rate':>10} {'Speedup':>7} {'Efficiency':>10} p95")
+    for workers, report in zip(counts, reports):
+        rate = report["summary"]["total_rate"]
+        speedup = rate / base_rate
+        efficiency = speedup / (workers / base_workers)
+        p95 = report["latency"]["end_to_end"].get("p95_ms", 0)
+        print(
+            f"{workers:>7} {rate:>10.2f} {speedup:>6.2f}x {efficiency:>10.0%} "
+            f"{p95:.0f}ms"
+        )
+    return reports
+
+
+def submitter(args: argparse.Namespace) -> Submitter:
+    if args.mode == "serial":
+        return submit_serially
+    if args.mode == "concurrent":
+        return partial(submit_concurrently, concurrency=args.concurrency)
+    if args.mode == "rate":
+        return partial(
+            submit_concurrently,
+            concurrency=args.concurrency,
+            bucket=TokenBucket(args.rate, args.burst),
+        )
+    return partial(
+        submit_in_processes, processes=args.processes, concurrency=args.concurrency
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m chaos_duck")
+    parser.add_argument("iterations", type=int, nargs="?", default=100)
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default="serial",
+        help="how to submit task runs: one at a time, --concurrency at once, at "
+        "--rate per second, or from --processes processes",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="task runs to submit at once (per process, with --mode processes)",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=50, help="task runs per second to submit"
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=1,
+        help="task runs that may be submitted at once at --rate, after a lull",
+    )
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument(
+        "--result-workers",
+        type=int,
+        default=16,
+        help="results of completed task runs to fetch and verify at once",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        help="where to write a report of the run, as JSON, or as CSV if it ends in "
+        ".csv, to compare with `python -m chaos_duck.compare`",
+    )
+    parser.add_argument(
+        "--local-workers",
+        type=int,
+        default=0,
+        help="task workers to run and supervise here, without Docker, rather than "
+        "using the ones already running",
+    )
+    parser.add_argument(
+        "--sweep",
+        type=int,
+        metavar="MAX_WORKERS",
+        help="run with 1, 2, 4, ... up to this many local task workers, and report "
+        "how throughput scales",
+    )
+    parser.add_argument(
+        "--worker-logs", type=Path, help="a directory for the local task workers' logs"
+    )
+    args = parser.parse_args()
+
+    print("Submitting", args.iterations, "tasks with mode", args.mode)
+    config = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("report", "worker_logs")
+    }
+    if args.sweep:
+        reports = asyncio.run(sweep(args, config))
+    else:
+        reports = [asyncio.run(run(args, config, args.local_workers))]
 
-iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100
-asyncio.run(main(iterations))
+    if args.report:
+        for report in reports:
+            path = args.report
+            if args.sweep:
+                workers = report["config"]["local_workers"]
+                path = path.with_stem(f"{path.stem}-{workers}-workers")
+            write_report(report, path)
+            print("Wrote the report to", path)
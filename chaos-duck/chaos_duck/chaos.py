@@ -3,8 +3,10 @@ import random
 from collections import defaultdict
 
 import docker
+from docker.errors import DockerException
 from docker.models.containers import Container
 
+from . import supervisor
 from .tasks import crash_me
 
 agents_of_chaos = []
@@ -35,9 +37,23 @@ async def send_a_crash_me_task():
     await crash_me.delay(42).wait_async()
 
 
+def docker_client() -> docker.DockerClient | None:
+    try:
+        return docker.DockerClient()
+    except DockerException as exc:
+        print(f"🦆 Can't reach Docker: {exc}")
+        return None
+
+
 @agent_of_chaos(probability=0.1)
 async def kill_a_task_worker():
-    client = docker.DockerClient()
+    if supervisor.active:
+        if (worker := supervisor.active.kill()) is not None:
+            print(f"🦆 Killing task worker {worker}")
+        return
+
+    if not (client := docker_client()):
+        return
 
     containers: list[Container] = client.containers.list()
     containers = [c for c in client.containers.list() if "chaos-duck-tasks" in c.name]
@@ -51,7 +67,8 @@ async def kill_a_task_worker():
 
 @agent_of_chaos(probability=0.05)
 async def hard_restart_the_prefect_server():
-    client = docker.DockerClient()
+    if not (client := docker_client()):
+        return
 
     containers: list[Container] = client.containers.list()
     containers = [c for c in client.containers.list() if "chaos-duck-prefect" in c.name]
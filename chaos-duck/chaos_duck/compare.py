@@ -0,0 +1,98 @@
+"""Compares two reports written by `python -m chaos_duck --report`, and flags the
+metrics that regressed by more than --threshold from the baseline:
+
+    python -m chaos_duck.compare baseline.json candidate.json
+
+Exits with status 1 if any did, so it can gate a regression suite.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from .report import CHAOS_COUNTS, direction, read_report
+
+
+def compare(
+    baseline: dict[str, object],
+    candidate: dict[str, object],
+    threshold: float,
+    min_ms: float,
+    min_count: float,
+) -> list[str]:
+    """Prints how each compared metric changed, and returns those that regressed."""
+    regressions = []
+    for metric in sorted(baseline.keys() & candidate.keys()):
+        better = direction(metric)
+        old, new = baseline[metric], candidate[metric]
+        if not better or not all(isinstance(v, (int, float)) for v in (old, new)):
+            continue
+
+        change = (new - old) / old if old else (float("inf") if new else 0.0)
+        worse = change * -better > threshold
+        if metric.endswith("_ms") and abs(new - old) < min_ms:
+            # too small a difference to be more than noise
+            worse = False
+        if metric.endswith(CHAOS_COUNTS) and abs(new - old) < min_count:
+            # the agents of chaos don't wreak the same havoc on every run
+            worse = False
+
+        flag = "REGRESSED" if worse else ""
+        print(f"{metric:<40} {old:>12.2f} {new:>12.2f} {change:>+9.1%} {flag}")
+        if worse:
+            regressions.append(metric)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m chaos_duck.compare", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="the relative change past which a metric has regressed",
+    )
+    parser.add_argument(
+        "--min-ms",
+        type=float,
+        default=5,
+        help="latency changes smaller than this many milliseconds are ignored",
+    )
+    parser.add_argument(
+        "--min-count",
+        type=float,
+        default=10,
+        help="changes in failure counts smaller than this are ignored, since they "
+        "depend on the chaos in each run",
+    )
+    args = parser.parse_args()
+
+    baseline = read_report(args.baseline)
+    candidate = read_report(args.candidate)
+    differing = [
+        key
+        for key in sorted(baseline.keys() | candidate.keys())
+        if key.startswith("config.") and baseline.get(key) != candidate.get(key)
+    ]
+    for key in differing:
+        print(
+            f"Warning: {key} differs: {baseline.get(key)} vs {candidate.get(key)}",
+            file=sys.stderr,
+        )
+
+    print(f"{'metric':<40} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    regressions = compare(
+        baseline, candidate, args.threshold, args.min_ms, args.min_count
+    )
+    if regressions:
+        print(len(regressions), "metrics regressed:", ", ".join(regressions))
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from prefect.client.schemas.objects import TaskRun
+from prefect.states import StateType
+
+from .tracking import FINAL_STATES, Transition
+
+STAGES = ["queue_wait", "execution", "retry_overhead", "end_to_end"]
+
+
+@dataclass
+class Lifecycle:
+    """When a task run was scheduled, each time it started running, and when it
+    finished, from the state changes seen for it.  Any of those that were missed,
+    like while the event subscription was reconnecting, are taken from the task
+    run's own timestamps instead.
+
+    The stages are, in seconds:
+
+    - queue_wait: from being scheduled until first running
+    - execution: from last starting to run until finishing
+    - retry_overhead: from first running until last starting to run, including any
+      time spent waiting to retry (only for task runs that retried)
+    - end_to_end: from being scheduled until finishing
+    """
+
+    scheduled: datetime | None
+    pending: datetime | None
+    running: list[datetime]
+    finished: datetime | None
+    final_state: str
+
+    @classmethod
+    def of(cls, run: TaskRun, history: list[Transition]) -> "Lifecycle":
+        history = sorted(history, key=lambda transition: transition.occurred)
+        scheduled = next(
+            (t.occurred for t in history if t.name == "Scheduled"), run.created
+        )
+        pending = next((t.occurred for t in history if t.name == "Pending"), None)
+        running = [t.occurred for t in history if t.type == StateType.RUNNING]
+        if not running and run.start_time:
+            running = [run.start_time]
+        finished = next(
+            (t.occurred for t in history if t.type in FINAL_STATES), run.end_time
+        )
+        return cls(scheduled, pending, running, finished, run.state.name)
+
+    @property
+    def retries(self) -> int:
+        return max(len(self.running) - 1, 0)
+
+    def stages(self) -> dict[str, float]:
+        """The duration of each stage that's known, in seconds."""
+        first_run = self.running[0] if self.running else None
+        last_run = self.running[-1] if self.running else None
+        stages = {
+            "queue_wait": _between(self.scheduled, first_run),
+            "execution": _between(last_run, self.finished),
+            "retry_overhead": _between(first_run, last_run) if self.retries else None,
+            "end_to_end": _between(self.scheduled, self.finished),
+        }
+        return {
+            stage: seconds for stage, seconds in stages.items() if seconds is not None
+        }
+
+
+def _between(start: datetime | None, end: datetime | None) -> float | None:
+    if not start or not end:
+        return None
+    return (end - start).total_seconds()
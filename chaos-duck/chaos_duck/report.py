@@ -0,0 +1,83 @@
+import csv
+import json
+from pathlib import Path
+from typing import Any
+
+from .stats import histogram, summarize
+
+# Which way each kind of metric should move, for `compare`
+HIGHER_IS_BETTER = ("_rate",)
+LOWER_IS_BETTER = ("_ms", "_failures", "_mismatches", ".failed", ".crashed")
+# Counts that depend on how much chaos a run happened to wreak
+CHAOS_COUNTS = ("_failures", ".failed", ".crashed")
+
+
+def build_report(
+    config: dict[str, Any], summary: dict[str, float], latencies: dict[str, list[float]]
+) -> dict[str, Any]:
+    """A report of one run of the duck: how it was run, its counts and rates, and
+    the percentiles and histogram of each of its latencies, given in seconds."""
+    return {
+        "config": config,
+        "summary": summary,
+        "latency": {
+            name: {**summarize(seconds), "histogram": histogram(seconds)}
+            for name, seconds in latencies.items()
+        },
+    }
+
+
+def flatten(report: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    """Flattens a report into `section.name.metric` keys, as they're written to CSV."""
+    flat: dict[str, Any] = {}
+    for key, value in report.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def write_report(report: dict[str, Any], path: Path) -> None:
+    """Writes the report as JSON, or as a CSV of metric,value rows if the path ends
+    in `.csv`."""
+    with path.open("w", newline="") as f:
+        if path.suffix == ".csv":
+            writer = csv.writer(f)
+            writer.writerow(["metric", "value"])
+            writer.writerows(flatten(report).items())
+        else:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+
+def read_report(path: Path) -> dict[str, Any]:
+    """Reads a report written by `write_report`, flattened."""
+    with path.open(newline="") as f:
+        if path.suffix != ".csv":
+            return flatten(json.load(f))
+        return {row["metric"]: _number(row["value"]) for row in csv.DictReader(f)}
+
+
+def direction(metric: str) -> int:
+    """1 if the metric is better higher, -1 if it's better lower, or 0 if it isn't
+    compared."""
+    if ".histogram." in metric or metric.startswith("config."):
+        return 0
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def _number(value: str) -> Any:
+    if not value:
+        # as `None` is written
+        return None
+    for kind in (int, float):
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    return value
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from prefect.client.orchestration import PrefectClient
+from prefect.client.schemas.objects import TaskRun
+
+
+class ResultVerifier:
+    """Fetches the results of completed task runs from result storage and checks that
+    each replied `("pong", sequence)`, with up to `workers` fetches at a time, while
+    the remaining task runs are still being tracked.
+
+    How long each fetch took, and how many failed or didn't match, are kept apart
+    from how long the task runs themselves took, so a slow result storage doesn't
+    look like slow task runs.
+    """
+
+    def __init__(self, client: PrefectClient, workers: int = 16):
+        self.client = client
+        self.workers = workers
+
+        self.fetch_latencies: list[float] = []
+        self.fetch_failures = 0
+        self.mismatches = 0
+        self.verified = 0
+
+        self._queue: asyncio.Queue[tuple[TaskRun, int]] = asyncio.Queue()
+        self._workers: list[asyncio.Task[None]] = []
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def verify(self, run: TaskRun, sequence: int) -> None:
+        self._queue.put_nowait((run, sequence))
+
+    async def join(self) -> None:
+        """Waits until every result queued so far has been verified."""
+        await self._queue.join()
+
+    async def __aenter__(self) -> "ResultVerifier":
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self) -> None:
+        while True:
+            run, sequence = await self._queue.get()
+            try:
+                await self._verify(run, sequence)
+            finally:
+                self._queue.task_done()
+
+    async def _verify(self, run: TaskRun, sequence: int) -> None:
+        start = time.perf_counter()
+        try:
+            reply, result_sequence = await run.state.result().get(client=self.client)
+        except Exception as exc:
+            print(f"Failed to fetch result for task run {sequence}: {exc}")
+            self.fetch_failures += 1
+            return
+        finally:
+            self.fetch_latencies.append(time.perf_counter() - start)
+
+        if (reply, result_sequence) != ("pong", sequence):
+            print(
+                f"Expected ('pong', {sequence}) from task run {run.id}, "
+                f"got {(reply, result_sequence)}"
+            )
+            self.mismatches += 1
+            return
+
+        self.verified += 1
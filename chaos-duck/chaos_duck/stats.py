@@ -0,0 +1,58 @@
+import statistics
+
+PERCENTILES = (50, 95, 99)
+
+# Upper bounds of the histogram buckets, in milliseconds
+BUCKETS = [
+    bound * scale
+    for scale in (1, 10, 100, 1000, 10_000, 100_000)
+    for bound in (1, 2, 5)
+]
+
+
+def summarize(seconds: list[float]) -> dict[str, float]:
+    """The count, percentiles and max of durations in seconds, in milliseconds."""
+    if not seconds:
+        return {"count": 0}
+    ms = sorted(1000 * s for s in seconds)
+    cuts = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else []
+    summary: dict[str, float] = {"count": len(ms)}
+    for p in PERCENTILES:
+        summary[f"p{p}_ms"] = cuts[p - 1] if cuts else ms[0]
+    summary["max_ms"] = ms[-1]
+    return summary
+
+
+def histogram(seconds: list[float]) -> dict[str, int]:
+    """How many of the durations in seconds fall into each bucket, by upper bound."""
+    counts = {f"le_{bound}ms": 0 for bound in BUCKETS}
+    counts[f"gt_{BUCKETS[-1]}ms"] = 0
+    for s in seconds:
+        ms = 1000 * s
+        bucket = next((f"le_{bound}ms" for bound in BUCKETS if ms <= bound), None)
+        counts[bucket or f"gt_{BUCKETS[-1]}ms"] += 1
+    return counts
+
+
+def format_summary(seconds: list[float]) -> str:
+    summary = summarize(seconds)
+    if not summary["count"]:
+        return "none"
+    return ", ".join(
+        f"{key.removesuffix('_ms')} {value:.1f}ms"
+        for key, value in summary.items()
+        if key != "count"
+    )
+
+
+def format_histogram(seconds: list[float], width: int = 40) -> list[str]:
+    """Renders the non-empty span of a histogram as lines of bars."""
+    counts = list(histogram(seconds).items())
+    filled = [i for i, (_, count) in enumerate(counts) if count]
+    if not filled:
+        return []
+    most = max(count for _, count in counts)
+    return [
+        f"  {bucket:>12} {count:>6} {'#' * round(width * count / most)}"
+        for bucket, count in counts[filled[0] : filled[-1] + 1]
+    ]
@@ -0,0 +1,177 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+from uuid import UUID
+
+from prefect.client.orchestration import PrefectClient, get_client
+from prefect.utilities.engine import emit_task_run_state_change_event
+
+from . import tasks
+
+MODES = ["serial", "concurrent", "rate", "processes"]
+
+
+@dataclass
+class Submission:
+    sequence: int
+    task_run_id: UUID | None
+    latency: float
+    error: str | None = None
+    # When it started by the wall clock, which submitter processes share
+    started: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.started = time.time() - self.latency
+
+
+def submit_one(sequence: int) -> Submission:
+    start = time.perf_counter()
+    try:
+        future = tasks.ping.delay(sequence)
+    except Exception as exc:
+        return Submission(sequence, None, time.perf_counter() - start, str(exc))
+    return Submission(sequence, future.task_run_id, time.perf_counter() - start)
+
+
+async def submit_deferred(client: PrefectClient, sequence: int) -> Submission:
+    """Submits a task run the way `delay` does, but without blocking the event loop,
+    since `delay` can't be called from more than one thread at once."""
+    start = time.perf_counter()
+    try:
+        task_run = await tasks.ping.create_run(
+            client=client, parameters={"sequence": sequence}, deferred=True
+        )
+    except Exception as exc:
+        return Submission(sequence, None, time.perf_counter() - start, str(exc))
+    emit_task_run_state_change_event(
+        task_run=task_run, initial_state=None, validated_state=task_run.state
+    )
+    return Submission(sequence, task_run.id, time.perf_counter() - start)
+
+
+class TokenBucket:
+    """Lets `rate` submissions through per second, and up to `burst` at once after
+    a lull."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def take(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def submit_serially(
+    sequences: Iterable[int], on_submitted: Callable[[Submission], None]
+) -> None:
+    """Submits one task run at a time, on the event loop, as `main` always has."""
+    for sequence in sequences:
+        await asyncio.sleep(0)
+        on_submitted(submit_one(sequence))
+
+
+async def submit_concurrently(
+    sequences: Iterable[int],
+    on_submitted: Callable[[Submission], None],
+    concurrency: int,
+    bucket: TokenBucket | None = None,
+) -> None:
+    """Submits up to `concurrency` task runs at once, and no faster than the `bucket`
+    lets them through."""
+    slots = asyncio.Semaphore(concurrency)
+    submitting: set[asyncio.Task[None]] = set()
+
+    async def submit(client: PrefectClient, sequence: int) -> None:
+        try:
+            on_submitted(await submit_deferred(client, sequence))
+        finally:
+            slots.release()
+
+    async with get_client() as client:
+        for sequence in sequences:
+            await slots.acquire()
+            if bucket:
+                await bucket.take()
+            task = asyncio.create_task(submit(client, sequence))
+            submitting.add(task)
+            task.add_done_callback(submitting.discard)
+        await asyncio.gather(*submitting)
+
+
+def _ready() -> int:
+    # runs in a submitter process, which has imported this module to run it
+    return os.getpid()
+
+
+def _submit_chunk(sequences: list[int], concurrency: int) -> list[Submission]:
+    # runs in a submitter process
+    submissions: list[Submission] = []
+    asyncio.run(submit_concurrently(sequences, submissions.append, concurrency))
+    return submissions
+
+
+async def submit_in_processes(
+    sequences: Iterable[int],
+    on_submitted: Callable[[Submission], None],
+    processes: int,
+    concurrency: int,
+    chunk_size: int = 100,
+) -> None:
+    """Submits task runs from `processes` processes, each submitting up to
+    `concurrency` at once, in chunks of `chunk_size` so that their task run IDs come
+    back as they go.  Every process is started before any task runs are submitted,
+    so that none of them submit while the others are still importing Prefect."""
+    loop = asyncio.get_running_loop()
+    sequences = list(sequences)
+    chunks = [
+        sequences[start : start + chunk_size]
+        for start in range(0, len(sequences), chunk_size)
+    ]
+
+    with ProcessPoolExecutor(
+        processes, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        ready: set[int] = set()
+        while len(ready) < processes:
+            ready.update(
+                await asyncio.gather(
+                    *(loop.run_in_executor(pool, _ready) for _ in range(processes))
+                )
+            )
+
+        futures = [
+            loop.run_in_executor(pool, _submit_chunk, chunk, concurrency)
+            for chunk in chunks
+        ]
+        for chunk in asyncio.as_completed(futures):
+            for submission in await chunk:
+                on_submitted(submission)
+
+
+@dataclass
+class SubmissionStats:
+    latencies: list[float] = field(default_factory=list)
+    failures: int = 0
+    started: float | None = None
+
+    def record(self, submission: Submission) -> None:
+        self.latencies.append(submission.latency)
+        if self.started is None or submission.started < self.started:
+            self.started = submission.started
+        if submission.error:
+            self.failures += 1
@@ -0,0 +1,125 @@
+import asyncio
+import random
+import sys
+from pathlib import Path
+from typing import IO
+
+# The supervisor that's running the task workers for this run, if any, so that the
+# agents of chaos can target its workers rather than Docker containers
+active: "WorkerSupervisor | None" = None
+
+
+class WorkerSupervisor:
+    """Runs `workers` task worker processes (`python -m chaos_duck.tasks`) without
+    Docker, restarting any that exit after `restart_delay` seconds, the way
+    `restart: always` does for the `tasks` service.
+
+    Workers can be killed on demand, which they'll be restarted from too.  Their
+    output goes to `worker-<n>.log` files in `log_dir`, or nowhere without one.  On
+    entering, the workers are given `warmup` seconds to connect to the Prefect API
+    before any task runs are submitted.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        restart_delay: float = 1.0,
+        warmup: float = 5.0,
+        log_dir: Path | None = None,
+    ):
+        self.workers = workers
+        self.restart_delay = restart_delay
+        self.warmup = warmup
+        self.log_dir = log_dir
+
+        self.restarts = 0
+        self.kills = 0
+
+        self._processes: dict[int, asyncio.subprocess.Process] = {}
+        self._logs: dict[int, IO[bytes]] = {}
+        self._supervising: list[asyncio.Task[None]] = []
+        self._stopping = False
+
+    @property
+    def running(self) -> int:
+        return sum(1 for p in self._processes.values() if p.returncode is None)
+
+    async def __aenter__(self) -> "WorkerSupervisor":
+        global active
+
+        if self.log_dir:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._stopping = False
+        self._supervising = [
+            asyncio.create_task(self._supervise(n)) for n in range(self.workers)
+        ]
+        active = self
+        print(f"🦆 Started {self.workers} task workers, warming up")
+        await asyncio.sleep(self.warmup)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        global active
+
+        active = None
+        self._stopping = True
+        for task in self._supervising:
+            task.cancel()
+        await asyncio.gather(*self._supervising, return_exceptions=True)
+        self._supervising = []
+
+        for process in self._processes.values():
+            if process.returncode is None:
+                process.terminate()
+        await asyncio.gather(
+            *(process.wait() for process in self._processes.values()),
+            return_exceptions=True,
+        )
+        self._processes.clear()
+        for log in self._logs.values():
+            log.close()
+        self._logs.clear()
+
+    def kill(self, n: int | None = None) -> int | None:
+        """Kills worker `n`, or a random running worker, returning which was
+        killed, if any were running."""
+        running = [n for n, p in self._processes.items() if p.returncode is None]
+        if n is None:
+            if not running:
+                return None
+            n = random.choice(running)
+        elif n not in running:
+            return None
+
+        self._processes[n].kill()
+        self.kills += 1
+        return n
+
+    async def _start(self, n: int) -> asyncio.subprocess.Process:
+        output: IO[bytes] | int = asyncio.subprocess.DEVNULL
+        if self.log_dir:
+            if n not in self._logs:
+                self._logs[n] = (self.log_dir / f"worker-{n}.log").open("ab")
+            output = self._logs[n]
+
+        return await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "chaos_duck.tasks",
+            stdout=output,
+            stderr=output,
+        )
+
+    async def _supervise(self, n: int) -> None:
+        while True:
+            try:
+                process = self._processes[n] = await self._start(n)
+            except Exception as exc:
+                print(f"🦆 Couldn't start task worker {n}: {exc}")
+            else:
+                await process.wait()
+                if self._stopping:
+                    return
+                print(f"🦆 Task worker {n} exited with {process.returncode}")
+                self.restarts += 1
+            await asyncio.sleep(self.restart_delay)
@@ -0,0 +1,220 @@
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, NamedTuple
+from uuid import UUID
+
+from prefect.client.orchestration import PrefectClient
+from prefect.client.schemas.filters import TaskRunFilter, TaskRunFilterId
+from prefect.client.schemas.objects import TaskRun
+from prefect.events import Event
+from prefect.events.clients import get_events_subscriber
+from prefect.events.filters import EventFilter, EventNameFilter
+from prefect.states import StateType
+
+FINAL_STATES = {StateType.COMPLETED, StateType.FAILED, StateType.CRASHED}
+
+
+class Transition(NamedTuple):
+    type: StateType
+    name: str
+    occurred: datetime
+
+
+class CompletionTracker:
+    """Tracks task runs until they reach a final state, from the task run state events
+    the Prefect API streams to us, rather than by polling for every outstanding run.
+
+    When a task run's event says it has finished, the task run is read (in chunks,
+    along with any others that finished within `interval` seconds) to confirm its
+    final state and get its result, so tracking costs about the same for each task
+    run however many are still outstanding.  Events can be missed while we're
+    disconnected, like when the Prefect server restarts, so after reconnecting, or
+    once no task runs have finished for `quiet_seconds`, every outstanding task run
+    is read again.
+
+    Every state change seen for a task run is kept in `history` until it's popped,
+    so that its lifecycle can be measured once it has finished.
+    """
+
+    def __init__(
+        self,
+        client: PrefectClient,
+        interval: float = 0.5,
+        chunk_size: int = 200,
+        quiet_seconds: float = 30,
+        max_early: int = 10_000,
+    ):
+        self.client = client
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.quiet_seconds = quiet_seconds
+        self.max_early = max_early
+
+        self.retried: set[UUID] = set()
+        self.read_failures = 0
+        self.reconciliations = 0
+
+        # The latest known state of each outstanding task run, and how many are in each
+        self._states: dict[UUID, tuple[StateType, str] | None] = {}
+        self.summary: Counter[tuple[StateType, str]] = Counter()
+        self.history: dict[UUID, list[Transition]] = {}
+
+        self._finished: set[UUID] = set()
+        # State changes of task runs we haven't been told to expect (yet)
+        self._early: dict[UUID, list[Transition]] = {}
+        self._changed = asyncio.Event()
+        self._connected = asyncio.Event()
+        self._reconcile = False
+        self._subscription: asyncio.Task[None] | None = None
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._states)
+
+    def expect(self, task_run_id: UUID) -> None:
+        self._states.setdefault(task_run_id, None)
+        self.history.setdefault(task_run_id, [])
+        for transition in self._early.pop(task_run_id, []):
+            self._transition(task_run_id, transition)
+
+    async def __aenter__(self) -> "CompletionTracker":
+        self._subscription = asyncio.create_task(self._subscribe())
+        # Subscribe before any task runs are submitted, so that no events are missed
+        try:
+            await asyncio.wait_for(self._connected.wait(), 10)
+        except asyncio.TimeoutError:
+            print("Couldn't subscribe to task run events yet, will catch up later")
+            self._reconcile = True
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        assert self._subscription
+        self._subscription.cancel()
+        try:
+            await self._subscription
+        except asyncio.CancelledError:
+            pass
+
+    async def _subscribe(self) -> None:
+        filter = EventFilter(event=EventNameFilter(prefix=["prefect.task-run."]))
+        while True:
+            try:
+                async with get_events_subscriber(filter=filter) as subscriber:
+                    if self._connected.is_set():
+                        # Catch up on the events we missed while we were disconnected
+                        self._reconcile = True
+                        self._changed.set()
+                    self._connected.set()
+
+                    async for event in subscriber:
+                        try:
+                            self._observe(event)
+                        except Exception as exc:
+                            # One bad event shouldn't cost us the subscription, and
+                            # a reconciliation of every outstanding task run
+                            print(f"Couldn't observe event {event.id}: {exc}")
+            except Exception as exc:
+                print(f"Lost the task run event subscription, reconnecting: {exc}")
+                await asyncio.sleep(1)
+
+    def _observe(self, event: Event) -> None:
+        prefix, _, task_run_id = event.resource.id.rpartition(".")
+        if prefix != "prefect.task-run":
+            return
+
+        id = UUID(task_run_id)
+        if id in self._finished:
+            return
+
+        validated = event.payload.get("validated_state")
+        if not isinstance(validated, dict) or not validated.get("type"):
+            # Not a state change we can follow
+            return
+        transition = Transition(
+            StateType(validated["type"]), validated.get("name") or "", event.occurred
+        )
+        if id not in self._states:
+            # Task runs submitted concurrently can change state, or even finish,
+            # before we're told their IDs
+            self._early.setdefault(id, []).append(transition)
+            if len(self._early) > self.max_early:
+                del self._early[next(iter(self._early))]
+            return
+
+        self._transition(id, transition)
+
+    def _transition(self, id: UUID, transition: Transition) -> None:
+        if id in self._finished:
+            return
+        self.history[id].append(transition)
+        self._update(id, (transition.type, transition.name))
+        if transition.type in FINAL_STATES:
+            self._finished.add(id)
+            self._changed.set()
+
+    def _update(self, id: UUID, state: tuple[StateType, str] | None) -> None:
+        if previous := self._states.get(id):
+            self.summary[previous] -= 1
+            if not self.summary[previous]:
+                del self.summary[previous]
+        if state:
+            self.summary[state] += 1
+            if "Retry" in state[1]:
+                self.retried.add(id)
+        if id in self._states:
+            self._states[id] = state
+
+    async def finished(self) -> AsyncIterator[list[TaskRun]]:
+        """Yields task runs as they reach final states, in batches, until there are
+        no more outstanding."""
+        last_progress = time.monotonic()
+        while self._states:
+            # Task runs whose events said they'd finished, but that the API didn't say
+            # so for yet, are read again shortly
+            timeout = self.interval if self._finished else self.quiet_seconds
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            # Give other task runs a moment to finish too, so they're read together
+            await asyncio.sleep(self.interval)
+            self._changed.clear()
+
+            if self._reconcile or time.monotonic() - last_progress > self.quiet_seconds:
+                self._reconcile = False
+                self.reconciliations += 1
+                last_progress = time.monotonic()
+                candidates = list(self._states)
+            else:
+                candidates = list(self._finished)
+
+            runs = await self._read(candidates)
+            finished = [run for run in runs if run.state.type in FINAL_STATES]
+            for run in runs:
+                self._update(run.id, (run.state.type, run.state.name))
+            for run in finished:
+                self._update(run.id, None)
+                del self._states[run.id]
+                self._finished.discard(run.id)
+
+            if finished:
+                last_progress = time.monotonic()
+                yield finished
+
+    async def _read(self, ids: list[UUID]) -> list[TaskRun]:
+        runs = []
+        for start in range(0, len(ids), self.chunk_size):
+            chunk = ids[start : start + self.chunk_size]
+            try:
+                runs += await self.client.read_task_runs(
+                    task_run_filter=TaskRunFilter(id=TaskRunFilterId(any_=chunk)),
+                    limit=len(chunk),
+                )
+            except Exception as exc:
+                print(f"Failed to read {len(chunk)} task runs: {exc}")
+                self.read_failures += 1
+                # Try these again on the next round
+                self._changed.set()
+        return runs
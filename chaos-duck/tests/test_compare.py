@@ -0,0 +1,56 @@
+from typing import Any
+
+from chaos_duck.compare import compare
+
+
+def regressions(baseline: dict[str, Any], candidate: dict[str, Any]) -> list[str]:
+    return compare(baseline, candidate, threshold=0.1, min_ms=5, min_count=10)
+
+
+def test_rates_regress_when_lower() -> None:
+    baseline = {"summary.total_rate": 100.0}
+
+    assert regressions(baseline, {"summary.total_rate": 95.0}) == []
+    assert regressions(baseline, {"summary.total_rate": 120.0}) == []
+    assert regressions(baseline, {"summary.total_rate": 80.0}) == ["summary.total_rate"]
+
+
+def test_latencies_regress_when_higher_by_more_than_min_ms() -> None:
+    baseline = {"latency.submission.p95_ms": 10.0, "latency.execution.p95_ms": 100.0}
+    candidate = {"latency.submission.p95_ms": 14.0, "latency.execution.p95_ms": 120.0}
+
+    assert regressions(baseline, candidate) == ["latency.execution.p95_ms"]
+
+
+def test_failure_counts_regress_when_higher_by_more_than_min_count() -> None:
+    baseline = {"summary.submission_failures": 0, "summary.crashed": 20}
+
+    assert regressions(baseline, {"summary.submission_failures": 1}) == []
+    assert regressions(baseline, {"summary.crashed": 29}) == []
+    assert regressions(
+        baseline, {"summary.submission_failures": 10, "summary.crashed": 30}
+    ) == ["summary.crashed", "summary.submission_failures"]
+
+
+def test_any_result_mismatch_regresses() -> None:
+    assert regressions(
+        {"summary.result_mismatches": 0}, {"summary.result_mismatches": 1}
+    ) == ["summary.result_mismatches"]
+
+
+def test_only_metrics_in_both_reports_are_compared() -> None:
+    baseline = {
+        "config.rate": 50.0,
+        "summary.completed": 1000,
+        "summary.total_rate": 100.0,
+        "latency.submission.histogram.le_2ms": 100,
+        "latency.submission.p95_ms": None,
+    }
+    candidate = {
+        "config.rate": 10.0,
+        "summary.completed": 10,
+        "latency.submission.histogram.le_2ms": 1,
+        "latency.submission.p95_ms": 100.0,
+    }
+
+    assert regressions(baseline, candidate) == []
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+
+from prefect.client.schemas.objects import TaskRun
+from prefect.states import Completed, StateType
+
+from chaos_duck.lifecycle import Lifecycle
+from chaos_duck.tracking import Transition
+
+NOW = datetime(2024, 8, 1, tzinfo=timezone.utc)
+
+
+def at(seconds: float) -> datetime:
+    return NOW + timedelta(seconds=seconds)
+
+
+def task_run(**timestamps: datetime) -> TaskRun:
+    return TaskRun(task_key="ping", dynamic_key="0", state=Completed(), **timestamps)
+
+
+def test_lifecycles_of_task_runs_that_retried() -> None:
+    history = [
+        Transition(StateType.COMPLETED, "Completed", at(10)),
+        Transition(StateType.SCHEDULED, "Scheduled", at(0)),
+        Transition(StateType.PENDING, "Pending", at(1)),
+        Transition(StateType.RUNNING, "Running", at(2)),
+        Transition(StateType.SCHEDULED, "AwaitingRetry", at(3)),
+        Transition(StateType.RUNNING, "Retrying", at(6)),
+    ]
+    lifecycle = Lifecycle.of(task_run(created=at(-1)), history)
+
+    assert lifecycle == Lifecycle(
+        scheduled=at(0),
+        pending=at(1),
+        running=[at(2), at(6)],
+        finished=at(10),
+        final_state="Completed",
+    )
+    assert lifecycle.retries == 1
+    assert lifecycle.stages() == {
+        "queue_wait": 2,
+        "execution": 4,
+        "retry_overhead": 4,
+        "end_to_end": 10,
+    }
+
+
+def test_missed_state_changes_are_taken_from_the_task_run() -> None:
+    run = task_run(created=at(0), start_time=at(3), end_time=at(5))
+    lifecycle = Lifecycle.of(run, [])
+
+    assert lifecycle.running == [at(3)]
+    assert lifecycle.retries == 0
+    assert lifecycle.stages() == {"queue_wait": 3, "execution": 2, "end_to_end": 5}
+
+
+def test_unknown_stages_are_left_out() -> None:
+    history = [Transition(StateType.COMPLETED, "Completed", at(5))]
+    lifecycle = Lifecycle.of(task_run(created=at(0)), history)
+
+    assert lifecycle.stages() == {"end_to_end": 5}
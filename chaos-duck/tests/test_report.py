@@ -0,0 +1,52 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from chaos_duck.report import (
+    build_report,
+    direction,
+    flatten,
+    read_report,
+    write_report,
+)
+
+
+@pytest.fixture
+def report() -> dict[str, Any]:
+    return build_report(
+        {"mode": "rate", "rate": 50.0, "processes": 4, "sweep": None},
+        {"submission_failures": 2, "submission_rate": 48.5},
+        {"submission": [0.002, 0.004]},
+    )
+
+
+def test_flattening_reports(report: dict[str, Any]) -> None:
+    flat = flatten(report)
+
+    assert flat["config.mode"] == "rate"
+    assert flat["config.sweep"] is None
+    assert flat["summary.submission_rate"] == 48.5
+    assert flat["latency.submission.count"] == 2
+    assert flat["latency.submission.max_ms"] == 4
+    assert flat["latency.submission.histogram.le_2ms"] == 1
+    assert not any(isinstance(value, dict) for value in flat.values())
+
+
+@pytest.mark.parametrize("name", ["report.json", "report.csv"])
+def test_reading_reports(report: dict[str, Any], tmp_path: Path, name: str) -> None:
+    path = tmp_path / name
+    write_report(report, path)
+
+    assert read_report(path) == flatten(report)
+
+
+def test_metric_directions() -> None:
+    assert direction("summary.submission_rate") == 1
+    assert direction("latency.submission.p95_ms") == -1
+    assert direction("summary.submission_failures") == -1
+    assert direction("summary.result_mismatches") == -1
+    assert direction("summary.crashed") == -1
+    assert direction("summary.completed") == 0
+    assert direction("latency.submission.histogram.le_2ms") == 0
+    assert direction("config.rate") == 0
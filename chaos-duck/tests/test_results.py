@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from chaos_duck.results import ResultVerifier
+
+
+class StoredResult:
+    """Stands in for a result in result storage, as a task run's state refers to it."""
+
+    def __init__(self, value: Any = None, error: Exception | None = None):
+        self.value = value
+        self.error = error
+
+    async def get(self, client: Any) -> Any:
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return self.value
+
+
+def run(result: StoredResult) -> Any:
+    """A completed task run whose state refers to `result`."""
+    return SimpleNamespace(id=uuid4(), state=SimpleNamespace(result=lambda: result))
+
+
+async def verify(*runs: tuple[Any, int], workers: int = 4) -> ResultVerifier:
+    async with ResultVerifier(client=None, workers=workers) as verifier:
+        for task_run, sequence in runs:
+            verifier.verify(task_run, sequence)
+        await verifier.join()
+        assert verifier.pending == 0
+    return verifier
+
+
+async def test_expected_results_are_verified() -> None:
+    verifier = await verify(*((run(StoredResult(("pong", i))), i) for i in range(10)))
+
+    assert verifier.verified == 10
+    assert verifier.mismatches == verifier.fetch_failures == 0
+    assert len(verifier.fetch_latencies) == 10
+    assert min(verifier.fetch_latencies) >= 0.01
+
+
+@pytest.mark.parametrize(
+    "value",
+    [("pong", 2), ("ping", 1), ("pong", "1")],
+    ids=["wrong sequence", "wrong reply", "wrong type"],
+)
+async def test_mismatched_results_are_counted(value: Any) -> None:
+    verifier = await verify(
+        (run(StoredResult(("pong", 0))), 0), (run(StoredResult(value)), 1)
+    )
+
+    assert verifier.verified == 1
+    assert verifier.mismatches == 1
+    assert verifier.fetch_failures == 0
+
+
+async def test_missing_results_are_counted_as_failures() -> None:
+    verifier = await verify(
+        (run(StoredResult(("pong", 0))), 0),
+        (run(StoredResult(error=ValueError("Path /results/abc is missing"))), 1),
+        (run(StoredResult(None)), 2),
+    )
+
+    # a result that isn't a reply at all can't even be unpacked
+    assert verifier.verified == 1
+    assert verifier.fetch_failures == 2
+    assert verifier.mismatches == 0
+    assert len(verifier.fetch_latencies) == 3
+
+
+async def test_results_are_fetched_up_to_workers_at_a_time() -> None:
+    fetching = most_fetching = 0
+
+    class SlowResult(StoredResult):
+        async def get(self, client: Any) -> Any:
+            nonlocal fetching, most_fetching
+            fetching += 1
+            most_fetching = max(most_fetching, fetching)
+            try:
+                return await super().get(client)
+            finally:
+                fetching -= 1
+
+    verifier = await verify(
+        *((run(SlowResult(("pong", i))), i) for i in range(12)), workers=3
+    )
+
+    assert verifier.verified == 12
+    assert most_fetching == 3
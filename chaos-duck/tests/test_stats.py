@@ -0,0 +1,39 @@
+import pytest
+
+from chaos_duck.stats import BUCKETS, histogram, summarize
+
+
+def test_summarizing_no_durations() -> None:
+    assert summarize([]) == {"count": 0}
+
+
+def test_summarizing_one_duration() -> None:
+    assert summarize([0.25]) == {
+        "count": 1,
+        "p50_ms": 250,
+        "p95_ms": 250,
+        "p99_ms": 250,
+        "max_ms": 250,
+    }
+
+
+def test_summarizing_durations() -> None:
+    summary = summarize([s / 1000 for s in range(100, 0, -1)])
+
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p95_ms"] == pytest.approx(95.05)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert summary["max_ms"] == pytest.approx(100)
+
+
+def test_histogram_buckets_by_upper_bound() -> None:
+    counts = histogram([0.0005, 0.001, 0.0011, 0.004, 0.75, 1000])
+
+    assert len(counts) == len(BUCKETS) + 1
+    assert counts["le_1ms"] == 2
+    assert counts["le_2ms"] == 1
+    assert counts["le_5ms"] == 1
+    assert counts["le_1000ms"] == 1
+    assert counts["gt_500000ms"] == 1
+    assert sum(counts.values()) == 6
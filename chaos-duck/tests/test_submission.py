@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from uuid import UUID, uuid4
+
+import pytest
+
+from chaos_duck import submission
+from chaos_duck.submission import (
+    Submission,
+    TokenBucket,
+    submit_concurrently,
+    submit_in_processes,
+)
+
+sleep = asyncio.sleep
+
+
+class Clock:
+    """Stands in for `time` in `chaos_duck.submission`, and for `asyncio.sleep`, so
+    that time only passes when the code under test sleeps.  Tests stick to times
+    that floats hold exactly."""
+
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        # let whatever is ready run first, as it would while sleeping
+        await sleep(0)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(submission, "time", clock)
+    monkeypatch.setattr(asyncio, "sleep", clock.sleep)
+    return clock
+
+
+async def take(bucket: TokenBucket, clock: Clock, times: int) -> list[float]:
+    """Takes `times` tokens, returning when each was taken."""
+    taken: list[float] = []
+    for _ in range(times):
+        await bucket.take()
+        taken.append(clock.now - 1_000)
+    return taken
+
+
+async def test_buckets_let_submissions_through_at_their_rate(clock: Clock) -> None:
+    bucket = TokenBucket(rate=4)
+
+    assert await take(bucket, clock, 4) == [0, 0.25, 0.5, 0.75]
+
+
+async def test_buckets_let_bursts_through_after_a_lull(clock: Clock) -> None:
+    bucket = TokenBucket(rate=4, burst=3)
+
+    assert await take(bucket, clock, 4) == [0, 0, 0, 0.25]
+
+    # tokens don't pile up past the burst, however long the lull
+    clock.now += 60
+    assert await take(bucket, clock, 4) == [60.25] * 3 + [60.5]
+
+
+@asynccontextmanager
+async def client() -> AsyncIterator[Any]:
+    yield None
+
+
+async def test_concurrent_submissions_are_limited(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    in_flight: set[int] = set()
+    most_in_flight = 0
+
+    async def submit_deferred(client: Any, sequence: int) -> Submission:
+        nonlocal most_in_flight
+        in_flight.add(sequence)
+        most_in_flight = max(most_in_flight, len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(sequence)
+        return Submission(sequence, uuid4(), 0.01)
+
+    monkeypatch.setattr(submission, "get_client", client)
+    monkeypatch.setattr(submission, "submit_deferred", submit_deferred)
+    submitted: list[Submission] = []
+
+    await submit_concurrently(range(20), submitted.append, concurrency=4)
+
+    assert most_in_flight == 4
+    assert sorted(s.sequence for s in submitted) == list(range(20))
+
+
+async def test_concurrent_submissions_are_rate_limited(
+    clock: Clock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def submit_deferred(client: Any, sequence: int) -> Submission:
+        return Submission(sequence, uuid4(), 0)
+
+    monkeypatch.setattr(submission, "get_client", client)
+    monkeypatch.setattr(submission, "submit_deferred", submit_deferred)
+    submitted: list[Submission] = []
+
+    await submit_concurrently(
+        range(5), submitted.append, concurrency=10, bucket=TokenBucket(rate=2)
+    )
+
+    started = [s.started - 1_000 for s in submitted]
+    assert started == [0, 0.5, 1, 1.5, 2]
+
+
+async def test_submitting_from_processes(monkeypatch: pytest.MonkeyPatch) -> None:
+    # threads stand in for the submitter processes, which the fakes below couldn't
+    # be patched into
+    events: list[str] = []
+    lock = threading.Lock()
+
+    def ready() -> int:
+        time.sleep(0.05)
+        with lock:
+            events.append("ready")
+        return threading.get_ident()
+
+    def submit_chunk(sequences: list[int], concurrency: int) -> list[Submission]:
+        assert concurrency == 5
+        with lock:
+            events.append(f"chunk of {len(sequences)}")
+        return [Submission(sequence, UUID(int=sequence), 0) for sequence in sequences]
+
+    monkeypatch.setattr(
+        submission,
+        "ProcessPoolExecutor",
+        lambda processes, mp_context: ThreadPoolExecutor(processes),
+    )
+    monkeypatch.setattr(submission, "_ready", ready)
+    monkeypatch.setattr(submission, "_submit_chunk", submit_chunk)
+    submitted: list[Submission] = []
+
+    await submit_in_processes(
+        range(25), submitted.append, processes=3, concurrency=5, chunk_size=10
+    )
+
+    # every submitter is started before any of them submit
+    assert events[:3] == ["ready"] * 3
+    assert sorted(events[3:]) == ["chunk of 10", "chunk of 10", "chunk of 5"]
+    assert sorted(s.task_run_id for s in submitted) == [UUID(int=i) for i in range(25)]
@@ -0,0 +1,141 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from chaos_duck import supervisor
+from chaos_duck.supervisor import WorkerSupervisor
+
+
+class Process:
+    """Stands in for a task worker process, which exits when it's told to."""
+
+    def __init__(self) -> None:
+        self.returncode: int | None = None
+        self._exited = asyncio.Event()
+
+    def exit(self, returncode: int) -> None:
+        self.returncode = returncode
+        self._exited.set()
+
+    def kill(self) -> None:
+        self.exit(-9)
+
+    def terminate(self) -> None:
+        self.exit(-15)
+
+    async def wait(self) -> int:
+        await self._exited.wait()
+        assert self.returncode is not None
+        return self.returncode
+
+
+class Starts:
+    """Stands in for `asyncio.create_subprocess_exec`, keeping the processes it
+    started, when, and where their output went, and failing while `failing`."""
+
+    def __init__(self) -> None:
+        self.processes: list[Process] = []
+        self.times: list[float] = []
+        self.args: list[tuple[Any, ...]] = []
+        self.outputs: list[Any] = []
+        self.failing = False
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Process:
+        self.times.append(time.monotonic())
+        if self.failing:
+            raise OSError("Too many open files")
+        self.args.append(args)
+        self.outputs.append(kwargs["stdout"])
+        assert kwargs["stderr"] is kwargs["stdout"]
+        self.processes.append(Process())
+        return self.processes[-1]
+
+
+@pytest.fixture
+def starts(monkeypatch: pytest.MonkeyPatch) -> Starts:
+    starts = Starts()
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", starts)
+    return starts
+
+
+def workers(count: int = 2, **kwargs: Any) -> WorkerSupervisor:
+    return WorkerSupervisor(count, **{"restart_delay": 0.05, "warmup": 0, **kwargs})
+
+
+async def test_workers_run_while_supervised(starts: Starts) -> None:
+    assert supervisor.active is None
+
+    async with workers(3) as supervised:
+        await asyncio.sleep(0.01)
+        assert supervisor.active is supervised
+        assert supervised.running == 3
+        assert starts.args == [(sys.executable, "-m", "chaos_duck.tasks")] * 3
+        assert starts.outputs == [asyncio.subprocess.DEVNULL] * 3
+
+    assert supervisor.active is None
+    assert [p.returncode for p in starts.processes] == [-15] * 3
+    assert supervised.restarts == 0
+
+
+async def test_workers_that_exit_are_restarted_after_a_delay(starts: Starts) -> None:
+    async with workers(1) as supervised:
+        await asyncio.sleep(0.01)
+        starts.processes[0].exit(1)
+        await asyncio.sleep(0.01)
+        assert supervised.running == 0
+
+        await asyncio.sleep(0.1)
+        assert supervised.running == 1
+        assert supervised.restarts == 1
+        assert starts.times[1] - starts.times[0] >= 0.05
+
+
+async def test_workers_that_fail_to_start_are_retried(starts: Starts) -> None:
+    starts.failing = True
+
+    async with workers(1) as supervised:
+        await asyncio.sleep(0.075)
+        assert supervised.running == 0
+        starts.failing = False
+        await asyncio.sleep(0.1)
+        assert supervised.running == 1
+
+    # failing to start isn't a restart
+    assert len(starts.times) > len(starts.processes) == 1
+    assert supervised.restarts == 0
+
+
+async def test_killing_workers(starts: Starts) -> None:
+    async with workers(2) as supervised:
+        await asyncio.sleep(0.01)
+        assert supervised.kill(1) == 1
+        assert starts.processes[1].returncode == -9
+        assert supervised.kill(1) is None
+        assert supervised.kill(5) is None
+
+        assert supervised.kill() == 0
+        assert supervised.kill() is None
+        assert supervised.kills == 2
+
+        # killed workers are restarted like any other
+        await asyncio.sleep(0.1)
+        assert supervised.running == 2
+        assert supervised.restarts == 2
+
+
+async def test_worker_output_is_logged(starts: Starts, tmp_path: Path) -> None:
+    async with workers(2, log_dir=tmp_path / "logs") as supervised:
+        await asyncio.sleep(0.01)
+        supervised.kill(0)
+        await asyncio.sleep(0.1)
+
+    first, second, restarted = starts.outputs
+    assert Path(first.name) == tmp_path / "logs" / "worker-0.log"
+    assert Path(second.name) == tmp_path / "logs" / "worker-1.log"
+    # restarted workers keep logging to the same file, until supervising stops
+    assert restarted is first
+    assert first.closed and second.closed
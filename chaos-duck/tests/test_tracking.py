@@ -0,0 +1,198 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator
+from uuid import UUID, uuid4
+
+import pytest
+from prefect.client.schemas.filters import TaskRunFilter
+from prefect.client.schemas.objects import TaskRun
+from prefect.events import Event
+from prefect.states import Completed, Failed, Running, State, StateType
+
+from chaos_duck.tracking import CompletionTracker
+
+NOW = datetime(2024, 8, 1, tzinfo=timezone.utc)
+
+
+def event(state: State, task_run_id: UUID, seconds: float = 0, **payload) -> Event:
+    return Event(
+        occurred=NOW + timedelta(seconds=seconds),
+        event=f"prefect.task-run.{state.name}",
+        resource={"prefect.resource.id": f"prefect.task-run.{task_run_id}"},
+        payload=payload
+        or {"validated_state": {"type": state.type.value, "name": state.name}},
+    )
+
+
+class API:
+    """Stands in for the Prefect API's task runs, recording which are read."""
+
+    def __init__(self) -> None:
+        self.states: dict[UUID, State] = {}
+        self.reads: list[set[UUID]] = []
+
+    async def read_task_runs(
+        self, task_run_filter: TaskRunFilter, limit: int
+    ) -> list[TaskRun]:
+        assert task_run_filter.id and task_run_filter.id.any_
+        ids = set(task_run_filter.id.any_)
+        self.reads.append(ids)
+        return [
+            TaskRun(id=id, task_key="ping", dynamic_key="0", state=self.states[id])
+            for id in ids
+            if id in self.states
+        ]
+
+
+class Events:
+    """Stands in for the Prefect API's event stream, where putting an exception
+    disconnects the subscriber."""
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue[Event | Exception] = asyncio.Queue()
+        self.connections = 0
+
+    def subscriber(self, filter: Any) -> "Events":
+        return self
+
+    async def __aenter__(self) -> "Events":
+        self.connections += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def __aiter__(self) -> AsyncIterator[Event]:
+        while True:
+            item = await self.queue.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+@pytest.fixture
+def api() -> API:
+    return API()
+
+
+@pytest.fixture
+def events(monkeypatch: pytest.MonkeyPatch) -> Events:
+    events = Events()
+    monkeypatch.setattr("chaos_duck.tracking.get_events_subscriber", events.subscriber)
+    return events
+
+
+def tracker(api: API, **kwargs) -> CompletionTracker:
+    kwargs.setdefault("interval", 0.01)
+    return CompletionTracker(api, **kwargs)  # type: ignore[arg-type]
+
+
+async def next_finished(tracker: CompletionTracker) -> set[UUID]:
+    async for runs in tracker.finished():
+        return {run.id for run in runs}
+    return set()
+
+
+async def test_finished_task_runs_are_read_alone(api: API) -> None:
+    finishing, running = uuid4(), uuid4()
+    tracked = tracker(api)
+    tracked.expect(finishing)
+    tracked.expect(running)
+
+    tracked._observe(event(Running(), finishing))
+    tracked._observe(event(Running(), running))
+    api.states[finishing] = Completed()
+    tracked._observe(event(Completed(), finishing, 1))
+
+    assert await next_finished(tracked) == {finishing}
+    assert api.reads == [{finishing}]
+    assert tracked.outstanding == 1
+    assert [t.type for t in tracked.history[finishing]] == [
+        StateType.RUNNING,
+        StateType.COMPLETED,
+    ]
+
+
+async def test_events_before_expecting_a_task_run_are_kept(api: API) -> None:
+    id = uuid4()
+    tracked = tracker(api)
+
+    # the task run finished before its submission returned its ID
+    tracked._observe(event(Running(), id))
+    tracked._observe(event(Failed(), id, 1))
+    assert tracked.outstanding == 0
+
+    api.states[id] = Failed()
+    tracked.expect(id)
+    assert [t.type for t in tracked.history[id]] == [
+        StateType.RUNNING,
+        StateType.FAILED,
+    ]
+    assert await next_finished(tracked) == {id}
+
+
+def test_early_events_are_bounded(api: API) -> None:
+    tracked = tracker(api, max_early=2)
+    ids = [uuid4() for _ in range(3)]
+    for id in ids:
+        tracked._observe(event(Running(), id))
+
+    assert list(tracked._early) == ids[1:]
+
+
+def test_events_without_a_validated_state_are_skipped(api: API) -> None:
+    id = uuid4()
+    tracked = tracker(api)
+    tracked.expect(id)
+
+    tracked._observe(event(Running(), id, intended={"to": "RUNNING"}))
+    tracked._observe(event(Running(), id, validated_state=None))
+    assert tracked.history[id] == []
+
+    tracked._observe(event(Running(), id))
+    assert [t.type for t in tracked.history[id]] == [StateType.RUNNING]
+
+
+async def test_bad_events_keep_the_subscription(api: API, events: Events) -> None:
+    id = uuid4()
+    async with tracker(api) as tracked:
+        tracked.expect(id)
+        api.states[id] = Completed()
+        await events.queue.put(event(Completed(), id, validated_state={"type": "?"}))
+        await events.queue.put(event(Completed(), id))
+
+        assert await next_finished(tracked) == {id}
+
+    assert events.connections == 1
+    assert tracked.reconciliations == 0
+
+
+async def test_reconnecting_reconciles_every_task_run(api: API, events: Events) -> None:
+    missed, running = uuid4(), uuid4()
+    async with tracker(api) as tracked:
+        tracked.expect(missed)
+        tracked.expect(running)
+
+        # the task run finished while we were disconnected
+        await events.queue.put(ConnectionError("The server restarted"))
+        api.states[missed] = Completed()
+        api.states[running] = Running()
+
+        assert await asyncio.wait_for(next_finished(tracked), 5) == {missed}
+
+    assert events.connections == 2
+    assert tracked.reconciliations == 1
+    assert api.reads == [{missed, running}]
+    assert tracked.summary == {(StateType.RUNNING, "Running"): 1}
+
+
+async def test_quiet_periods_reconcile_every_task_run(api: API) -> None:
+    missed, running = uuid4(), uuid4()
+    tracked = tracker(api, quiet_seconds=0.05)
+    tracked.expect(missed)
+    tracked.expect(running)
+    api.states[missed] = Completed()
+
+    assert await asyncio.wait_for(next_finished(tracked), 5) == {missed}
+    assert tracked.reconciliations == 1
+    assert api.reads == [{missed, running}]
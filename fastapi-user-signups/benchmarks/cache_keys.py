@@ -0,0 +1,42 @@
+"""Compares the cost of computing populate_workspace's cache key with `task_input_hash`
+and with `cache_key_from("user.id")`.
+
+    python -m benchmarks.cache_keys
+"""
+
+import argparse
+import timeit
+from types import SimpleNamespace
+from uuid import uuid4
+
+from prefect.tasks import task_input_hash
+
+from fastapi_user_signups import tasks
+from fastapi_user_signups.cache_keys import cache_key_from
+from fastapi_user_signups.models import User
+
+
+def main(number: int) -> None:
+    # the key functions only use the task from the context
+    context = SimpleNamespace(task=tasks.populate_workspace)
+    arguments = {
+        "user": User(
+            id=uuid4(),
+            email="benchmark@example.com",
+            name="Benchmark",
+            is_superuser=False,
+        )
+    }
+    by_id = cache_key_from("user.id")
+
+    for name, key_fn in [("task_input_hash", task_input_hash), ("user.id", by_id)]:
+        seconds = timeit.timeit(lambda: key_fn(context, arguments), number=number)
+        print(f"  {name:16} {seconds / number * 1e6:8.2f} µs per key")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    main(args.number)
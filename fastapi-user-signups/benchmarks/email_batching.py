@@ -0,0 +1,73 @@
+"""Compares confirmation emails per second with and without micro-batching.
+
+This runs entirely in one process against a mock mailboi, so it doesn't need the
+docker compose stack:
+
+    python -m benchmarks.email_batching
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from fastapi_user_signups import clients, tasks
+from fastapi_user_signups.config import settings
+from fastapi_user_signups.models import User
+
+from . import mocks
+
+
+async def measure(emails: int, concurrency: int) -> float:
+    remaining = iter(range(emails))
+
+    async def task_run(i: int) -> None:
+        user = User(
+            id=uuid4(),
+            email=f"user-{i}@example.com",
+            name=f"User {i}",
+            is_superuser=False,
+        )
+        # stand in for the task's retries, since it randomly fails 20% of the time
+        while True:
+            try:
+                return await tasks.send_confirmation_email.fn(user)
+            except RuntimeError:
+                continue
+
+    async def worker() -> None:
+        for i in remaining:
+            await task_run(i)
+
+    start = time.perf_counter()
+    async with tasks.confirmation_emails:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return emails / (time.perf_counter() - start)
+
+
+async def main(emails: int, concurrency: int) -> None:
+    async with mocks.serving(mocks.mailboi) as settings.mailboi_url:
+        async with clients.http_clients():
+            settings.email_batching = False
+            unbatched = await measure(emails, concurrency)
+
+            settings.email_batching = True
+            batched = await measure(emails, concurrency)
+
+    print(
+        f"{emails} emails, {concurrency} concurrent task runs, batches of up to "
+        f"{tasks.confirmation_emails.max_size} "
+        f"within {tasks.confirmation_emails.window}s"
+    )
+    print(f"  unbatched: {unbatched:10.1f} emails per second")
+    print(f"  batched:   {batched:10.1f} emails per second")
+    print(f"  speedup:   {batched / unbatched:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.emails, args.concurrency))
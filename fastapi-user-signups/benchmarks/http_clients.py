@@ -0,0 +1,89 @@
+"""Compares onboarding task runs per second with and without the HTTP client registry.
+
+This runs entirely in one process against a mock marketito, so it doesn't need the
+docker compose stack:
+
+    python -m benchmarks.http_clients
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+import httpx
+
+from fastapi_user_signups import clients, tasks
+from fastapi_user_signups.config import settings
+from fastapi_user_signups.models import User
+
+from . import mocks
+
+
+async def enroll_without_registry(user: User) -> None:
+    # This is how the tasks used to talk to other services: a new client for every run
+    async with httpx.AsyncClient(base_url=settings.marketito_url) as onboarding:
+        response = await onboarding.post(
+            "/enroll-user",
+            json={
+                "flow": "onboarding",
+                "user_id": str(user.id),
+                "email": user.email,
+                "name": user.name,
+                "start_date": date.today().isoformat(),
+            },
+        )
+        assert response.status_code == 666
+
+
+async def enroll_with_registry(user: User) -> None:
+    await tasks.enroll_in_onboarding_flow.fn(user)
+
+
+async def measure(
+    call: Callable[[User], Awaitable[None]],
+    user: User,
+    runs: int,
+    concurrency: int,
+) -> float:
+    remaining = iter(range(runs))
+
+    async def worker() -> None:
+        for _ in remaining:
+            await call(user)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return runs / (time.perf_counter() - start)
+
+
+async def main(runs: int, concurrency: int) -> None:
+    user = User(
+        id=uuid4(),
+        email="benchmark@example.com",
+        name="Benchmark",
+        is_superuser=False,
+    )
+
+    async with mocks.serving(mocks.marketito) as settings.marketito_url:
+        without_registry = await measure(
+            enroll_without_registry, user, runs, concurrency
+        )
+        async with clients.http_clients():
+            with_registry = await measure(enroll_with_registry, user, runs, concurrency)
+
+    print(f"{runs} runs, {concurrency} concurrent")
+    print(f"  without registry: {without_registry:10.1f} runs per second")
+    print(f"  with registry:    {with_registry:10.1f} runs per second")
+    print(f"  speedup:          {with_registry / without_registry:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.runs, args.concurrency))
@@ -0,0 +1,67 @@
+"""In-process stand-ins for the services the onboarding tasks talk to."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator
+
+import fastapi
+import uvicorn
+from starlette.types import ASGIApp
+from uvicorn.protocols.http import h11_impl
+
+# Like the smocker services in docker compose, these reply with smocker's 666 to show
+# that they were reached.  uvicorn only knows the reason phrases for status codes
+# below 600, so teach it this one.
+h11_impl.STATUS_PHRASES.setdefault(666, b"No Mock Found")
+
+mailboi = fastapi.FastAPI()
+
+
+@mailboi.post("/send-mail", status_code=666)
+async def send_mail(mail: dict[str, Any]) -> None:
+    pass
+
+
+@mailboi.post("/send-mail/batch", status_code=666)
+async def send_mail_batch(batch: dict[str, list[dict[str, Any]]]) -> dict[str, Any]:
+    return {
+        "results": [
+            {"sent": True, "error": None}
+            if "@" in mail["to"]
+            else {"sent": False, "error": "Invalid address"}
+            for mail in batch["mails"]
+        ]
+    }
+
+
+marketito = fastapi.FastAPI()
+
+
+@marketito.post("/enroll-user", status_code=666)
+async def enroll_user(enrollment: dict[str, Any]) -> None:
+    pass
+
+
+@asynccontextmanager
+async def serving(app: ASGIApp) -> AsyncGenerator[str, None]:
+    """Serves `app` over real sockets on a free local port, yielding its base URL."""
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app=app,
+            host="127.0.0.1",
+            port=0,
+            http="h11",
+            access_log=False,
+            log_level="warning",
+        )
+    )
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    _, port = server.servers[0].sockets[0].getsockname()
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await serve
@@ -0,0 +1,73 @@
+"""Compares Redis calls per second with and without the shared connection pool.
+
+Run this against the Redis from the docker compose stack:
+
+    docker compose run --rm api python -m benchmarks.redis_pool
+
+or against any other Redis by setting SIGNUPS_REDIS_HOST / SIGNUPS_REDIS_PORT.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from redis.asyncio import StrictRedis
+
+from fastapi_user_signups import models
+from fastapi_user_signups.config import settings
+from fastapi_user_signups.models import NewUser
+
+
+async def read_user_unpooled(user_id: UUID) -> None:
+    # This is how the models used to talk to Redis: a new connection for every call
+    async with StrictRedis(
+        host=settings.redis_host, port=settings.redis_port, db=settings.redis_db
+    ) as redis:
+        await redis.get(f"user:{user_id}")
+
+
+async def read_user_pooled(user_id: UUID) -> None:
+    await models.read_user(user_id)
+
+
+async def measure(
+    call: Callable[[UUID], Awaitable[None]],
+    user_id: UUID,
+    calls: int,
+    concurrency: int,
+) -> float:
+    remaining = iter(range(calls))
+
+    async def worker() -> None:
+        for _ in remaining:
+            await call(user_id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return calls / (time.perf_counter() - start)
+
+
+async def main(calls: int, concurrency: int) -> None:
+    async with models.redis_pool():
+        user = await models.create_user(
+            NewUser(email="benchmark@example.com", name="Benchmark")
+        )
+
+        unpooled = await measure(read_user_unpooled, user.id, calls, concurrency)
+        pooled = await measure(read_user_pooled, user.id, calls, concurrency)
+
+    print(f"{calls} calls, {concurrency} concurrent")
+    print(f"  without pool: {unpooled:10.1f} calls per second")
+    print(f"  with pool:    {pooled:10.1f} calls per second")
+    print(f"  speedup:      {pooled / unpooled:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.calls, args.concurrency))
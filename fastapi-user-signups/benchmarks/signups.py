@@ -0,0 +1,244 @@
+"""Measures signup latency end to end, from `POST /users` to each onboarding task
+completing, entirely within one process.
+
+Instead of the docker compose stack this uses fakeredis (or any Redis given with
+`--redis-url`), in-process mocks of mailboi and marketito, a temporary Prefect server
+from Prefect's test harness, and task workers running on the same event loop as the
+API.  The report is printed (or written to `--output`) as JSON, so runs can be
+compared:
+
+    python -m benchmarks.signups --rate 50 --requests 500 --output before.json
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import fakeredis
+import httpx
+from fakeredis.aioredis import FakeConnection
+from prefect import Task
+from prefect.client.schemas.objects import State, TaskRun
+from prefect.task_worker import serve
+from prefect.testing.utilities import prefect_test_harness
+from redis.asyncio import ConnectionPool
+
+from fastapi_user_signups import api, clients, models, tasks
+from fastapi_user_signups.config import settings
+
+from . import mocks
+
+ONBOARDING_TASKS: list[Task] = [
+    tasks.send_confirmation_email,
+    tasks.enroll_in_onboarding_flow,
+    tasks.populate_workspace,
+]
+
+# Each request signs up a user with a numbered email, which the onboarding tasks
+# include in their run names, so that task runs can be traced back to requests
+EMAIL = "signup-{}@example.com"
+EMAIL_PATTERN = re.compile(r"signup-(\d+)@example\.com")
+
+
+@dataclass
+class Signup:
+    started: float
+    responded: float | None = None
+    failed: bool = False
+    completed: dict[str, float] = field(default_factory=dict)
+    task_failures: set[str] = field(default_factory=set)
+
+
+def percentiles(samples: list[float]) -> dict[str, float | int | None]:
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+
+    samples = sorted(samples)
+    if len(samples) == 1:
+        cuts = samples * 99
+    else:
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "count": len(samples),
+        "p50": cuts[49],
+        "p95": cuts[94],
+        "p99": cuts[98],
+        "max": samples[-1],
+    }
+
+
+async def benchmark(
+    rate: float,
+    requests: int,
+    workers: int,
+    redis_url: str | None,
+    timeout: float,
+) -> dict[str, Any]:
+    signups: dict[int, Signup] = {}
+
+    def record(outcome: str):
+        def hook(task: Task, task_run: TaskRun, state: State) -> None:
+            # task runs are renamed with the user's email before they run
+            if not (match := EMAIL_PATTERN.search(task_run.name)):
+                return
+            signup = signups[int(match.group(1))]
+            if outcome == "completed":
+                signup.completed[task.name] = time.perf_counter()
+            else:
+                signup.task_failures.add(task.name)
+
+        return hook
+
+    served = [
+        task.with_options(
+            on_completion=[record("completed")],
+            on_failure=[record("failed")],
+        )
+        for task in ONBOARDING_TASKS
+    ]
+
+    if redis_url:
+        pool = ConnectionPool.from_url(redis_url)
+    else:
+        pool = ConnectionPool(
+            connection_class=FakeConnection, server=fakeredis.FakeServer()
+        )
+
+    async with (
+        mocks.serving(mocks.mailboi) as settings.mailboi_url,
+        mocks.serving(mocks.marketito) as settings.marketito_url,
+        models.redis_pool(pool),
+        clients.http_clients(),
+        tasks.confirmation_emails,
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=api.app), base_url="http://api"
+        ) as client,
+    ):
+        task_workers = [
+            asyncio.create_task(serve(*served, limit=settings.worker_limit))
+            for _ in range(workers)
+        ]
+
+        async def sign_up(i: int) -> None:
+            signup = signups[i] = Signup(started=time.perf_counter())
+            try:
+                response = await client.post(
+                    "/users", json={"email": EMAIL.format(i), "name": f"User {i}"}
+                )
+                response.raise_for_status()
+            except Exception:
+                signup.failed = True
+            finally:
+                signup.responded = time.perf_counter()
+
+        def finished(signup: Signup) -> bool:
+            return signup.failed or (
+                len(signup.completed) + len(signup.task_failures)
+                == len(ONBOARDING_TASKS)
+            )
+
+        # Requests arrive at a steady `rate`, whether or not earlier ones are done
+        start = time.perf_counter()
+        in_flight = []
+        for i in range(requests):
+            await asyncio.sleep(max(0, start + i / rate - time.perf_counter()))
+            in_flight.append(asyncio.create_task(sign_up(i)))
+        await asyncio.gather(*in_flight)
+        submitted = time.perf_counter()
+
+        deadline = submitted + timeout
+        while not all(finished(s) for s in signups.values()):
+            if time.perf_counter() > deadline:
+                break
+            await asyncio.sleep(0.05)
+        done = time.perf_counter()
+
+        for task_worker in task_workers:
+            task_worker.cancel()
+        await asyncio.gather(*task_workers, return_exceptions=True)
+
+    responded = [s for s in signups.values() if not s.failed]
+    report: dict[str, Any] = {
+        "config": {
+            "rate": rate,
+            "requests": requests,
+            "workers": workers,
+            "worker_limit": settings.worker_limit,
+            "email_batching": settings.email_batching,
+            "redis": "redis" if redis_url else "fakeredis",
+        },
+        "requests": {
+            "errors": requests - len(responded),
+            "throughput": len(responded) / (submitted - start),
+            "latency": percentiles([s.responded - s.started for s in responded]),
+        },
+        "tasks": {},
+        "all_tasks": {
+            "unfinished": sum(1 for s in responded if not finished(s)),
+            "throughput": len(responded) / (done - start),
+            "latency": percentiles(
+                [
+                    max(s.completed.values()) - s.started
+                    for s in responded
+                    if len(s.completed) == len(ONBOARDING_TASKS)
+                ]
+            ),
+        },
+    }
+    for task in ONBOARDING_TASKS:
+        report["tasks"][task.name] = {
+            "failed": sum(1 for s in responded if task.name in s.task_failures),
+            "latency": percentiles(
+                [
+                    s.completed[task.name] - s.started
+                    for s in responded
+                    if task.name in s.completed
+                ]
+            ),
+        }
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=20, help="requests per second")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=2, help="task workers to run")
+    parser.add_argument("--redis-url", help="use this Redis instead of fakeredis")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=120,
+        help="seconds to wait for tasks after the last request",
+    )
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    with prefect_test_harness():
+        report = asyncio.run(
+            benchmark(
+                rate=args.rate,
+                requests=args.requests,
+                workers=args.workers,
+                redis_url=args.redis_url,
+                timeout=args.timeout,
+            )
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,54 @@
 # not prefect not imported
 # but needs to be in the env b/c tasks are imported
 
-import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
 
 import fastapi
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
-from . import models, tasks
+from . import imports, models, tasks
 from .models import NewUser, User
 
-app = fastapi.FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: fastapi.FastAPI) -> AsyncGenerator[None, None]:
+    # share one pool of Redis connections across all requests to this API process
+    async with models.redis_pool():
+        yield
+
+
+app = fastapi.FastAPI(lifespan=lifespan)
 
 
 @app.post("/users", status_code=201)
 async def create_user(new_user: NewUser) -> User:
     user = await models.create_user(new_user)
 
-    await asyncio.gather(
-        tasks.send_confirmation_email.delay(user),
-        tasks.enroll_in_onboarding_flow.delay(user),
-        tasks.populate_workspace.delay(user),
-    )
+    await tasks.submit_onboarding_tasks(user)
 
     return user
+
+
+class StreamingReplyResponse(StreamingResponse):
+    """A `StreamingResponse` that's streamed while the request body is still being
+    read.  `StreamingResponse` listens for the client disconnecting as it streams,
+    which would take the body's messages from its reader, so this one leaves
+    receiving to the body's reader, whose stream ends in `ClientDisconnect` if the
+    client goes away."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@app.post("/users/bulk")
+async def import_users(request: fastapi.Request) -> StreamingResponse:
+    # The request body is NDJSON, one `NewUser` per line, which we read and import as
+    # it streams in, streaming back a line of progress for each row in return
+    return StreamingReplyResponse(
+        imports.import_users(request.stream()),
+        media_type="application/x-ndjson",
+    )
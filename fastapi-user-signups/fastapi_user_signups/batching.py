@@ -0,0 +1,84 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Self, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class Batcher(Generic[T, R]):
+    """Collects items submitted by concurrent callers and hands them to `flush` as a
+    single batch, either once `max_size` items are waiting or `window` seconds after
+    the first of them arrived, whichever comes first.
+
+    `flush` returns one result per item, in order, and may return an exception in
+    place of a result to fail just that item's caller.  If `flush` raises, every
+    caller in the batch receives the exception.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[T]], Awaitable[list[R | Exception]]],
+        max_size: int,
+        window: float,
+    ):
+        self._flush = flush
+        self.max_size = max_size
+        self.window = window
+
+        self._pending: list[tuple[T, asyncio.Future[R]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._deliveries: set[asyncio.Task[None]] = set()
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_pending)
+
+        return await future
+
+    def _flush_pending(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        delivery = asyncio.create_task(self._deliver(batch))
+        self._deliveries.add(delivery)
+        delivery.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, batch: list[tuple[T, asyncio.Future[R]]]) -> None:
+        results: list[R | Exception]
+        try:
+            results = await self._flush([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} results from the batch, got {len(results)}"
+                )
+        except Exception as exc:
+            results = [exc] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            # The caller may have been cancelled while it was waiting
+            if future.done():
+                continue
+
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # deliver anything that's still waiting for its window to close
+        self._flush_pending()
+        await asyncio.gather(*self._deliveries, return_exceptions=True)
@@ -0,0 +1,86 @@
+"""Cache key functions for tasks that take models as inputs.
+
+Prefect's `task_input_hash` serializes and hashes every argument to a task, so a task
+that takes a whole `User` pays to serialize the user on every run, and its cache key
+changes whenever any field of the user does.  Usually only a field or two matter,
+like `user.id`, and `cache_key_from` builds a `cache_key_fn` from just those:
+
+    @task(cache_key_fn=cache_key_from("user.id", version=2))
+    async def populate_workspace(user: User) -> None:
+        ...
+
+Keys only depend on the task's key, the version and the chosen values, never on
+anything specific to the process, so they're the same on every task worker.
+"""
+
+import hashlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Protocol, runtime_checkable
+from uuid import UUID
+
+import pydantic_core
+from prefect.context import TaskRunContext
+
+CacheKeyFn = Callable[[TaskRunContext, dict[str, Any]], str]
+
+# Values of these types are keyed by their string form, without serializing them
+_SIMPLE_TYPES = (str, int, float, bool, Decimal, UUID, date, datetime, time, Enum)
+
+
+@runtime_checkable
+class CacheKeyed(Protocol):
+    """Objects that already know their own cache key, like a model that computes and
+    stores a hash of itself once, rather than being serialized for every key."""
+
+    def __cache_key__(self) -> str:
+        ...
+
+
+def cache_key_from(*paths: str, version: int | str = 1) -> CacheKeyFn:
+    """Builds a `cache_key_fn` keyed on the values at the given attribute `paths` of a
+    task's arguments, like `"user.id"` for the `id` of the `user` argument.  Paths
+    may also index into dictionaries, like `"payload.repository.full_name"`.
+
+    Changing `version` changes every key, invalidating whatever was cached before.
+    """
+    if not paths:
+        raise ValueError("At least one path is required to build a cache key")
+
+    parsed = [tuple(path.split(".")) for path in paths]
+
+    def cache_key(context: TaskRunContext, arguments: dict[str, Any]) -> str:
+        values = [_resolve(arguments, path) for path in parsed]
+        return hash_key(context.task.task_key, version, *values)
+
+    return cache_key
+
+
+def hash_key(*values: Any) -> str:
+    """Hashes `values` into a key that is stable across processes and runs."""
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        digest.update(_encode(value))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def _resolve(arguments: dict[str, Any], path: tuple[str, ...]) -> Any:
+    name, *attributes = path
+    value = arguments[name]
+    for attribute in attributes:
+        if isinstance(value, dict):
+            value = value[attribute]
+        else:
+            value = getattr(value, attribute)
+    return value
+
+
+def _encode(value: Any) -> bytes:
+    if value is None or isinstance(value, _SIMPLE_TYPES):
+        # include the type, so that `1` and `"1"` don't share a key
+        return f"{type(value).__name__}:{value}".encode()
+    if isinstance(value, CacheKeyed):
+        return b"k:" + value.__cache_key__().encode()
+    return b"j:" + pydantic_core.to_json(value)
@@ -0,0 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
+import httpx
+
+from .config import settings
+
+# Like the Redis pool in `models`, a task worker shares one HTTP client per base URL
+# across all of the task runs it executes, so that keep-alive connections to our
+# other services are reused rather than being set up again on each run (and retry).
+# The clients are closed by `http_clients`, which the task worker runs around
+# `serve()`.
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def create_client(base_url: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            settings.http_timeout,
+            connect=settings.http_connect_timeout,
+        ),
+    )
+
+
+def http_client(base_url: str) -> httpx.AsyncClient:
+    if base_url not in _clients:
+        _clients[base_url] = create_client(base_url)
+    return _clients[base_url]
+
+
+@asynccontextmanager
+async def http_clients() -> AsyncGenerator[dict[str, httpx.AsyncClient], None]:
+    try:
+        yield _clients
+    finally:
+        clients = list(_clients.values())
+        _clients.clear()
+        await asyncio.gather(*(client.aclose() for client in clients))
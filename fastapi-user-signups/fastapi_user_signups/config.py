@@ -0,0 +1,63 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_prefix="SIGNUPS_",
+        extra="ignore",
+    )
+
+    redis_host: str = "redis"
+    redis_port: int = 6379
+    redis_db: int = 0
+
+    # One pool is shared by everything in a process (the API or a task worker), so
+    # this caps the number of Redis connections that process will ever hold open.
+    redis_max_connections: int = 50
+
+    # How long to wait for a free connection when the pool is exhausted
+    redis_pool_timeout: float = 5.0
+
+    redis_socket_connect_timeout: float = 2.0
+    redis_socket_timeout: float = 5.0
+
+    mailboi_url: str = "http://mailboi"
+    marketito_url: str = "http://marketito"
+
+    # Each task worker keeps one HTTP client per service for as long as it's running,
+    # so that connections to that service are kept alive between task runs.
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_connect_timeout: float = 2.0
+    http_timeout: float = 10.0
+
+    # When batching is on, each task worker collects the confirmation emails its task
+    # runs are sending and delivers them to mailboi together, once `email_batch_size`
+    # are waiting or `email_batch_window` seconds after the first one, whichever comes
+    # first.  A batch can't be bigger than the number of task runs the worker runs at
+    # once, so raise `worker_limit` along with `email_batch_size`.
+    email_batching: bool = False
+    email_batch_size: int = 100
+    email_batch_window: float = 0.05
+
+    # The maximum number of task runs each task worker runs at once
+    worker_limit: int = 10
+
+    # Bulk imports write this many users to Redis in each pipeline, and submit the
+    # onboarding tasks for up to `import_submit_concurrency` of them at once
+    import_batch_size: int = 500
+    import_submit_concurrency: int = 50
+
+    # A bulk import row longer than this is reported as invalid, and isn't held in
+    # memory while the rest of it arrives
+    import_max_line_bytes: int = 64 * 1024
+
+    # The number of things to seed into each new user's workspace, and the most that
+    # will be sent to Redis in a single `SADD`
+    workspace_size: int = 10
+    workspace_chunk_size: int = 1000
+
+
+settings = Settings()
@@ -0,0 +1,104 @@
+import asyncio
+import json
+from typing import Any, AsyncGenerator, AsyncIterable
+
+from prefect.client.orchestration import PrefectClient, get_client
+from pydantic import ValidationError
+
+from . import models, tasks
+from .config import settings
+from .models import NewUser, User
+
+
+async def ndjson_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int
+) -> AsyncGenerator[tuple[int, bytes | None], None]:
+    """Splits a stream of bytes into numbered, non-blank lines as it arrives.  Lines
+    longer than `max_line_bytes` are dropped as they arrive, and yielded as `None`."""
+    number, buffer, overlong = 0, b"", False
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            number += 1
+            if overlong or len(line) > max_line_bytes:
+                overlong = False
+                yield number, None
+            elif line.strip():
+                yield number, line
+
+        if len(buffer) > max_line_bytes:
+            # drop the line so far, and the rest of it up to its newline
+            buffer, overlong = b"", True
+
+    if overlong:
+        yield number + 1, None
+    elif buffer.strip():
+        yield number + 1, buffer
+
+
+def progress(line: int, **details: Any) -> bytes:
+    return json.dumps({"line": line, **details}).encode() + b"\n"
+
+
+async def import_users(chunks: AsyncIterable[bytes]) -> AsyncGenerator[bytes, None]:
+    """Imports users from a stream of NDJSON `NewUser`s, yielding an NDJSON progress
+    report for each row, in order, as it's done.
+
+    Only one batch of rows is held at a time: each is written to Redis in one
+    pipeline and its users' onboarding tasks are submitted before the next batch is
+    read, so memory use doesn't grow with the size of the import.
+    """
+    batch: list[tuple[int, NewUser | str]] = []
+
+    async with get_client() as client:
+        lines = ndjson_lines(chunks, settings.import_max_line_bytes)
+        async for number, line in lines:
+            if line is None:
+                error = f"Line is longer than {settings.import_max_line_bytes} bytes"
+                batch.append((number, error))
+            else:
+                try:
+                    batch.append((number, NewUser.model_validate_json(line)))
+                except ValidationError as exc:
+                    batch.append((number, str(exc)))
+
+            if len(batch) >= settings.import_batch_size:
+                async for report in import_batch(batch, client):
+                    yield report
+                batch = []
+
+        if batch:
+            async for report in import_batch(batch, client):
+                yield report
+
+
+async def import_batch(
+    batch: list[tuple[int, NewUser | str]], client: PrefectClient
+) -> AsyncGenerator[bytes, None]:
+    """Imports the valid rows of a batch, then reports on every row of it in order,
+    with the errors of the invalid ones."""
+    users = await models.create_users(
+        row for _, row in batch if isinstance(row, NewUser)
+    )
+
+    limit = asyncio.Semaphore(settings.import_submit_concurrency)
+
+    async def onboard(user: User) -> None:
+        async with limit:
+            await tasks.submit_onboarding_tasks(user, client=client)
+
+    results = await asyncio.gather(
+        *(onboard(user) for user in users), return_exceptions=True
+    )
+
+    imported = zip(users, results)
+    for number, row in batch:
+        if isinstance(row, str):
+            yield progress(number, error=row)
+            continue
+
+        user, result = next(imported)
+        if isinstance(result, Exception):
+            yield progress(number, id=str(user.id), error=str(result))
+        else:
+            yield progress(number, id=str(user.id))
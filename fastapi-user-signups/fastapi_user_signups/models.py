@@ -1,9 +1,14 @@
 # just example, don't need redis for prefect tasks etc.
 
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import AsyncGenerator, Iterable
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field
-from redis.asyncio import StrictRedis
+from redis.asyncio import BlockingConnectionPool, ConnectionPool, StrictRedis
+
+from .config import settings
 
 
 class User(BaseModel):
@@ -19,37 +24,104 @@ class NewUser(BaseModel):
     name: str
 
 
+# Each process (the API or a task worker) shares one pool of Redis connections, so
+# that the individual model functions below don't pay for a new TCP connection on
+# every call.  The pool is opened and closed by `redis_pool`, which the API runs in
+# its lifespan and the task worker runs around `serve()`.
+_pool: ConnectionPool | None = None
+
+
+def create_pool() -> ConnectionPool:
+    return BlockingConnectionPool(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+        socket_timeout=settings.redis_socket_timeout,
+    )
+
+
+@asynccontextmanager
+async def redis_pool(
+    pool: ConnectionPool | None = None,
+) -> AsyncGenerator[ConnectionPool, None]:
+    global _pool
+    _pool = pool or create_pool()
+    try:
+        yield _pool
+    finally:
+        pool, _pool = _pool, None
+        await pool.aclose()
+
+
+def redis() -> StrictRedis:
+    global _pool
+    if _pool is None:
+        # Outside of `redis_pool` (in a one-off script, for example), fall back to a
+        # pool that lives until the process exits.
+        _pool = create_pool()
+    return StrictRedis(connection_pool=_pool)
+
+
 async def read_user(user_id: UUID) -> User:
-    async with StrictRedis(host="redis") as redis:
-        user_json = await redis.get(f"user:{user_id}")
+    user_json = await redis().get(f"user:{user_id}")
     if not user_json:
         raise ValueError(f"User {user_id} not found")
     return User.model_validate_json(user_json)
 
 
 async def create_user(new_user: NewUser) -> User:
-    user = User(
-        id=uuid4(),
-        email=new_user.email,
-        name=new_user.name,
-        is_active=True,
-        is_superuser=False,
-    )
+    (user,) = await create_users([new_user])
+    return user
 
-    async with StrictRedis(host="redis") as redis:
-        async with redis.pipeline() as p:
+
+async def create_users(new_users: Iterable[NewUser]) -> list[User]:
+    """Creates many users in a single pipelined round trip."""
+    users = [
+        User(
+            id=uuid4(),
+            email=new_user.email,
+            name=new_user.name,
+            is_active=True,
+            is_superuser=False,
+        )
+        for new_user in new_users
+    ]
+    if not users:
+        return users
+
+    async with redis().pipeline() as p:
+        for user in users:
             p.set(f"user:{user.id}", user.model_dump_json())
-            p.sadd("users", str(user.id))
-            await p.execute()
+        p.sadd("users", *(str(user.id) for user in users))
+        await p.execute()
 
-    return user
+    return users
 
 
 async def add_thing_to_user_workspace(user: User, thing: str) -> None:
-    async with StrictRedis(host="redis") as redis:
-        await redis.sadd(f"user:{user.id}:workspace", thing)
+    await redis().sadd(f"user:{user.id}:workspace", thing)
+
+
+async def add_things_to_user_workspace(
+    user: User, things: Iterable[str], chunk_size: int | None = None
+) -> None:
+    """Adds many things to a user's workspace in a single round trip.
+
+    The things are sent as variadic `SADD`s of at most `chunk_size` members each, all
+    in one pipeline.  Adding a member to a set is idempotent, so it's safe to retry
+    this after a partial failure.
+    """
+    chunk_size = chunk_size or settings.workspace_chunk_size
+    things = iter(things)
+
+    async with redis().pipeline(transaction=False) as p:
+        while chunk := list(islice(things, chunk_size)):
+            p.sadd(f"user:{user.id}:workspace", *chunk)
+        await p.execute()
 
 
 async def get_things_in_user_workspace(user: User) -> set[str]:
-    async with StrictRedis(host="redis") as redis:
-        return await redis.smembers(f"user:{user.id}:workspace")
+    return await redis().smembers(f"user:{user.id}:workspace")
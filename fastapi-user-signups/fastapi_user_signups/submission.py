@@ -0,0 +1,116 @@
+import asyncio
+from typing import Any, Iterable
+from uuid import UUID, uuid4
+
+from prefect import Task
+from prefect.client.orchestration import PrefectClient, get_client
+from prefect.client.schemas.objects import TaskRun
+from prefect.context import TagsContext, serialize_context
+from prefect.futures import PrefectDistributedFuture
+from prefect.results import ResultFactory
+from prefect.states import Scheduled
+from prefect.utilities.callables import get_call_parameters
+from prefect.utilities.engine import (
+    collect_task_run_inputs_sync,
+    emit_task_run_state_change_event,
+)
+
+
+async def submit_group(
+    calls: Iterable[tuple[Task[..., Any], tuple[Any, ...]]],
+    client: PrefectClient | None = None,
+) -> list[PrefectDistributedFuture]:
+    """Submits several background task runs together, like calling `.delay(*args)` on
+    each `(task, args)` pair, and returns their futures in the same order.
+
+    Where `.delay()` writes each run's parameters to result storage and then creates
+    its run, one after the other, this writes each distinct set of parameters only
+    once and shares it between the runs that take it, then creates all of the task
+    runs concurrently over one client.
+    """
+    calls = [(task, get_call_parameters(task.fn, args, {})) for task, args in calls]
+
+    async with client or get_client() as prefect_client:
+        stored: list[tuple[Task[..., Any], dict[str, Any], UUID]] = []
+        parameters_ids: list[UUID] = []
+        for task, parameters in calls:
+            # As `Task.create_run` does for a deferred run with parameters, since a
+            # task's result storage is where its parameters are stored
+            task.persist_result = True
+            for other_task, other_parameters, parameters_id in stored:
+                if parameters == other_parameters and _same_storage(task, other_task):
+                    break
+            else:
+                parameters_id = uuid4()
+                stored.append((task, parameters, parameters_id))
+            parameters_ids.append(parameters_id)
+
+        await asyncio.gather(
+            *(
+                _store_parameters(prefect_client, task, parameters_id, parameters)
+                for task, parameters, parameters_id in stored
+            )
+        )
+
+        task_runs: list[TaskRun] = await asyncio.gather(
+            *(
+                _create_task_run(prefect_client, task, parameters, parameters_id)
+                for (task, parameters), parameters_id in zip(calls, parameters_ids)
+            )
+        )
+
+    for task_run in task_runs:
+        emit_task_run_state_change_event(
+            task_run=task_run,
+            initial_state=None,
+            validated_state=task_run.state,
+        )
+
+    return [PrefectDistributedFuture(task_run_id=task_run.id) for task_run in task_runs]
+
+
+def _same_storage(task: Task[..., Any], other: Task[..., Any]) -> bool:
+    # A task worker reads a run's parameters back with its own task's storage and
+    # serializer, so runs can only share parameters if those are the same.
+    return (task.result_storage, task.result_serializer) == (
+        other.result_storage,
+        other.result_serializer,
+    )
+
+
+async def _store_parameters(
+    client: PrefectClient,
+    task: Task[..., Any],
+    parameters_id: UUID,
+    parameters: dict[str, Any],
+) -> None:
+    factory = await ResultFactory.from_autonomous_task(task, client=client)
+    await factory.store_parameters(
+        parameters_id,
+        {"context": serialize_context(), "parameters": parameters},
+    )
+
+
+async def _create_task_run(
+    client: PrefectClient,
+    task: Task[..., Any],
+    parameters: dict[str, Any],
+    parameters_id: UUID,
+) -> TaskRun:
+    # This mirrors what `Task.create_run` does for a deferred run outside of a flow
+    state = Scheduled()
+    state.state_details.deferred = True
+    state.state_details.task_parameters_id = parameters_id
+
+    return await client.create_task_run(
+        task=task,
+        name=task.name,
+        flow_run_id=None,
+        dynamic_key=f"{task.task_key}-{uuid4().hex}",
+        state=state,
+        task_inputs={
+            name: collect_task_run_inputs_sync(value)
+            for name, value in parameters.items()
+        },
+        extra_tags=TagsContext.get().current_tags,
+    )
@@ -1,13 +1,16 @@
+import asyncio
 import random
 from datetime import date
 
-import httpx
 import jinja2
 from prefect import task
+from prefect.client.orchestration import PrefectClient
+from prefect.futures import PrefectDistributedFuture
 from prefect.task_worker import serve
-from prefect.tasks import task_input_hash
 
-from . import models
+from . import batching, clients, models, submission
+from .cache_keys import cache_key_from
+from .config import settings
 from .models import User
 
 mail_templates = jinja2.Environment(enable_async=True)
@@ -18,54 +21,121 @@ Hi {{ user.name }}, welcome to the app!
 )
 
 
+async def send_confirmation_emails(users: list[User]) -> list[None | Exception]:
+    bodies = await asyncio.gather(
+        *(welcome_mail.render_async(user=user) for user in users)
+    )
+
+    mailboi = clients.http_client(settings.mailboi_url)
+    response = await mailboi.post(
+        "/send-mail/batch",
+        json={
+            "mails": [
+                {
+                    "to": user.email,
+                    "subject": "Welcome to the app!",
+                    "body": body,
+                }
+                for user, body in zip(users, bodies)
+            ]
+        },
+    )
+    assert response.status_code == 666
+
+    # mailboi reports on each mail separately, in the order they were sent, so that one
+    # bad address only fails (and retries) the task run for that user
+    return [
+        None
+        if result["sent"]
+        else RuntimeError(f"Could not send email to {user.email}: {result['error']}")
+        for user, result in zip(users, response.json()["results"])
+    ]
+
+
+confirmation_emails: batching.Batcher[User, None] = batching.Batcher(
+    send_confirmation_emails,
+    max_size=settings.email_batch_size,
+    window=settings.email_batch_window,
+)
+
+
 @task(task_run_name="Send Confirmation Email to {user.email}", retries=5)
 async def send_confirmation_email(user: User) -> None:
     if random.random() < 0.2:
         raise RuntimeError("Could not send email")
 
-    async with httpx.AsyncClient(base_url="http://mailboi") as mailboi:
-        response = await mailboi.post(
-            "/send-mail",
-            json={
-                "to": user.email,
-                "subject": "Welcome to the app!",
-                "body": await welcome_mail.render_async(user=user),
-            },
-        )
-        assert response.status_code == 666
+    if settings.email_batching:
+        await confirmation_emails.submit(user)
+        return
+
+    mailboi = clients.http_client(settings.mailboi_url)
+    response = await mailboi.post(
+        "/send-mail",
+        json={
+            "to": user.email,
+            "subject": "Welcome to the app!",
+            "body": await welcome_mail.render_async(user=user),
+        },
+    )
+    assert response.status_code == 666
 
 
 @task(task_run_name="Enroll {user.email} in Onboarding Flow")
 async def enroll_in_onboarding_flow(user: User) -> None:
-    async with httpx.AsyncClient(base_url="http://marketito") as onboarding:
-        response = await onboarding.post(
-            "/enroll-user",
-            json={
-                "flow": "onboarding",
-                "user_id": str(user.id),
-                "email": user.email,
-                "name": user.name,
-                "start_date": date.today().isoformat(),
-            },
-        )
-        assert response.status_code == 666
+    onboarding = clients.http_client(settings.marketito_url)
+    response = await onboarding.post(
+        "/enroll-user",
+        json={
+            "flow": "onboarding",
+            "user_id": str(user.id),
+            "email": user.email,
+            "name": user.name,
+            "start_date": date.today().isoformat(),
+        },
+    )
+    assert response.status_code == 666
 
 
 @task(
     task_run_name="Populate Workspace for {user.email}",
-    cache_key_fn=task_input_hash,
+    # A user's workspace only needs populating once, however else the user changes
+    cache_key_fn=cache_key_from("user.id"),
 )
 async def populate_workspace(user: User) -> None:
     user = await models.read_user(user.id)
-    for i in range(10):
-        await models.add_thing_to_user_workspace(user, f"thing-{i}")
+    await models.add_things_to_user_workspace(
+        user, (f"thing-{i}" for i in range(settings.workspace_size))
+    )
+
+
+async def submit_onboarding_tasks(
+    user: User, client: PrefectClient | None = None
+) -> list[PrefectDistributedFuture]:
+    # submit all of the onboarding tasks together, so that the user is only written to
+    # result storage once and the task runs are created concurrently
+    return await submission.submit_group(
+        [
+            (send_confirmation_email, (user,)),
+            (enroll_in_onboarding_flow, (user,)),
+            (populate_workspace, (user,)),
+        ],
+        client=client,
+    )
+
+
+async def main() -> None:
+    # The task worker shares one pool of Redis connections and one HTTP client per
+    # service across all of the task runs it executes, for as long as it is serving
+    async with models.redis_pool(), clients.http_clients(), confirmation_emails:
+        await serve(
+            send_confirmation_email,
+            enroll_in_onboarding_flow,
+            populate_workspace,
+            limit=settings.worker_limit,
+        )
 
 
 if __name__ == "__main__":
     from . import tasks
 
-    serve(
-        tasks.send_confirmation_email,
-        tasks.enroll_in_onboarding_flow,
-        tasks.populate_workspace,
-    )
+    asyncio.run(tasks.main())
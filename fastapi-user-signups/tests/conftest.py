@@ -0,0 +1,24 @@
+from typing import AsyncGenerator, Generator
+
+import fakeredis
+import pytest
+from fakeredis.aioredis import FakeConnection
+from fastapi_user_signups import models
+from prefect.client.orchestration import PrefectClient, get_client
+from prefect.testing.utilities import prefect_test_harness
+from redis.asyncio import ConnectionPool
+
+
+@pytest.fixture
+async def fake_redis() -> AsyncGenerator[ConnectionPool, None]:
+    pool = ConnectionPool(
+        connection_class=FakeConnection, server=fakeredis.FakeServer()
+    )
+    async with models.redis_pool(pool):
+        yield pool
+
+
+@pytest.fixture
+def prefect() -> Generator[PrefectClient, None, None]:
+    with prefect_test_harness():
+        yield get_client()
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi_user_signups.batching import Batcher
+
+
+async def double(items: list[int]) -> list[int | Exception]:
+    return [item * 2 for item in items]
+
+
+async def test_batches_are_flushed_when_full() -> None:
+    batches: list[list[int]] = []
+
+    async def flush(items: list[int]) -> list[int | Exception]:
+        batches.append(items)
+        return await double(items)
+
+    async with Batcher(flush, max_size=3, window=60) as batcher:
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+
+    assert results == [0, 2, 4, 6, 8, 10]
+    assert batches == [[0, 1, 2], [3, 4, 5]]
+
+
+async def test_batches_are_flushed_when_the_window_closes() -> None:
+    async with Batcher(double, max_size=100, window=0.01) as batcher:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(3))), timeout=1
+        )
+
+    assert results == [0, 2, 4]
+
+
+async def test_failures_are_delivered_to_each_item() -> None:
+    async def flush(items: list[int]) -> list[int | Exception]:
+        return [ValueError(item) if item % 2 else item for item in items]
+
+    async with Batcher(flush, max_size=4, window=60) as batcher:
+        results = await asyncio.gather(
+            *(batcher.submit(i) for i in range(4)), return_exceptions=True
+        )
+
+    assert results[0] == 0
+    assert isinstance(results[1], ValueError)
+    assert results[2] == 2
+    assert isinstance(results[3], ValueError)
+
+
+async def test_failed_flushes_are_delivered_to_the_whole_batch() -> None:
+    async def flush(items: list[int]) -> list[int | Exception]:
+        raise ConnectionError("mailboi is down")
+
+    async with Batcher(flush, max_size=2, window=60) as batcher:
+        results = await asyncio.gather(
+            *(batcher.submit(i) for i in range(2)), return_exceptions=True
+        )
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+async def test_closing_flushes_pending_items() -> None:
+    async with Batcher(double, max_size=100, window=60) as batcher:
+        submitted = asyncio.ensure_future(batcher.submit(21))
+        await asyncio.sleep(0)
+
+    assert await submitted == 42
+
+
+async def test_mismatched_results_fail_the_batch() -> None:
+    async def flush(items: list[int]) -> list[int | Exception]:
+        return []
+
+    async with Batcher(flush, max_size=1, window=60) as batcher:
+        with pytest.raises(ValueError, match="Expected 1 results"):
+            await batcher.submit(1)
@@ -0,0 +1,91 @@
+import subprocess
+import sys
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+from fastapi_user_signups import tasks
+from fastapi_user_signups.cache_keys import cache_key_from, hash_key
+from fastapi_user_signups.models import User
+
+USER_ID = UUID("4f6f5fc6-1f4b-4c6e-8a43-1d6f0f6c2b1e")
+
+
+@pytest.fixture
+def context() -> SimpleNamespace:
+    return SimpleNamespace(task=tasks.populate_workspace)
+
+
+def user(**overrides) -> User:
+    return User(
+        **{
+            "id": USER_ID,
+            "email": "foo@example.com",
+            "name": "Foo Bar",
+            "is_superuser": False,
+            **overrides,
+        }
+    )
+
+
+def test_keys_only_depend_on_the_chosen_fields(context: SimpleNamespace) -> None:
+    key_fn = cache_key_from("user.id")
+
+    assert key_fn(context, {"user": user()}) == key_fn(
+        context, {"user": user(name="Someone Else", is_active=False)}
+    )
+    assert key_fn(context, {"user": user()}) != key_fn(
+        context, {"user": user(id=UUID(int=1))}
+    )
+
+
+def test_keys_change_with_the_version(context: SimpleNamespace) -> None:
+    assert cache_key_from("user.id", version=1)(
+        context, {"user": user()}
+    ) != cache_key_from("user.id", version=2)(context, {"user": user()})
+
+
+def test_keys_can_index_into_dictionaries(context: SimpleNamespace) -> None:
+    key_fn = cache_key_from("payload.repository.full_name")
+
+    assert key_fn(
+        context, {"payload": {"repository": {"full_name": "prefecthq/prefect"}}}
+    ) == hash_key(tasks.populate_workspace.task_key, 1, "prefecthq/prefect")
+
+
+def test_keys_reuse_precomputed_hashes(context: SimpleNamespace) -> None:
+    class Precomputed:
+        def __cache_key__(self) -> str:
+            return "already-hashed"
+
+    key_fn = cache_key_from("thing")
+
+    assert key_fn(context, {"thing": Precomputed()}) == key_fn(
+        context, {"thing": Precomputed()}
+    )
+
+
+def test_keys_distinguish_types() -> None:
+    assert hash_key(1) != hash_key("1")
+
+
+def test_keys_are_stable_across_processes(context: SimpleNamespace) -> None:
+    script = f"""
+from types import SimpleNamespace
+from uuid import UUID
+from fastapi_user_signups import tasks
+from fastapi_user_signups.cache_keys import cache_key_from
+from fastapi_user_signups.models import User
+
+user = User(id=UUID("{USER_ID}"), email="x", name="y", is_superuser=True)
+print(cache_key_from("user.id", "user.is_superuser")(
+    SimpleNamespace(task=tasks.populate_workspace), {{"user": user}}
+))
+"""
+    other_process = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+    assert other_process == cache_key_from("user.id", "user.is_superuser")(
+        context, {"user": user(is_superuser=True)}
+    )
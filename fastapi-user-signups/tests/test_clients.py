@@ -0,0 +1,15 @@
+from fastapi_user_signups import clients
+
+
+async def test_one_client_is_shared_per_base_url() -> None:
+    async with clients.http_clients():
+        mailboi = clients.http_client("http://mailboi")
+        marketito = clients.http_client("http://marketito")
+
+        assert clients.http_client("http://mailboi") is mailboi
+        assert clients.http_client("http://marketito") is marketito
+        assert mailboi is not marketito
+
+    assert mailboi.is_closed
+    assert marketito.is_closed
+    assert not clients._clients
@@ -0,0 +1,107 @@
+import json
+from typing import AsyncGenerator
+
+import httpx
+import pytest
+from fastapi_user_signups import api, imports, models
+from fastapi_user_signups.config import settings
+from prefect.client.orchestration import PrefectClient
+from redis.asyncio import ConnectionPool
+
+
+async def stream(*chunks: bytes) -> AsyncGenerator[bytes, None]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def test_splitting_ndjson_across_chunks() -> None:
+    lines = [
+        line
+        async for line in imports.ndjson_lines(
+            stream(b'{"a": 1}\n{"b"', b": 2}\n\n", b'{"c": 3}'), 100
+        )
+    ]
+
+    assert lines == [(1, b'{"a": 1}'), (2, b'{"b": 2}'), (4, b'{"c": 3}')]
+
+
+async def test_dropping_overlong_lines() -> None:
+    lines = [
+        line
+        async for line in imports.ndjson_lines(
+            stream(b'{"a": 1}\n{"b": "', b"x" * 20, b"x" * 20, b'"}\n{"c": 3}\n'), 16
+        )
+    ]
+
+    assert lines == [(1, b'{"a": 1}'), (2, None), (3, b'{"c": 3}')]
+
+
+async def test_dropping_an_unterminated_overlong_line() -> None:
+    lines = [
+        line
+        async for line in imports.ndjson_lines(stream(b'{"a": 1}\n', b"x" * 20), 16)
+    ]
+
+    assert lines == [(1, b'{"a": 1}'), (2, None)]
+
+
+async def test_importing_users(
+    fake_redis: ConnectionPool, prefect: PrefectClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "import_batch_size", 2)
+
+    body = [
+        b'{"email": "foo@example.com", "name": "Foo"}\n',
+        b'{"email": "bar@example.com"}\n',
+        b'{"email": "baz@example.com", "name": "Baz"}\n',
+        b'{"email": "qux@example.com", "name": "Qux"}\n',
+    ]
+    reports = [
+        json.loads(report) async for report in imports.import_users(stream(*body))
+    ]
+
+    assert [report["line"] for report in reports] == [1, 2, 3, 4]
+    (invalid,) = [report for report in reports if report["line"] == 2]
+    assert "name" in invalid["error"]
+
+    imported = [report for report in reports if report["line"] != 2]
+    assert all("error" not in report for report in imported)
+
+    users = [await models.read_user(report["id"]) for report in imported]
+    assert [user.name for user in users] == ["Foo", "Baz", "Qux"]
+
+    task_runs = await prefect.read_task_runs()
+    assert len(task_runs) == 3 * len(users)
+
+
+async def test_importing_users_through_the_api(
+    fake_redis: ConnectionPool, prefect: PrefectClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "import_batch_size", 2)
+
+    # the body is sent in chunks that don't line up with its lines
+    body = b"".join(
+        [
+            b'{"email": "foo@example.com", "name": "Foo"}\n',
+            b'{"email": "bar@example.com"}\n',
+            b'{"email": "baz@example.com", "name": "Baz"}\n',
+        ]
+    )
+    chunks = [body[start : start + 10] for start in range(0, len(body), 10)]
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/users/bulk",
+            content=stream(*chunks),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    reports = [json.loads(line) for line in response.text.splitlines()]
+    assert [report["line"] for report in reports] == [1, 2, 3]
+    assert "error" in reports[1]
+
+    users = [await models.read_user(reports[line]["id"]) for line in (0, 2)]
+    assert [user.name for user in users] == ["Foo", "Baz"]
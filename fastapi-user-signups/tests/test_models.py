@@ -0,0 +1,41 @@
+from fastapi_user_signups import models
+from fastapi_user_signups.config import settings
+from fastapi_user_signups.models import NewUser
+from redis.asyncio import ConnectionPool
+
+
+async def test_redis_pool_is_shared_while_open() -> None:
+    async with models.redis_pool() as pool:
+        assert models.redis().connection_pool is pool
+        assert models.redis().connection_pool is models.redis().connection_pool
+
+    assert models._pool is None
+
+
+async def test_redis_pool_is_configured_from_settings() -> None:
+    async with models.redis_pool() as pool:
+        assert pool.max_connections == settings.redis_max_connections
+        assert pool.connection_kwargs["host"] == settings.redis_host
+        assert pool.connection_kwargs["socket_timeout"] == settings.redis_socket_timeout
+
+
+async def test_adding_many_things_to_a_workspace(fake_redis: ConnectionPool) -> None:
+    user = await models.create_user(NewUser(email="foo@example.com", name="Foo Bar"))
+
+    things = [f"thing-{i}" for i in range(250)]
+    await models.add_things_to_user_workspace(user, things, chunk_size=100)
+
+    workspace = await models.get_things_in_user_workspace(user)
+    assert workspace == {thing.encode() for thing in things}
+
+
+async def test_adding_many_things_to_a_workspace_can_be_retried(
+    fake_redis: ConnectionPool,
+) -> None:
+    user = await models.create_user(NewUser(email="foo@example.com", name="Foo Bar"))
+
+    await models.add_things_to_user_workspace(user, ["a", "b"])
+    await models.add_things_to_user_workspace(user, ["a", "b", "c"])
+
+    workspace = await models.get_things_in_user_workspace(user)
+    assert workspace == {b"a", b"b", b"c"}
@@ -4,14 +4,13 @@ import pytest
 from fastapi.testclient import TestClient
 from fastapi_user_signups import api
 from fastapi_user_signups.models import User
-from prefect.client.orchestration import PrefectClient, get_client
+from prefect.client.orchestration import PrefectClient
 from prefect.client.schemas import StateType
 from prefect.client.schemas.filters import (
     TaskRunFilter,
     TaskRunFilterState,
     TaskRunFilterStateType,
 )
-from prefect.testing.utilities import prefect_test_harness
 from starlette.types import ASGIApp
 
 
@@ -21,8 +20,10 @@ def app() -> ASGIApp:
 
 
 @pytest.fixture
-def client(app: ASGIApp) -> TestClient:
-    return TestClient(app)
+def client(app: ASGIApp) -> Generator[TestClient, None, None]:
+    # entering the client runs the app's lifespan, which opens the Redis pool
+    with TestClient(app) as client:
+        yield client
 
 
 def test_creating_user_works(client: TestClient) -> None:
@@ -39,12 +40,6 @@ def test_creating_user_works(client: TestClient) -> None:
     assert not user.is_superuser
 
 
-@pytest.fixture
-def prefect() -> Generator[PrefectClient, None, None]:
-    with prefect_test_harness():
-        yield get_client()
-
-
 async def test_creating_user_schedules_onboarding_tasks(
     client: TestClient, prefect: PrefectClient
 ) -> None:
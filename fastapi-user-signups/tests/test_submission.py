@@ -0,0 +1,55 @@
+from uuid import uuid4
+
+from fastapi_user_signups import submission, tasks
+from fastapi_user_signups.models import User
+from prefect.client.orchestration import PrefectClient
+from prefect.client.schemas import StateType
+from prefect.results import ResultFactory
+
+
+async def test_submitting_a_group_stores_shared_parameters_once(
+    prefect: PrefectClient,
+) -> None:
+    user = User(id=uuid4(), email="foo@example.com", name="Foo", is_superuser=False)
+
+    futures = await submission.submit_group(
+        [
+            (tasks.send_confirmation_email, (user,)),
+            (tasks.enroll_in_onboarding_flow, (user,)),
+            (tasks.populate_workspace, (user,)),
+        ]
+    )
+    assert len(futures) == 3
+
+    task_runs = [await prefect.read_task_run(f.task_run_id) for f in futures]
+    assert [t.task_key for t in task_runs] == [
+        tasks.send_confirmation_email.task_key,
+        tasks.enroll_in_onboarding_flow.task_key,
+        tasks.populate_workspace.task_key,
+    ]
+    assert all(t.state.type == StateType.SCHEDULED for t in task_runs)
+
+    parameters_ids = {t.state.state_details.task_parameters_id for t in task_runs}
+    assert len(parameters_ids) == 1
+
+    factory = await ResultFactory.from_autonomous_task(tasks.populate_workspace)
+    stored = await factory.read_parameters(parameters_ids.pop())
+    assert stored["parameters"] == {"user": user}
+
+
+async def test_submitting_a_group_stores_different_parameters_separately(
+    prefect: PrefectClient,
+) -> None:
+    foo = User(id=uuid4(), email="foo@example.com", name="Foo", is_superuser=False)
+    bar = User(id=uuid4(), email="bar@example.com", name="Bar", is_superuser=False)
+
+    futures = await submission.submit_group(
+        [
+            (tasks.send_confirmation_email, (foo,)),
+            (tasks.send_confirmation_email, (bar,)),
+        ]
+    )
+
+    task_runs = [await prefect.read_task_run(f.task_run_id) for f in futures]
+    parameters_ids = {t.state.state_details.task_parameters_id for t in task_runs}
+    assert len(parameters_ids) == 2
@@ -0,0 +1,47 @@
+import json
+from uuid import uuid4
+
+from fastapi_user_signups import clients, models, tasks
+from fastapi_user_signups.config import settings
+from fastapi_user_signups.models import NewUser, User
+from pytest_httpx import HTTPXMock
+from redis.asyncio import ConnectionPool
+
+
+async def test_populating_a_workspace(fake_redis: ConnectionPool) -> None:
+    user = await models.create_user(NewUser(email="foo@example.com", name="Foo Bar"))
+
+    await tasks.populate_workspace.fn(user)
+
+    workspace = await models.get_things_in_user_workspace(user)
+    assert len(workspace) == settings.workspace_size
+
+
+async def test_batched_confirmation_emails_fail_per_user(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(
+        method="POST",
+        url=f"{settings.mailboi_url}/send-mail/batch",
+        status_code=666,
+        json={
+            "results": [
+                {"sent": True, "error": None},
+                {"sent": False, "error": "Invalid address"},
+            ]
+        },
+    )
+    users = [
+        User(id=uuid4(), email=email, name="Foo Bar", is_superuser=False)
+        for email in ["foo@example.com", "not-an-address"]
+    ]
+
+    async with clients.http_clients():
+        results = await tasks.send_confirmation_emails(users)
+
+    assert results[0] is None
+    assert isinstance(results[1], RuntimeError)
+    assert "not-an-address" in str(results[1])
+
+    (request,) = httpx_mock.get_requests()
+    mails = json.loads(request.content)["mails"]
+    assert [mail["to"] for mail in mails] == ["foo@example.com", "not-an-address"]
+    assert "Hi Foo Bar, welcome to the app!" in mails[0]["body"]
@@ -1,10 +1,13 @@
 import asyncio
 import sys
+
 from httpx import AsyncClient
 
+from flask_task_monitoring.sse import server_sent_events
+
 
 async def ask(question: str):
-    async with AsyncClient(base_url="http://localhost:8001") as client:
+    async with AsyncClient(base_url="http://localhost:8001", timeout=None) as client:
         response = await client.post("/question", data=question)
         response.raise_for_status()
 
@@ -12,17 +15,22 @@ async def ask(question: str):
 
         answer_url = response.headers["Location"]
 
-        while True:
-            response = await client.get(answer_url)
-            response.raise_for_status()
-
-            if response.status_code == 202:
-                print("Task is", response.json()["state"])
-                await asyncio.sleep(0.25)
-                continue
-            elif response.status_code == 200:
-                print("Completed!")
-                break
+        # Rather than polling the answer URL until it's ready, follow the task run's
+        # state changes as they happen
+        async with client.stream("GET", f"{answer_url}/events") as events:
+            events.raise_for_status()
+
+            async for event, data in server_sent_events(events):
+                if event == "state":
+                    print("Task is", data["state"])
+                elif event == "failed":
+                    raise RuntimeError(f"Task {data['state']}: {data['message']}")
+                elif event == "completed":
+                    print("Completed!")
+                    break
+
+        response = await client.get(answer_url)
+        response.raise_for_status()
 
         assert response.status_code == 200
         print(response.text)
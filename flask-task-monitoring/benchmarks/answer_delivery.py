@@ -0,0 +1,132 @@
+"""Compares how many requests it takes to wait for answers by polling versus streaming.
+
+With the docker compose stack running, this asks `--concurrency` questions at once,
+then waits for all of their answers either by polling `GET /answer/<id>` every
+`--interval` seconds (like `ask.py` used to), or by following each task run's
+`GET /answer/<id>/events` stream, and reports the requests made and the time taken
+as JSON:
+
+    python -m benchmarks.answer_delivery --mode poll --concurrency 20
+    python -m benchmarks.answer_delivery --mode stream --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import Any
+
+import httpx
+
+
+async def wait_by_polling(
+    client: httpx.AsyncClient, answer_url: str, interval: float
+) -> None:
+    while True:
+        response = await client.get(answer_url)
+        if response.status_code != 202:
+            response.raise_for_status()
+            return
+        await asyncio.sleep(interval)
+
+
+async def wait_by_streaming(client: httpx.AsyncClient, answer_url: str) -> None:
+    async with client.stream("GET", f"{answer_url}/events") as events:
+        events.raise_for_status()
+        async for line in events.aiter_lines():
+            if line == "event: failed":
+                raise RuntimeError(f"Task run for {answer_url} failed")
+            if line == "event: completed":
+                break
+
+    response = await client.get(answer_url)
+    response.raise_for_status()
+
+
+async def benchmark(
+    base_url: str, mode: str, concurrency: int, interval: float
+) -> dict[str, Any]:
+    requests: Counter[str] = Counter()
+
+    async def count(request: httpx.Request) -> None:
+        path = request.url.path
+        if path.startswith("/answer/"):
+            path = "/answer/<id>/events" if path.endswith("/events") else "/answer/<id>"
+        requests[f"{request.method} {path}"] += 1
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=None,
+        limits=httpx.Limits(max_connections=None),
+        event_hooks={"request": [count]},
+    ) as client:
+
+        async def ask(i: int) -> float:
+            started = time.perf_counter()
+            response = await client.post(
+                "/question", content=f"What is {i} plus {i}, exactly?"
+            )
+            response.raise_for_status()
+            answer_url = response.headers["Location"]
+
+            if mode == "poll":
+                await wait_by_polling(client, answer_url, interval)
+            else:
+                await wait_by_streaming(client, answer_url)
+
+            return time.perf_counter() - started
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(ask(i) for i in range(concurrency)), return_exceptions=True
+        )
+        elapsed = time.perf_counter() - start
+
+    latencies = [r for r in results if isinstance(r, float)]
+    return {
+        "config": {
+            "mode": mode,
+            "concurrency": concurrency,
+            "interval": interval if mode == "poll" else None,
+        },
+        "errors": len(results) - len(latencies),
+        "elapsed": elapsed,
+        "latency": {
+            "p50": statistics.median(latencies) if latencies else None,
+            "max": max(latencies, default=None),
+        },
+        "requests": {
+            "total": sum(requests.values()),
+            "per_question": sum(requests.values()) / concurrency,
+            "by_endpoint": dict(requests),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--mode", choices=["poll", "stream"], default="stream")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--interval", type=float, default=0.25, help="seconds between polls"
+    )
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        benchmark(
+            base_url=args.base_url,
+            mode=args.mode,
+            concurrency=args.concurrency,
+            interval=args.interval,
+        )
+    )
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
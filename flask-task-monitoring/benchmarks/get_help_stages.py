@@ -0,0 +1,160 @@
+"""Measures how many `get_help` runs one task worker makes progress on at once.
+
+The LLM and text-to-speech calls are replaced by stubs that take a fixed time, and
+`--concurrency` runs of `get_help` share one event loop, as they would on a task
+worker.  With `--mode blocking`, the stubs for `answer` and `retort` block the event
+loop the way calling the synchronous `marvin.fn` functions used to, while `--mode
+async` and `--mode speculative` run `get_help` as it is now, with and without
+`SPECULATIVE`.  The report is printed as JSON:
+
+    python -m benchmarks.get_help_stages --mode blocking --concurrency 10
+    python -m benchmarks.get_help_stages --mode async --concurrency 10
+    python -m benchmarks.get_help_stages --mode speculative --concurrency 10
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+
+import marvin
+from prefect.settings import PREFECT_LOCAL_STORAGE_PATH, temporary_settings
+
+from flask_task_monitoring import tasks
+from flask_task_monitoring.answer_cache import AnswerCache
+
+
+class Calls:
+    """Counts the stub calls in progress, and the most there were at once."""
+
+    def __init__(self) -> None:
+        self.current = 0
+        self.peak = 0
+        self.cancelled = 0
+
+    def stub(
+        self, latency: float, result: Callable[..., Any], blocking: bool = False
+    ) -> Callable[..., Awaitable[Any]]:
+        async def call(*args, **kwargs) -> Any:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+            try:
+                if blocking:
+                    time.sleep(latency)
+                else:
+                    await asyncio.sleep(latency)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            finally:
+                self.current -= 1
+            return result(*args, **kwargs)
+
+        return call
+
+
+async def benchmark(
+    mode: str, concurrency: int, llm_latency: float, speech_latency: float
+) -> dict[str, Any]:
+    calls = Calls()
+
+    def tone(question: str, labels: list[str]) -> str:
+        return "hostile" if "hostile" in question else "nice"
+
+    marvin.classify_async = calls.stub(llm_latency, tone)
+    marvin.speak_async = calls.stub(
+        speech_latency, lambda reply: SimpleNamespace(data=reply.encode())
+    )
+    tasks.answer = calls.stub(
+        llm_latency, lambda question: f"An answer to {question}", mode == "blocking"
+    )
+    tasks.retort = calls.stub(
+        llm_latency, lambda question: f"A retort to {question}", mode == "blocking"
+    )
+    tasks.SPECULATIVE = mode == "speculative"
+
+    # Runs shouldn't fail at random, so that every one of them is measured
+    tasks.random = SimpleNamespace(random=lambda: 1.0)
+
+    async def run(i: int) -> float:
+        # Every fourth question is hostile, and every question is different, so that
+        # none of them are answered from the cache
+        question = f"{'A hostile' if i % 4 == 0 else 'A'} question, number {i}"
+        started = time.perf_counter()
+        await tasks.get_help.fn(question)
+        return time.perf_counter() - started
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(run(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "config": {
+            "mode": mode,
+            "concurrency": concurrency,
+            "llm_latency": llm_latency,
+            "speech_latency": speech_latency,
+        },
+        "elapsed": elapsed,
+        "throughput": concurrency / elapsed,
+        # How long a run would take if it had the worker to itself
+        "unloaded_latency": (
+            (1 if mode == "speculative" else 2) * llm_latency + speech_latency
+        ),
+        "peak_concurrent_calls": calls.peak,
+        "cancelled_calls": calls.cancelled,
+        "latency": {"p50": cuts[49], "p95": cuts[94], "max": max(latencies)},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--mode", choices=["blocking", "async", "speculative"], default="async"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="runs at once, like a task worker's limit",
+    )
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.5, help="seconds per LLM call"
+    )
+    parser.add_argument(
+        "--speech-latency",
+        type=float,
+        default=0.5,
+        help="seconds per text-to-speech call",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as storage:
+        tasks.answer_cache = AnswerCache(
+            path=Path(storage) / "answer-cache.sqlite3",
+            max_bytes=1024 * 1024 * 1024,
+            ttl=60,
+        )
+        with temporary_settings({PREFECT_LOCAL_STORAGE_PATH: storage}):
+            report = asyncio.run(
+                benchmark(
+                    mode=args.mode,
+                    concurrency=args.concurrency,
+                    llm_latency=args.llm_latency,
+                    speech_latency=args.speech_latency,
+                )
+            )
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
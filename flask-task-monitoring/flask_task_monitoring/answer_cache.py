@@ -0,0 +1,251 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable
+
+from prefect.settings import PREFECT_LOCAL_STORAGE_PATH
+
+from .audio import StoredAudio
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    question_key TEXT PRIMARY KEY,
+    audio_key TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mimetype TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_by_last_used ON answers (last_used);
+CREATE INDEX IF NOT EXISTS answers_by_sha256 ON answers (sha256);
+CREATE TABLE IF NOT EXISTS audio_pins (
+    token TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    pinned REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audio_pins_by_sha256 ON audio_pins (sha256);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def normalize_question(question: str) -> str:
+    """Reduces a question to the words that matter for answering it, so that questions
+    differing only in case, whitespace or punctuation share an answer."""
+    question = unicodedata.normalize("NFKC", question).casefold()
+    question = re.sub(r"['\u2019]", "", question)
+    return " ".join(re.sub(r"[^\w\s]", " ", question).split())
+
+
+class AnswerCache:
+    """Answers to previously asked questions, keyed by the normalized question.
+
+    The cache's index is a SQLite database next to the result storage, which every
+    task worker (and the API) shares, while the audio itself stays in the result
+    storage, stored once per distinct reply by `store_audio`.  Entries expire `ttl`
+    seconds after they're added, and the least recently used entries are evicted
+    once the audio they refer to adds up to more than `max_bytes`.
+
+    Since identical audio is stored once, a worker about to store audio `pin`s it
+    first, so that no other worker deletes it as an orphan before it's `put`.  Each
+    worker holds a pin of its own, which its `put` releases, and pins last `pin_ttl`
+    seconds at most, in case the worker dies in between.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, ttl: float, pin_ttl: float = 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.pin_ttl = pin_ttl
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Task workers share the database, so transactions are explicit
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._initialized:
+            connection.executescript(SCHEMA)
+            self._initialized = True
+        return connection
+
+    @staticmethod
+    def key(question: str) -> str:
+        return hashlib.sha256(normalize_question(question).encode()).hexdigest()
+
+    def get(self, question: str) -> StoredAudio | None:
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT audio_key, size, sha256, mimetype FROM answers "
+                "WHERE question_key = ? AND created > ?",
+                (self.key(question), now - self.ttl),
+            ).fetchone()
+
+            if row:
+                connection.execute(
+                    "UPDATE answers SET last_used = ? WHERE question_key = ?",
+                    (now, self.key(question)),
+                )
+            self._count(connection, "hits" if row else "misses")
+            connection.execute("COMMIT")
+
+        if not row:
+            return None
+
+        audio_key, size, sha256, mimetype = row
+        return StoredAudio(key=audio_key, size=size, sha256=sha256, mimetype=mimetype)
+
+    def pin(self, sha256: str) -> str:
+        """Keeps the audio with this hash from being deleted until it's `put` with the
+        returned pin."""
+        token = uuid.uuid4().hex
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "INSERT INTO audio_pins VALUES (?, ?, ?)", (token, sha256, time.time())
+            )
+        return token
+
+    def put(
+        self,
+        question: str,
+        audio: StoredAudio,
+        delete: Callable[[StoredAudio], None],
+        pin: str | None = None,
+    ) -> None:
+        """Caches `audio` as the answer to `question`, releasing its `pin`, and calling
+        `delete` with any audio that is no longer the answer to anything, nor pinned."""
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "DELETE FROM audio_pins WHERE token = ? OR pinned <= ?",
+                (pin, now - self.pin_ttl),
+            )
+
+            # Whatever this entry replaces, and anything that has expired, goes first
+            released = connection.execute(
+                "DELETE FROM answers WHERE question_key = ? OR created <= ? "
+                "RETURNING audio_key, size, sha256, mimetype",
+                (self.key(question), now - self.ttl),
+            ).fetchall()
+
+            connection.execute(
+                "INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.key(question),
+                    audio.key,
+                    audio.sha256,
+                    audio.size,
+                    audio.mimetype,
+                    now,
+                    now,
+                ),
+            )
+
+            (total,) = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM "
+                "(SELECT DISTINCT sha256, size FROM answers)"
+            ).fetchone()
+            while total > self.max_bytes:
+                # Never evict the answer that's being added
+                evicted = connection.execute(
+                    "DELETE FROM answers WHERE question_key = "
+                    "(SELECT question_key FROM answers WHERE question_key != ? "
+                    "ORDER BY last_used LIMIT 1) "
+                    "RETURNING audio_key, size, sha256, mimetype",
+                    (self.key(question),),
+                ).fetchone()
+                if not evicted:
+                    break
+                released.append(evicted)
+                self._count(connection, "evictions")
+                if not self._is_referenced(connection, evicted[2]):
+                    total -= evicted[1]
+
+            orphaned = {
+                sha256: StoredAudio(
+                    key=audio_key, size=size, sha256=sha256, mimetype=mimetype
+                )
+                for audio_key, size, sha256, mimetype in released
+                if not self._is_referenced(connection, sha256)
+                and not self._is_pinned(connection, sha256)
+            }
+
+            # Orphans are deleted before committing, while no other worker can pin or
+            # put them, so that none can store the same audio in between only to have
+            # it deleted from under its answer
+            for orphan in orphaned.values():
+                try:
+                    delete(orphan)
+                except Exception:
+                    logger.exception("Failed to delete orphaned audio %s", orphan.key)
+            connection.execute("COMMIT")
+
+    def stats(self) -> dict[str, Any]:
+        with closing(self._connect()) as connection:
+            counters = dict(connection.execute("SELECT name, value FROM counters"))
+            entries, total = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM "
+                "(SELECT DISTINCT sha256, size FROM answers)"
+            ).fetchone()
+            (questions,) = connection.execute("SELECT COUNT(*) FROM answers").fetchone()
+
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "questions": questions,
+            "answers": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+        }
+
+    @staticmethod
+    def _count(connection: sqlite3.Connection, name: str) -> None:
+        connection.execute(
+            "INSERT INTO counters VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    @staticmethod
+    def _is_pinned(connection: sqlite3.Connection, sha256: str) -> bool:
+        return bool(
+            connection.execute(
+                "SELECT 1 FROM audio_pins WHERE sha256 = ? LIMIT 1", (sha256,)
+            ).fetchone()
+        )
+
+    @staticmethod
+    def _is_referenced(connection: sqlite3.Connection, sha256: str) -> bool:
+        return bool(
+            connection.execute(
+                "SELECT 1 FROM answers WHERE sha256 = ? LIMIT 1", (sha256,)
+            ).fetchone()
+        )
+
+
+answer_cache = AnswerCache(
+    path=Path(
+        os.environ.get("ANSWER_CACHE_PATH")
+        or Path(PREFECT_LOCAL_STORAGE_PATH.value()) / "answer-cache.sqlite3"
+    ).expanduser(),
+    max_bytes=int(os.environ.get("ANSWER_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+    ttl=float(os.environ.get("ANSWER_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60)),
+)
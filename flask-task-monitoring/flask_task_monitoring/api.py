@@ -1,15 +1,28 @@
+import asyncio
+from functools import partial
+from typing import Iterator
 from uuid import UUID
 
-from flask import Flask, request
-from prefect.client.orchestration import get_client
+from flask import Flask, Response, request
 from prefect.client.schemas.objects import StateType
 from prefect.futures import PrefectDistributedFuture
 from prefect.results import PersistedResult
 
+from .answer_cache import AnswerCache, answer_cache
+from .audio import AUDIO_MIMETYPE, StoredAudio, send_audio
+from .single_flight import single_flight
+from .sse import server_sent_event
+from .states import TaskRunState, task_run_states
+from .task_runs import task_runs
 from .tasks import get_help
 
 app = Flask(__name__)
 
+# While a task run's state hasn't changed, streams send a comment this often to keep
+# the connection open, and double check the state with the API in case an event was
+# missed
+KEEPALIVE_SECONDS = 15
+
 
 @app.route("/question", methods=["POST"])
 async def ask_question():
@@ -25,20 +38,42 @@ async def ask_question():
     # the Prefect API.  Instead, they are stored in the common result storage area that
     # the application and task servers share (in this example application, that is a
     # filesystem path).
-    answer: PrefectDistributedFuture = get_help.delay(question)
+    def submit() -> UUID:
+        answer: PrefectDistributedFuture = get_help.delay(question)
+        return answer.task_run_id
+
+    def is_finished(task_run_id: UUID) -> bool:
+        state = read_get_help_state(task_run_id)
+        return not state or state.is_final
+
+    # When many people ask the same question at once, we only submit one task run for
+    # it, and everyone who asks before it finishes gets the same answer.  Questions
+    # are the same if they only differ in case, whitespace or punctuation.  Waiting
+    # on someone else's submission blocks, so it happens off of the event loop.
+    key = AnswerCache.key(question)
+    task_run_id, submitted = await asyncio.to_thread(
+        single_flight.submit, key, submit, is_finished
+    )
+    if submitted:
+        task_run_states.when_final(
+            task_run_id,
+            partial(single_flight.finished, key, task_run_id),
+            timeout=single_flight.ttl,
+        )
 
     # The ID of the task run is what we'll need to check the status of the task later,
     # so return it to the caller.  In other applications, you may store this ID in your
     # database along with other application objects.  This ID is not transient and will
     # exist on the Prefect API until the task run is deleted (either manually or via
     # the retention policies on Prefect Cloud).
-    return "", 202, {"Location": f"/answer/{answer.task_run_id}"}
+    return "", 202, {"Location": f"/answer/{task_run_id}"}
 
 
 @app.route("/answer/<task_run_id>", methods=["GET"])
 async def get_answer(task_run_id: str):
-    async with get_client() as client:
-        task_run = await client.read_task_run(UUID(task_run_id))
+    # Callers tend to poll this, so the task run may well have been read very recently,
+    # or may be being read right now for someone else
+    task_run = task_runs.read(UUID(task_run_id))
 
     # It's always possible that a task run has been removed
     if not task_run:
@@ -76,5 +111,83 @@ async def get_answer(task_run_id: str):
     # As with task parameters, it's important to note that the result data will never
     # be stored or seen by the Prefect API.
     result: PersistedResult = state.result()
+    answer: StoredAudio | bytes = await result.get()
+
+    # Runs from before `get_help` stored its audio separately returned the audio itself
+    if isinstance(answer, bytes):
+        return answer, 200, {"Content-Type": AUDIO_MIMETYPE}
+
+    # The result is only a reference to the audio, which we stream to the caller from
+    # storage, honoring `Range` and `If-None-Match` headers.  Audio is deleted when it's
+    # evicted from the `answer_cache`, so older answers may no longer be available.
+    try:
+        return await send_audio(answer)
+    except FileNotFoundError:
+        return "", 410
+
+
+@app.route("/answer-cache", methods=["GET"])
+def get_answer_cache_stats():
+    return answer_cache.stats()
+
+
+def read_get_help_state(task_run_id: UUID, fresh: bool = False) -> TaskRunState | None:
+    task_run = task_runs.read(task_run_id, fresh=fresh)
+
+    # As in `get_answer`, only report on the task runs of `get_help`
+    if not task_run or task_run.task_key != get_help.task_key:
+        return None
+
+    assert (state := task_run.state) is not None
+    return TaskRunState(type=state.type, name=state.name, message=state.message)
+
+
+@app.route("/answer/<task_run_id>/events", methods=["GET"])
+def stream_answer_states(task_run_id: str):
+    # Rather than having each caller poll `get_answer` until their answer is ready,
+    # callers can open a stream of Server-Sent Events here.  We send them each state
+    # the task run moves through as it happens, ending with a `completed` event once
+    # the answer is ready at `get_answer` (or a `failed` event).  Every stream in this
+    # process waits on the same subscription to the Prefect API's task run events.
+    id = UUID(task_run_id)
+    if not read_get_help_state(id):
+        return "", 404
 
-    return await result.get(), 200, {"Content-Type": "audio/mp3"}
+    def stream() -> Iterator[str]:
+        with task_run_states.watch(id) as watch:
+            seen = watch.version
+
+            # Read the state again now that we're watching, in case the run moved on
+            # in between
+            state = read_get_help_state(id, fresh=True)
+            reported = None
+
+            while state:
+                if state != reported:
+                    yield server_sent_event("state", {"state": state.name})
+                    reported = state
+
+                if state.type == StateType.COMPLETED:
+                    yield server_sent_event(
+                        "completed", {"location": f"/answer/{task_run_id}"}
+                    )
+                    return
+
+                if state.is_final:
+                    yield server_sent_event(
+                        "failed", {"state": state.name, "message": state.message}
+                    )
+                    return
+
+                version, changed = watch.wait(seen, timeout=KEEPALIVE_SECONDS)
+                if version > seen:
+                    seen, state = version, changed
+                else:
+                    yield ": keep-alive\n\n"
+                    state = read_get_help_state(id)
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -0,0 +1,108 @@
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from flask import Response, current_app, request, send_file
+from prefect.filesystems import LocalFileSystem, RemoteFileSystem, WritableFileSystem
+from prefect.results import get_default_result_storage
+from werkzeug.wsgi import wrap_file
+
+# Downloads are read from storage this many bytes at a time
+CHUNK_SIZE = 64 * 1024
+
+# Stored audio never changes once it's written, since it's keyed by its contents
+MAX_AGE_SECONDS = 24 * 60 * 60
+
+# The registered type for MP3 audio, which every answer is served as
+AUDIO_MIMETYPE = "audio/mpeg"
+
+
+@dataclass(frozen=True)
+class StoredAudio:
+    """A reference to audio that a task wrote to result storage on its own, as plain
+    bytes, so that it can be served in chunks rather than loaded whole from a
+    persisted result."""
+
+    key: str
+    size: int
+    sha256: str
+    mimetype: str = AUDIO_MIMETYPE
+
+
+def audio_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def store_audio(data: bytes, mimetype: str = AUDIO_MIMETYPE) -> StoredAudio:
+    """Writes `data` to the default result storage, which the task workers and the API
+    share, and returns a reference to it.  Identical audio is only stored once."""
+    sha256 = audio_sha256(data)
+    key = f"audio/{sha256}"
+
+    storage = await get_default_result_storage()
+    await storage.write_path(key, data)
+
+    return StoredAudio(key=key, size=len(data), sha256=sha256, mimetype=mimetype)
+
+
+def stored_path(storage: LocalFileSystem | RemoteFileSystem, key: str) -> str:
+    """Where `key` is kept under the storage's `basepath`, as its `read_path` and
+    `write_path` find it, for opening and deleting stored files directly."""
+    if isinstance(storage, LocalFileSystem):
+        basepath = Path(storage.basepath or ".").expanduser().resolve()
+        return str(basepath / key)
+    return f"{storage.basepath.rstrip('/')}/{key.lstrip('/')}"
+
+
+def delete_audio(storage: WritableFileSystem, audio: StoredAudio) -> None:
+    """Deletes stored audio from `storage`, if it supports deleting files."""
+    if isinstance(storage, LocalFileSystem):
+        Path(stored_path(storage, audio.key)).unlink(missing_ok=True)
+    elif isinstance(storage, RemoteFileSystem):
+        path = stored_path(storage, audio.key)
+        if storage.filesystem.exists(path):
+            storage.filesystem.rm(path)
+
+
+async def send_audio(audio: StoredAudio) -> Response:
+    """Responds with the stored audio, supporting `Range` requests so that players
+    can seek, and `ETag`s so that clients can cache it.  Only a chunk of the audio is
+    held in memory at a time."""
+    storage = await get_default_result_storage()
+
+    if isinstance(storage, LocalFileSystem):
+        # The WSGI server may send files from disk with `sendfile`, or even hand them
+        # to a proxy with `X-Sendfile` if `USE_X_SENDFILE` is configured
+        response = send_file(
+            stored_path(storage, audio.key),
+            mimetype=audio.mimetype,
+            download_name="answer.mp3",
+            etag=audio.sha256,
+            max_age=MAX_AGE_SECONDS,
+        )
+    elif isinstance(storage, RemoteFileSystem):
+        file = storage.filesystem.open(stored_path(storage, audio.key), "rb")
+        response = current_app.response_class(
+            wrap_file(request.environ, file, buffer_size=CHUNK_SIZE),
+            mimetype=audio.mimetype,
+            direct_passthrough=True,
+        )
+        response.content_length = audio.size
+        response.set_etag(audio.sha256)
+        response.cache_control.public = True
+        response.cache_control.max_age = MAX_AGE_SECONDS
+        response = response.make_conditional(
+            request, accept_ranges=True, complete_length=audio.size
+        )
+    else:
+        # Other storage can only read whole files, so at least support caching
+        response = current_app.response_class(
+            await storage.read_path(audio.key), mimetype=audio.mimetype
+        )
+        response.set_etag(audio.sha256)
+        response.cache_control.public = True
+        response.cache_control.max_age = MAX_AGE_SECONDS
+        response = response.make_conditional(request, accept_ranges=True)
+
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,203 @@
+import os
+import threading
+import time
+from typing import Callable, Protocol
+from uuid import UUID, uuid4
+
+import redis
+
+# While a caller is submitting the task run for a key, the key holds a pending marker,
+# which the caller refreshes until it's done, and which expires on its own if the
+# caller dies first
+PENDING = "pending:"
+PENDING_TTL_SECONDS = 10
+
+# How often callers check on a key that's pending
+POLL_SECONDS = 0.01
+
+
+class Store(Protocol):
+    """Where task runs in flight are recorded, shared by every API process."""
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        """Sets `key` to `value` only if it isn't set, returning whether it was."""
+
+    def get(self, key: str) -> str | None:
+        ...
+
+    def replace(self, key: str, old: str, new: str, ttl: float) -> bool:
+        """Sets `key` to `new` only if it is set to `old`, returning whether it was."""
+
+    def delete(self, key: str, value: str) -> None:
+        """Deletes `key` only if it is set to `value`."""
+
+
+class LocalStore:
+    """An in-memory `Store` for a single API process, or for tests."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: dict[str, tuple[str, float]] = {}
+
+    def _current(self, key: str) -> str | None:
+        # called with the lock held
+        if not (entry := self._values.get(key)):
+            return None
+        value, expires = entry
+        if expires <= time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        with self._lock:
+            if self._current(key) is not None:
+                return False
+            self._values[key] = value, time.monotonic() + ttl
+            return True
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            return self._current(key)
+
+    def replace(self, key: str, old: str, new: str, ttl: float) -> bool:
+        with self._lock:
+            if self._current(key) != old:
+                return False
+            self._values[key] = new, time.monotonic() + ttl
+            return True
+
+    def delete(self, key: str, value: str) -> None:
+        with self._lock:
+            if self._current(key) == value:
+                del self._values[key]
+
+
+class RedisStore:
+    """A `Store` in Redis, shared by every API replica."""
+
+    REPLACE = """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+        return redis.call("SET", KEYS[1], ARGV[2], "PX", ARGV[3])
+    end
+    """
+
+    DELETE = """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+        return redis.call("DEL", KEYS[1])
+    end
+    """
+
+    def __init__(self, client: redis.Redis, prefix: str = "single-flight:"):
+        self._client = client
+        self._prefix = prefix
+        self._replace = client.register_script(self.REPLACE)
+        self._delete = client.register_script(self.DELETE)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisStore":
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        return bool(
+            self._client.set(self._prefix + key, value, px=int(ttl * 1000), nx=True)
+        )
+
+    def get(self, key: str) -> str | None:
+        return self._client.get(self._prefix + key)
+
+    def replace(self, key: str, old: str, new: str, ttl: float) -> bool:
+        return bool(
+            self._replace(keys=[self._prefix + key], args=[old, new, int(ttl * 1000)])
+        )
+
+    def delete(self, key: str, value: str) -> None:
+        self._delete(keys=[self._prefix + key], args=[value])
+
+
+class SingleFlight:
+    """Makes sure that only one task run is in flight for a key at a time.
+
+    The first caller for a key submits the task run, while any others that arrive
+    before it finishes get the same task run's ID.  Entries last until the task run
+    finishes, at which point `finished` should be called, or until `ttl` seconds have
+    passed in case that never happens.
+    """
+
+    def __init__(self, store: Store, ttl: float):
+        self.store = store
+        self.ttl = ttl
+
+    def submit(
+        self,
+        key: str,
+        submit: Callable[[], UUID],
+        is_finished: Callable[[UUID], bool],
+    ) -> tuple[UUID, bool]:
+        """Returns the ID of the task run in flight for `key`, calling `submit` to
+        start one if there isn't one, along with whether this call started it.
+        `is_finished` double checks task runs that may have finished without the
+        entry being removed."""
+        pending = f"{PENDING}{uuid4().hex}"
+
+        while not self.store.add(key, pending, PENDING_TTL_SECONDS):
+            if (current := self.store.get(key)) is None:
+                continue
+
+            if current.startswith(PENDING):
+                # Someone else is submitting it right now
+                time.sleep(POLL_SECONDS)
+                continue
+
+            task_run_id = UUID(current)
+            if not is_finished(task_run_id):
+                return task_run_id, False
+
+            # The entry outlived its task run, so take it over
+            if self.store.replace(key, current, pending, PENDING_TTL_SECONDS):
+                break
+
+        submitted = threading.Event()
+
+        def keep_pending() -> None:
+            # However long submitting takes, the marker is only left to expire if the
+            # caller dies
+            while not submitted.wait(PENDING_TTL_SECONDS / 3):
+                if not self.store.replace(key, pending, pending, PENDING_TTL_SECONDS):
+                    return
+
+        keeper = threading.Thread(target=keep_pending, daemon=True)
+        keeper.start()
+        try:
+            task_run_id = submit()
+        except BaseException:
+            self.store.delete(key, pending)
+            raise
+        finally:
+            submitted.set()
+            keeper.join()
+
+        while not self.store.replace(key, pending, str(task_run_id), self.ttl):
+            # The marker was lost anyway, like when the store was too slow to refresh
+            # it, so whoever took the key over has the task run that others get
+            if (current := self.store.get(key)) is None:
+                if self.store.add(key, str(task_run_id), self.ttl):
+                    break
+            elif current.startswith(PENDING):
+                time.sleep(POLL_SECONDS)
+            else:
+                return UUID(current), False
+        return task_run_id, True
+
+    def finished(self, key: str, task_run_id: UUID) -> None:
+        self.store.delete(key, str(task_run_id))
+
+
+single_flight = SingleFlight(
+    store=(
+        RedisStore.from_url(url)
+        if (url := os.environ.get("SINGLE_FLIGHT_REDIS_URL"))
+        else LocalStore()
+    ),
+    ttl=float(os.environ.get("SINGLE_FLIGHT_TTL_SECONDS", 10 * 60)),
+)
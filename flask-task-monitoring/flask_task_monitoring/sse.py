@@ -0,0 +1,25 @@
+import json
+from typing import Any, AsyncGenerator
+
+from httpx import Response
+
+
+def server_sent_event(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def server_sent_events(
+    response: Response,
+) -> AsyncGenerator[tuple[str, dict[str, Any]], None]:
+    """Yields the events of a `text/event-stream` response as they arrive, skipping
+    comments like the API's keep-alives."""
+    event, data = "message", ""
+    async for line in response.aiter_lines():
+        if not line:
+            if data:
+                yield event, json.loads(data)
+            event, data = "message", ""
+        elif line.startswith("event:"):
+            event = line.removeprefix("event:").strip()
+        elif line.startswith("data:"):
+            data += line.removeprefix("data:").strip()
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator
+from uuid import UUID
+
+from prefect.client.schemas.objects import TERMINAL_STATES, StateType
+from prefect.events import Event
+from prefect.events.clients import get_events_subscriber
+from prefect.events.filters import EventFilter, EventNameFilter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TaskRunState:
+    type: StateType
+    name: str
+    message: str | None = None
+
+    @property
+    def is_final(self) -> bool:
+        # the same states as Prefect's `State.is_final()`, cancelled ones included
+        return self.type in TERMINAL_STATES
+
+
+class Watch:
+    """The latest known state of one task run, which any number of requests can wait
+    on for the next change."""
+
+    def __init__(self, lock: threading.Lock):
+        self._changed = threading.Condition(lock)
+        self.version = 0
+        self.state: TaskRunState | None = None
+        self.occurred: datetime | None = None
+        self.watchers = 0
+
+    def _update(self, state: TaskRunState, occurred: datetime) -> None:
+        # called with the lock held
+        if self.state and self.state.is_final:
+            return
+        if self.occurred and occurred < self.occurred:
+            # events can arrive out of order, so a late one may be stale
+            return
+        self.version += 1
+        self.state = state
+        self.occurred = occurred
+        self._changed.notify_all()
+
+    def wait(self, seen: int, timeout: float) -> tuple[int, TaskRunState | None]:
+        """Waits up to `timeout` seconds for a state newer than version `seen`,
+        returning the latest version and state either way."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > seen, timeout)
+            return self.version, self.state
+
+
+class TaskRunStates:
+    """A single subscription to the Prefect API's task run state events, shared by
+    every request in this process that is waiting on a task run.
+
+    Flask runs each request on its own thread (and each async view on its own event
+    loop), so the subscription runs on a background thread with its own event loop,
+    and requests block on a `Watch` for the task run they are interested in.  Events
+    for task runs nobody is watching are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._watches: dict[UUID, Watch] = {}
+        self._when_final: dict[UUID, tuple[float, list[Callable[[], None]]]] = {}
+        self._subscriber: threading.Thread | None = None
+
+    @contextmanager
+    def watch(self, task_run_id: UUID) -> Iterator[Watch]:
+        self._ensure_subscribed()
+
+        with self._lock:
+            if not (watch := self._watches.get(task_run_id)):
+                watch = self._watches[task_run_id] = Watch(self._lock)
+            watch.watchers += 1
+        try:
+            yield watch
+        finally:
+            with self._lock:
+                watch.watchers -= 1
+                if not watch.watchers:
+                    del self._watches[task_run_id]
+
+    def when_final(
+        self, task_run_id: UUID, callback: Callable[[], None], timeout: float
+    ) -> None:
+        """Calls `callback` once the task run reaches a final state, if this process
+        hears about it within `timeout` seconds."""
+        self._ensure_subscribed()
+
+        now = time.monotonic()
+        with self._lock:
+            # Forget about task runs we must have missed the final state of
+            for id, (expires, _) in list(self._when_final.items()):
+                if expires <= now:
+                    del self._when_final[id]
+
+            _, callbacks = self._when_final.setdefault(task_run_id, (now + timeout, []))
+            callbacks.append(callback)
+
+    def _ensure_subscribed(self) -> None:
+        with self._lock:
+            if self._subscriber and self._subscriber.is_alive():
+                return
+            self._subscriber = threading.Thread(
+                target=asyncio.run,
+                args=(self._subscribe(),),
+                name="task-run-states",
+                daemon=True,
+            )
+            self._subscriber.start()
+
+    async def _subscribe(self) -> None:
+        filter = EventFilter(event=EventNameFilter(prefix=["prefect.task-run."]))
+        while True:
+            try:
+                async with get_events_subscriber(filter=filter) as subscriber:
+                    async for event in subscriber:
+                        try:
+                            self._publish(event)
+                        except Exception:
+                            logger.exception("Failed to publish event %s", event.id)
+            except Exception:
+                # Waiting requests fall back to reading the task run from the API
+                # while we're disconnected, so just keep trying to reconnect
+                logger.exception("Lost the task run state subscription, reconnecting")
+                await asyncio.sleep(1)
+
+    def _publish(self, event: Event) -> None:
+        prefix, _, task_run_id = event.resource.id.rpartition(".")
+        if prefix != "prefect.task-run":
+            return
+
+        id = UUID(task_run_id)
+        with self._lock:
+            watch = self._watches.get(id)
+            if not watch and id not in self._when_final:
+                return
+
+            validated = event.payload.get("validated_state")
+            if not isinstance(validated, dict) or not validated.get("type"):
+                logger.debug("Skipping event %s without a validated state", event.id)
+                return
+            state = TaskRunState(
+                type=StateType(validated["type"]),
+                name=validated.get("name") or "",
+                message=validated.get("message"),
+            )
+            if watch:
+                watch._update(state, event.occurred)
+
+            callbacks = []
+            if state.is_final and id in self._when_final:
+                _, callbacks = self._when_final.pop(id)
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Failed to handle task run %s finishing", id)
+
+
+task_run_states = TaskRunStates()
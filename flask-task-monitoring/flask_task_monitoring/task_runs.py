@@ -0,0 +1,122 @@
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from uuid import UUID
+
+from prefect.client.orchestration import SyncPrefectClient, get_client
+from prefect.client.schemas.objects import TaskRun
+from prefect.exceptions import ObjectNotFound
+
+_client: SyncPrefectClient | None = None
+_client_lock = threading.Lock()
+
+
+def prefect_client() -> SyncPrefectClient:
+    """The Prefect client that this whole process shares.
+
+    Flask runs each async view on an event loop of its own, which an async client
+    can't be shared between, so this is a synchronous client, which any thread can
+    use.  It's opened the first time it's needed and closed when the process exits.
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            client = get_client(sync_client=True)
+            client.__enter__()
+            atexit.register(client.__exit__, None, None, None)
+            _client = client
+        return _client
+
+
+@dataclass
+class Entry:
+    task_run: TaskRun | None
+    expires: float
+
+
+class TaskRunCache:
+    """Recently read task runs, so that many requests for the same task run within a
+    short time are answered with a single read from the Prefect API.
+
+    Task runs are cached for `ttl` seconds, or for `final_ttl` seconds once they're in
+    a final state, since those don't change.  While a task run is being read, other
+    requests for it wait for that read rather than starting their own.
+    """
+
+    def __init__(self, ttl: float, final_ttl: float, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.final_ttl = final_ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries: dict[UUID, Entry] = {}
+        self._reads: dict[UUID, Future[TaskRun | None]] = {}
+
+    def read(self, task_run_id: UUID, fresh: bool = False) -> TaskRun | None:
+        """Returns the task run, or `None` if there isn't one.  With `fresh`, the
+        task run is always read from the Prefect API."""
+        with self._lock:
+            entry = self._entries.get(task_run_id)
+            if not fresh and entry and entry.expires > time.monotonic():
+                return entry.task_run
+
+            read = None if fresh else self._reads.get(task_run_id)
+            if not read:
+                read = self._reads[task_run_id] = Future()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            return read.result()
+
+        try:
+            task_run = self._read(task_run_id)
+        except BaseException as exc:
+            with self._lock:
+                if self._reads.get(task_run_id) is read:
+                    del self._reads[task_run_id]
+            read.set_exception(exc)
+            raise
+
+        with self._lock:
+            self._store(task_run_id, task_run)
+            if self._reads.get(task_run_id) is read:
+                del self._reads[task_run_id]
+        read.set_result(task_run)
+
+        return task_run
+
+    def _read(self, task_run_id: UUID) -> TaskRun | None:
+        try:
+            return prefect_client().read_task_run(task_run_id)
+        except ObjectNotFound:
+            return None
+
+    def _store(self, task_run_id: UUID, task_run: TaskRun | None) -> None:
+        # called with the lock held
+        now = time.monotonic()
+        if len(self._entries) >= self.max_entries:
+            self._entries = {
+                id: entry for id, entry in self._entries.items() if entry.expires > now
+            }
+            # If everything is still fresh, make room by dropping the oldest entries
+            while len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+        final = task_run and task_run.state and task_run.state.is_final()
+        self._entries.pop(task_run_id, None)
+        self._entries[task_run_id] = Entry(
+            task_run=task_run,
+            expires=now + (self.final_ttl if final else self.ttl),
+        )
+
+
+task_runs = TaskRunCache(
+    ttl=float(os.environ.get("TASK_RUN_CACHE_TTL_SECONDS", 0.5)),
+    final_ttl=float(os.environ.get("TASK_RUN_CACHE_FINAL_TTL_SECONDS", 5 * 60)),
+)
@@ -1,13 +1,27 @@
+import asyncio
+import os
 import random
-from datetime import timedelta
+from functools import partial
 
 import marvin
 from prefect import task
+from prefect.cache_policies import NONE
+from prefect.results import get_default_result_storage
 from prefect.task_worker import serve
 
+from .answer_cache import answer_cache
+from .audio import StoredAudio, audio_sha256, delete_audio, store_audio
 
+# In speculative mode, `get_help` starts writing both an answer and a retort while
+# it's still classifying the question, and keeps whichever one fits the tone.  This
+# saves the time of one LLM call for every question, at the cost of another.
+SPECULATIVE = os.environ.get("GET_HELP_SPECULATIVE", "").lower() in ("1", "true")
+
+
+# These are async functions so that calling them doesn't block the task worker's event
+# loop, which would hold up every other task the worker is running.
 @marvin.fn
-def answer(question: str) -> str:  # noqa F821 # type: ignore
+async def answer(question: str) -> str:  # noqa F821 # type: ignore
     """
     Answer the given `question` in a truthful and helpful way, returning up to two
     lines of dialogue.  If the question includes a compliment, thank the asker in a
@@ -16,7 +30,7 @@ def answer(question: str) -> str:  # noqa F821 # type: ignore
 
 
 @marvin.fn
-def retort(question: str) -> str:  # noqa F821 # type: ignore
+async def retort(question: str) -> str:  # noqa F821 # type: ignore
     """
     Return a retort to the given `question` in a sarcastic or otherwise unhelpful way,
     and optionally scold the person for being mean.  Definitely do not answer the
@@ -24,33 +38,75 @@ def retort(question: str) -> str:  # noqa F821 # type: ignore
     """
 
 
+async def classify(question: str) -> str:
+    return await marvin.classify_async(question, labels=["nice", "neutral", "hostile"])
+
+
+async def reply_to(question: str) -> str:
+    if await classify(question) == "hostile":
+        return await retort(question)
+    return await answer(question)
+
+
+async def reply_speculatively(question: str) -> str:
+    classifying = asyncio.create_task(classify(question))
+    answering = asyncio.create_task(answer(question))
+    retorting = asyncio.create_task(retort(question))
+    try:
+        if await classifying == "hostile":
+            answering.cancel()
+            return await retorting
+        retorting.cancel()
+        return await answering
+    finally:
+        # If anything failed (or we were cancelled), don't leave any calls running
+        calls = (classifying, answering, retorting)
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+
+
 @task(
     # This task will be retried up to 10 times, with a 1 second delay between retries.
     # https://docs.prefect.io/latest/concepts/tasks/#retries
     retries=10,
     retry_delay_seconds=1,
-    # Results of this task will be cached for 60 seconds, and the cache key will be
-    # determined by the parameters to the task.  This means that if the same question is
-    # asked multiple times within a minute, the same results will be returned without
-    # making API calls to the LLM.
+    # Rather than Prefect's caching, which is keyed on the exact question, answers are
+    # cached in the `answer_cache`, keyed on the normalized question.  This means that
+    # if the same question is asked again, even with different capitalization or
+    # punctuation, the same answer will be returned without making API calls to the LLM.
     persist_result=True,
-    cache_expiration=timedelta(seconds=60),
+    cache_policy=NONE,
 )
-async def get_help(question: str) -> bytes:
-    tone = await marvin.classify_async(question, labels=["nice", "neutral", "hostile"])
-    if tone == "hostile":
-        reply = retort(question)
+async def get_help(question: str) -> StoredAudio:
+    if cached := await asyncio.to_thread(answer_cache.get, question):
+        return cached
+
+    if SPECULATIVE:
+        reply = await reply_speculatively(question)
     else:
-        reply = answer(question)
+        reply = await reply_to(question)
 
     if random.random() < 0.2:
         raise ValueError("Randomly failing, this should be retried")
 
     audio = await marvin.speak_async(reply)
 
-    # The return value of this task are the bytes of the audio file, which
-    # encode in MP3 format.
-    return audio.data
+    # The audio, in MP3 format, is written to the result storage as a plain file of
+    # its own, and the return value of this task is just a reference to it.  This
+    # keeps the persisted result tiny, and lets the API stream the audio to callers
+    # in chunks rather than loading the whole thing from the result first.  Identical
+    # replies are stored only once, so the audio is pinned until it's cached, lest
+    # another worker deletes it when the last answer that also used it is evicted.
+    pin = await asyncio.to_thread(answer_cache.pin, audio_sha256(audio.data))
+    stored = await store_audio(audio.data)
+
+    storage = await get_default_result_storage()
+    await asyncio.to_thread(
+        answer_cache.put, question, stored, partial(delete_audio, storage), pin
+    )
+
+    return stored
 
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+from pathlib import Path
+
+import pytest
+
+from flask_task_monitoring.answer_cache import AnswerCache, normalize_question
+from flask_task_monitoring.audio import StoredAudio
+
+
+def audio(sha256: str, size: int = 100) -> StoredAudio:
+    return StoredAudio(key=f"audio/{sha256}", size=size, sha256=sha256)
+
+
+@pytest.fixture
+def deleted() -> list[StoredAudio]:
+    return []
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> AnswerCache:
+    return AnswerCache(path=tmp_path / "answer-cache.sqlite3", max_bytes=300, ttl=60)
+
+
+def test_normalizing_questions() -> None:
+    assert normalize_question("  What's the   TIME?! ") == "whats the time"
+    assert normalize_question("What’s the time") == "whats the time"
+    assert normalize_question("ｗｈａｔ time, please") == "what time please"
+    assert AnswerCache.key("What time is it?") == AnswerCache.key("what time is it")
+    assert AnswerCache.key("What time is it?") != AnswerCache.key("What time was it?")
+
+
+def test_answers_are_shared_by_normalized_questions(
+    cache: AnswerCache, deleted: list[StoredAudio]
+) -> None:
+    cache.put("What time is it?", audio("a"), deleted.append)
+
+    assert cache.get("what time is it") == audio("a")
+    assert cache.get("What day is it?") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_answers_expire(
+    cache: AnswerCache, deleted: list[StoredAudio], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_time(monkeypatch, 0)
+    cache.put("first", audio("a"), deleted.append)
+    assert cache.get("first")
+
+    cache_time(monkeypatch, 61)
+    assert cache.get("first") is None
+
+    # expired answers are removed, and their audio deleted, as others are added
+    cache.put("second", audio("b"), deleted.append)
+    assert deleted == [audio("a")]
+
+
+def test_least_recently_used_answers_are_evicted_past_max_bytes(
+    cache: AnswerCache, deleted: list[StoredAudio], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_time(monkeypatch, 0)
+    cache.put("first", audio("a"), deleted.append)
+    cache_time(monkeypatch, 1)
+    cache.put("second", audio("b"), deleted.append)
+    cache_time(monkeypatch, 2)
+    cache.put("third", audio("c"), deleted.append)
+
+    # using the first answer makes the second the least recently used
+    cache_time(monkeypatch, 3)
+    assert cache.get("first")
+
+    cache_time(monkeypatch, 4)
+    cache.put("fourth", audio("d"), deleted.append)
+
+    assert deleted == [audio("b")]
+    assert cache.get("second") is None
+    assert cache.stats()["bytes"] == 300
+    assert cache.stats()["evictions"] == 1
+
+
+def test_shared_audio_is_deleted_with_its_last_answer(
+    cache: AnswerCache, deleted: list[StoredAudio]
+) -> None:
+    cache.put("first", audio("a"), deleted.append)
+    cache.put("second", audio("a"), deleted.append)
+    assert cache.stats()["answers"] == 1
+    assert cache.stats()["bytes"] == 100
+
+    cache.put("first", audio("b"), deleted.append)
+    assert not deleted
+
+    cache.put("second", audio("c"), deleted.append)
+    assert deleted == [audio("a")]
+
+
+def test_pinned_audio_is_not_deleted(
+    cache: AnswerCache, deleted: list[StoredAudio]
+) -> None:
+    cache.put("first", audio("a"), deleted.append)
+
+    # another worker is about to store the same audio for another question
+    pin = cache.pin("a")
+    cache.put("first", audio("b"), deleted.append)
+    assert not deleted
+
+    cache.put("second", audio("a"), deleted.append, pin)
+    assert cache.get("second") == audio("a")
+
+    cache.put("second", audio("c"), deleted.append)
+    assert deleted == [audio("a")]
+
+
+def test_pins_are_released_by_their_own_holders(
+    cache: AnswerCache, deleted: list[StoredAudio]
+) -> None:
+    # two workers are about to store the same audio
+    first = cache.pin("a")
+    cache.pin("a")
+
+    cache.put("first", audio("a"), deleted.append, first)
+    cache.put("first", audio("b"), deleted.append)
+    assert not deleted
+
+
+def test_pins_expire(
+    cache: AnswerCache, deleted: list[StoredAudio], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_time(monkeypatch, 0)
+    cache.put("first", audio("a"), deleted.append)
+    # the worker died before putting its audio
+    cache.pin("a")
+
+    cache_time(monkeypatch, 3601)
+    cache.put("first", audio("b"), deleted.append)
+    assert deleted == [audio("a")]
+
+
+def cache_time(monkeypatch: pytest.MonkeyPatch, now: float) -> None:
+    monkeypatch.setattr("flask_task_monitoring.answer_cache.time.time", lambda: now)
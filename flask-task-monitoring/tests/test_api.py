@@ -0,0 +1,113 @@
+from typing import Iterator
+from uuid import uuid4
+
+import pytest
+from flask.testing import FlaskClient
+from prefect.events import Event
+
+from flask_task_monitoring import api
+from flask_task_monitoring.sse import server_sent_event
+from flask_task_monitoring.states import StateType, TaskRunState, TaskRunStates
+
+PENDING = TaskRunState(StateType.PENDING, "Pending")
+RUNNING = TaskRunState(StateType.RUNNING, "Running")
+COMPLETED = TaskRunState(StateType.COMPLETED, "Completed")
+FAILED = TaskRunState(StateType.FAILED, "Failed", "Rate limited")
+CANCELLED = TaskRunState(StateType.CANCELLED, "Cancelled", "Cancelled by the user")
+
+
+@pytest.fixture
+def states(monkeypatch: pytest.MonkeyPatch) -> TaskRunStates:
+    # events are published to it directly, rather than subscribed to from the API
+    monkeypatch.setattr(TaskRunStates, "_ensure_subscribed", lambda self: None)
+    states = TaskRunStates()
+    monkeypatch.setattr(api, "task_run_states", states)
+    return states
+
+
+@pytest.fixture
+def client() -> FlaskClient:
+    return api.app.test_client()
+
+
+def publish(states: TaskRunStates, task_run_id: str, state: TaskRunState) -> None:
+    validated = {"type": state.type.value, "name": state.name, "message": state.message}
+    states._publish(
+        Event(
+            event=f"prefect.task-run.{state.name}",
+            resource={"prefect.resource.id": f"prefect.task-run.{task_run_id}"},
+            payload={"validated_state": validated},
+        )
+    )
+
+
+def stream(
+    client: FlaskClient, monkeypatch: pytest.MonkeyPatch, task_run_id: str
+) -> Iterator[str]:
+    """Opens the task run's event stream, starting from `PENDING`, and yields each
+    chunk as it's sent."""
+    monkeypatch.setattr(api, "read_get_help_state", lambda id, fresh=False: PENDING)
+    response = client.get(f"/answer/{task_run_id}/events")
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    return (chunk.decode() for chunk in response.iter_encoded())
+
+
+def test_streams_send_each_state_until_the_answer_is_ready(
+    client: FlaskClient, states: TaskRunStates, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    id = str(uuid4())
+    chunks = stream(client, monkeypatch, id)
+    assert next(chunks) == server_sent_event("state", {"state": "Pending"})
+
+    publish(states, id, RUNNING)
+    assert next(chunks) == server_sent_event("state", {"state": "Running"})
+
+    publish(states, id, COMPLETED)
+    assert list(chunks) == [
+        server_sent_event("state", {"state": "Completed"}),
+        server_sent_event("completed", {"location": f"/answer/{id}"}),
+    ]
+
+
+@pytest.mark.parametrize("final", [FAILED, CANCELLED])
+def test_streams_end_when_the_task_run_fails(
+    client: FlaskClient,
+    states: TaskRunStates,
+    monkeypatch: pytest.MonkeyPatch,
+    final: TaskRunState,
+) -> None:
+    id = str(uuid4())
+    chunks = stream(client, monkeypatch, id)
+    assert next(chunks) == server_sent_event("state", {"state": "Pending"})
+
+    publish(states, id, final)
+    assert list(chunks) == [
+        server_sent_event("state", {"state": final.name}),
+        server_sent_event("failed", {"state": final.name, "message": final.message}),
+    ]
+
+
+def test_streams_are_kept_alive_while_the_state_is_unchanged(
+    client: FlaskClient, states: TaskRunStates, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(api, "KEEPALIVE_SECONDS", 0.01)
+    id = str(uuid4())
+    chunks = stream(client, monkeypatch, id)
+    assert next(chunks) == server_sent_event("state", {"state": "Pending"})
+    assert next(chunks) == ": keep-alive\n\n"
+
+    # a missed event is caught by reading the task run again
+    monkeypatch.setattr(api, "read_get_help_state", lambda id, fresh=False: COMPLETED)
+    assert list(chunks) == [
+        server_sent_event("state", {"state": "Completed"}),
+        server_sent_event("completed", {"location": f"/answer/{id}"}),
+    ]
+
+
+def test_streams_for_unknown_task_runs_are_not_found(
+    client: FlaskClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(api, "read_get_help_state", lambda id, fresh=False: None)
+
+    assert client.get(f"/answer/{uuid4()}/events").status_code == 404
@@ -0,0 +1,103 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from prefect.filesystems import LocalFileSystem, RemoteFileSystem
+
+from flask_task_monitoring import audio
+from flask_task_monitoring.audio import (
+    StoredAudio,
+    delete_audio,
+    send_audio,
+    store_audio,
+    stored_path,
+)
+
+DATA = bytes(range(256)) * 4
+
+Storage = LocalFileSystem | RemoteFileSystem
+
+
+@pytest.fixture(params=["local", "remote"])
+def storage(
+    request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Storage:
+    storage: Storage
+    if request.param == "local":
+        storage = LocalFileSystem(basepath=str(tmp_path / "storage"))
+    else:
+        storage = RemoteFileSystem(basepath=f"memory://{tmp_path.name}/storage")
+
+    async def get_default_result_storage() -> Storage:
+        return storage
+
+    monkeypatch.setattr(audio, "get_default_result_storage", get_default_result_storage)
+    return storage
+
+
+@pytest.fixture
+def stored(storage: Storage) -> StoredAudio:
+    return asyncio.run(store_audio(DATA))
+
+
+@pytest.fixture
+def client(stored: StoredAudio) -> FlaskClient:
+    app = Flask(__name__)
+
+    @app.route("/audio")
+    async def get_audio():
+        return await send_audio(stored)
+
+    return app.test_client()
+
+
+def read(storage: Storage, key: str) -> bytes:
+    if isinstance(storage, LocalFileSystem):
+        return Path(stored_path(storage, key)).read_bytes()
+    return storage.filesystem.cat(stored_path(storage, key))
+
+
+def test_stored_paths_are_where_storage_writes(storage: Storage) -> None:
+    storage.write_path("audio/abc", b"some audio")
+
+    assert read(storage, "audio/abc") == b"some audio"
+
+
+def test_sending_audio(client: FlaskClient, stored: StoredAudio) -> None:
+    response = client.get("/audio")
+
+    assert response.status_code == 200
+    assert response.data == DATA
+    assert response.mimetype == "audio/mpeg"
+    assert response.headers["ETag"] == f'"{stored.sha256}"'
+    assert response.cache_control.immutable
+
+
+def test_sending_ranges_of_audio(client: FlaskClient) -> None:
+    response = client.get("/audio", headers={"Range": "bytes=100-299"})
+
+    assert response.status_code == 206
+    assert response.data == DATA[100:300]
+    assert response.headers["Content-Range"] == f"bytes 100-299/{len(DATA)}"
+
+
+def test_audio_clients_already_have_is_not_sent_again(
+    client: FlaskClient, stored: StoredAudio
+) -> None:
+    response = client.get("/audio", headers={"If-None-Match": f'"{stored.sha256}"'})
+
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_deleting_audio(storage: Storage, stored: StoredAudio) -> None:
+    assert read(storage, stored.key) == DATA
+
+    delete_audio(storage, stored)
+    with pytest.raises(FileNotFoundError):
+        read(storage, stored.key)
+
+    # deleting it again is fine
+    delete_audio(storage, stored)
@@ -0,0 +1,165 @@
+import threading
+import time
+from uuid import UUID, uuid4
+
+import pytest
+
+from flask_task_monitoring.single_flight import PENDING, LocalStore, SingleFlight
+
+
+@pytest.fixture
+def single_flight() -> SingleFlight:
+    return SingleFlight(store=LocalStore(), ttl=60)
+
+
+def never_finished(task_run_id: UUID) -> bool:
+    return False
+
+
+def test_concurrent_callers_share_one_task_run(single_flight: SingleFlight) -> None:
+    submitted: list[UUID] = []
+    submitting = threading.Event()
+    results: list[tuple[UUID, bool]] = []
+
+    def submit() -> UUID:
+        submitting.set()
+        # hold the key pending while everyone else arrives
+        time.sleep(0.1)
+        submitted.append(task_run_id := uuid4())
+        return task_run_id
+
+    def ask() -> None:
+        results.append(single_flight.submit("question", submit, never_finished))
+
+    first = threading.Thread(target=ask)
+    first.start()
+    assert submitting.wait(5)
+
+    others = [threading.Thread(target=ask) for _ in range(5)]
+    for thread in others:
+        thread.start()
+    for thread in [first, *others]:
+        thread.join(5)
+
+    assert len(submitted) == 1
+    assert sorted(results, key=lambda r: not r[1]) == [
+        (submitted[0], True),
+        *[(submitted[0], False)] * 5,
+    ]
+
+
+def test_finished_task_runs_are_taken_over(single_flight: SingleFlight) -> None:
+    first, second = uuid4(), uuid4()
+    assert single_flight.submit("question", lambda: first, never_finished) == (
+        first,
+        True,
+    )
+
+    # the task run finished without `finished` being called
+    finished = {first}
+    assert single_flight.submit(
+        "question", lambda: second, lambda id: id in finished
+    ) == (second, True)
+    assert single_flight.store.get("question") == str(second)
+
+
+def test_finished_entries_are_removed(single_flight: SingleFlight) -> None:
+    first, second = uuid4(), uuid4()
+    single_flight.submit("question", lambda: first, never_finished)
+    single_flight.finished("question", first)
+
+    assert single_flight.store.get("question") is None
+    assert single_flight.submit("question", lambda: second, never_finished) == (
+        second,
+        True,
+    )
+
+
+def test_pending_markers_expire(single_flight: SingleFlight) -> None:
+    # a caller died while submitting
+    single_flight.store.add("question", f"{PENDING}dead", 0.05)
+
+    task_run_id = uuid4()
+    assert single_flight.submit("question", lambda: task_run_id, never_finished) == (
+        task_run_id,
+        True,
+    )
+
+
+def test_failed_submissions_release_the_key(single_flight: SingleFlight) -> None:
+    def submit() -> UUID:
+        raise RuntimeError("The Prefect API is down")
+
+    with pytest.raises(RuntimeError):
+        single_flight.submit("question", submit, never_finished)
+    assert single_flight.store.get("question") is None
+
+    task_run_id = uuid4()
+    assert single_flight.submit("question", lambda: task_run_id, never_finished) == (
+        task_run_id,
+        True,
+    )
+
+
+def test_pending_markers_outlive_slow_submissions(
+    single_flight: SingleFlight, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("flask_task_monitoring.single_flight.PENDING_TTL_SECONDS", 0.05)
+    submitted: list[UUID] = []
+    submitting = threading.Event()
+
+    def submit() -> UUID:
+        submitting.set()
+        # much longer than the pending marker lasts unless it's refreshed
+        time.sleep(0.3)
+        submitted.append(task_run_id := uuid4())
+        return task_run_id
+
+    first = threading.Thread(
+        target=single_flight.submit, args=("question", submit, never_finished)
+    )
+    first.start()
+    assert submitting.wait(5)
+    time.sleep(0.1)
+
+    assert single_flight.submit("question", submit, never_finished) == (
+        submitted[0],
+        False,
+    )
+    first.join(5)
+    assert len(submitted) == 1
+
+
+def test_lost_pending_markers_defer_to_whoever_took_the_key(
+    single_flight: SingleFlight,
+) -> None:
+    winner = uuid4()
+
+    def submit() -> UUID:
+        # the pending marker was lost, and someone else submitted in the meantime
+        pending = single_flight.store.get("question")
+        assert pending and pending.startswith(PENDING)
+        single_flight.store.delete("question", pending)
+        single_flight.store.add("question", str(winner), 60)
+        return uuid4()
+
+    assert single_flight.submit("question", submit, never_finished) == (winner, False)
+    assert single_flight.store.get("question") == str(winner)
+
+
+def test_lost_pending_markers_are_taken_back_if_no_one_else_did(
+    single_flight: SingleFlight,
+) -> None:
+    task_run_id = uuid4()
+
+    def submit() -> UUID:
+        pending = single_flight.store.get("question")
+        assert pending
+        single_flight.store.delete("question", pending)
+        return task_run_id
+
+    assert single_flight.submit("question", submit, never_finished) == (
+        task_run_id,
+        True,
+    )
+    assert single_flight.store.get("question") == str(task_run_id)
@@ -0,0 +1,27 @@
+import httpx
+import pytest
+
+from flask_task_monitoring.sse import server_sent_event, server_sent_events
+
+
+@pytest.mark.asyncio
+async def test_events_are_read_as_they_were_sent() -> None:
+    response = httpx.Response(
+        200,
+        content="".join(
+            [
+                server_sent_event("state", {"state": "Pending"}),
+                ": keep-alive\n\n",
+                server_sent_event("state", {"state": "Running"}),
+                'data: {"no": "event"}\n\n',
+                server_sent_event("completed", {"location": "/answer/1"}),
+            ]
+        ).encode(),
+    )
+
+    assert [event async for event in server_sent_events(response)] == [
+        ("state", {"state": "Pending"}),
+        ("state", {"state": "Running"}),
+        ("message", {"no": "event"}),
+        ("completed", {"location": "/answer/1"}),
+    ]
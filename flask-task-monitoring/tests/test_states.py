@@ -0,0 +1,116 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import pytest
+from prefect.events import Event
+
+from flask_task_monitoring.states import StateType, TaskRunState, TaskRunStates
+
+NOW = datetime(2024, 8, 1, tzinfo=timezone.utc)
+
+
+def event(
+    task_run_id: UUID, type: str, name: str, occurred: datetime = NOW, **payload
+) -> Event:
+    return Event(
+        occurred=occurred,
+        event=f"prefect.task-run.{name}",
+        resource={"prefect.resource.id": f"prefect.task-run.{task_run_id}"},
+        payload=payload or {"validated_state": {"type": type, "name": name}},
+    )
+
+
+@pytest.fixture
+def states(monkeypatch: pytest.MonkeyPatch) -> TaskRunStates:
+    # events are published to it directly, rather than subscribed to from the API
+    monkeypatch.setattr(TaskRunStates, "_ensure_subscribed", lambda self: None)
+    return TaskRunStates()
+
+
+def test_states_fan_out_to_every_waiter(states: TaskRunStates) -> None:
+    id = uuid4()
+    results: list[tuple[int, TaskRunState | None]] = []
+
+    with states.watch(id) as watch, states.watch(id) as same:
+        assert watch is same
+        waiters = [
+            threading.Thread(target=lambda: results.append(watch.wait(0, 5)))
+            for _ in range(3)
+        ]
+        for waiter in waiters:
+            waiter.start()
+
+        states._publish(event(id, "RUNNING", "Running"))
+        for waiter in waiters:
+            waiter.join(5)
+
+    assert results == [(1, TaskRunState(StateType.RUNNING, "Running"))] * 3
+
+
+def test_final_states_are_delivered(states: TaskRunStates) -> None:
+    id = uuid4()
+    finished: list[UUID] = []
+    states.when_final(id, lambda: finished.append(id), timeout=60)
+
+    with states.watch(id) as watch:
+        states._publish(event(id, "RUNNING", "Running"))
+        assert not finished
+
+        states._publish(event(id, "COMPLETED", "Completed", NOW + timedelta(seconds=1)))
+        assert watch.wait(1, 0) == (2, TaskRunState(StateType.COMPLETED, "Completed"))
+
+    assert finished == [id]
+
+    # and only once
+    states._publish(event(id, "COMPLETED", "Completed", NOW + timedelta(seconds=2)))
+    assert finished == [id]
+
+
+@pytest.mark.parametrize("type", ["FAILED", "CRASHED", "CANCELLED"])
+def test_unsuccessful_final_states_are_delivered(
+    states: TaskRunStates, type: str
+) -> None:
+    id = uuid4()
+    finished: list[UUID] = []
+    states.when_final(id, lambda: finished.append(id), timeout=60)
+
+    states._publish(event(id, type, type.title()))
+
+    assert TaskRunState(StateType(type), type.title()).is_final
+    assert finished == [id]
+
+
+def test_stale_and_post_final_states_are_ignored(states: TaskRunStates) -> None:
+    id = uuid4()
+    with states.watch(id) as watch:
+        states._publish(event(id, "RUNNING", "Running", NOW))
+        states._publish(event(id, "PENDING", "Pending", NOW - timedelta(seconds=1)))
+        assert watch.wait(0, 0) == (1, TaskRunState(StateType.RUNNING, "Running"))
+
+        states._publish(event(id, "COMPLETED", "Completed", NOW + timedelta(seconds=1)))
+        states._publish(event(id, "RUNNING", "Running", NOW + timedelta(seconds=2)))
+        assert watch.wait(0, 0) == (2, TaskRunState(StateType.COMPLETED, "Completed"))
+
+
+def test_events_without_a_validated_state_are_skipped(states: TaskRunStates) -> None:
+    id = uuid4()
+    with states.watch(id) as watch:
+        states._publish(event(id, "RUNNING", "Running", intended={"to": "RUNNING"}))
+        assert watch.wait(0, 0) == (0, None)
+
+        states._publish(event(id, "RUNNING", "Running"))
+        assert watch.wait(0, 0) == (1, TaskRunState(StateType.RUNNING, "Running"))
+
+
+def test_unwatched_task_runs_are_forgotten(states: TaskRunStates) -> None:
+    id = uuid4()
+    with states.watch(id):
+        with states.watch(id):
+            pass
+        assert id in states._watches
+    assert id not in states._watches
+
+    states._publish(event(id, "RUNNING", "Running"))
+    with states.watch(id) as watch:
+        assert watch.wait(0, 0) == (0, None)
@@ -0,0 +1,123 @@
+import threading
+from uuid import UUID, uuid4
+
+import pytest
+from prefect.client.schemas.objects import TaskRun
+from prefect.states import Cancelled, Completed, Crashed, Failed, Running, State
+
+from flask_task_monitoring.task_runs import TaskRunCache
+
+
+class API:
+    """Stands in for the Prefect API, counting reads of each task run."""
+
+    def __init__(self) -> None:
+        self.states: dict[UUID, State] = {}
+        self.reads: list[UUID] = []
+        self.reading = threading.Event()
+        self.answer = threading.Event()
+        self.answer.set()
+
+    def read(self, task_run_id: UUID) -> TaskRun | None:
+        self.reads.append(task_run_id)
+        self.reading.set()
+        assert self.answer.wait(5)
+        if not (state := self.states.get(task_run_id)):
+            return None
+        return TaskRun(
+            id=task_run_id, task_key="get_help", dynamic_key="0", state=state
+        )
+
+
+@pytest.fixture
+def api() -> API:
+    return API()
+
+
+@pytest.fixture
+def cache(api: API, monkeypatch: pytest.MonkeyPatch) -> TaskRunCache:
+    cache = TaskRunCache(ttl=0.5, final_ttl=300)
+    monkeypatch.setattr(cache, "_read", api.read)
+    cache_time(monkeypatch, 0)
+    return cache
+
+
+def test_concurrent_reads_are_coalesced(cache: TaskRunCache, api: API) -> None:
+    id = uuid4()
+    api.states[id] = Running()
+    api.answer.clear()
+    results: list[TaskRun | None] = []
+
+    def read() -> None:
+        results.append(cache.read(id))
+
+    leader = threading.Thread(target=read)
+    leader.start()
+    assert api.reading.wait(5)
+
+    followers = [threading.Thread(target=read) for _ in range(5)]
+    for follower in followers:
+        follower.start()
+    api.answer.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert api.reads == [id]
+    assert len(results) == 6
+    assert all(result and result.id == id for result in results)
+
+
+def test_task_runs_are_cached_briefly(
+    cache: TaskRunCache, api: API, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    id = uuid4()
+    api.states[id] = Running()
+
+    cache.read(id)
+    cache_time(monkeypatch, 0.4)
+    cache.read(id)
+    assert api.reads == [id]
+
+    cache_time(monkeypatch, 0.6)
+    cache.read(id)
+    assert api.reads == [id, id]
+
+
+@pytest.mark.parametrize("final", [Completed, Failed, Crashed, Cancelled])
+def test_final_task_runs_are_cached_longer(
+    cache: TaskRunCache, api: API, monkeypatch: pytest.MonkeyPatch, final
+) -> None:
+    id = uuid4()
+    api.states[id] = final()
+
+    cache.read(id)
+    cache_time(monkeypatch, 299)
+    task_run = cache.read(id)
+    assert task_run and task_run.state and task_run.state.type == final().type
+    assert api.reads == [id]
+
+    cache_time(monkeypatch, 301)
+    cache.read(id)
+    assert api.reads == [id, id]
+
+
+def test_fresh_reads_skip_the_cache(cache: TaskRunCache, api: API) -> None:
+    id = uuid4()
+    api.states[id] = Running()
+
+    cache.read(id)
+    api.states[id] = Completed()
+    task_run = cache.read(id, fresh=True)
+    assert task_run and task_run.state and task_run.state.is_completed()
+    assert api.reads == [id, id]
+
+
+def test_missing_task_runs_are_cached(cache: TaskRunCache, api: API) -> None:
+    id = uuid4()
+    assert cache.read(id) is None
+    assert cache.read(id) is None
+    assert api.reads == [id]
+
+
+def cache_time(monkeypatch: pytest.MonkeyPatch, now: float) -> None:
+    monkeypatch.setattr("flask_task_monitoring.task_runs.time.monotonic", lambda: now)
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from flask_task_monitoring import tasks
+
+
+class Call:
+    """Stands in for a marvin function, replying once it's told to finish."""
+
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.finish = asyncio.Event()
+        self.started = self.cancelled = False
+
+    async def __call__(self, question: str) -> str:
+        self.started = True
+        try:
+            await self.finish.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.reply
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> dict[str, Call]:
+    calls = {
+        "classify": Call("neutral"),
+        "answer": Call("It's 4."),
+        "retort": Call("Ask nicely."),
+    }
+    for name, call in calls.items():
+        monkeypatch.setattr(tasks, name, call)
+    return calls
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "tone, kept, dropped",
+    [("neutral", "answer", "retort"), ("hostile", "retort", "answer")],
+)
+async def test_the_reply_that_does_not_fit_is_cancelled(
+    calls: dict[str, Call], tone: str, kept: str, dropped: str
+) -> None:
+    calls["classify"].reply = tone
+    calls["classify"].finish.set()
+    calls[kept].finish.set()
+
+    # the dropped call would never finish on its own
+    reply = await asyncio.wait_for(tasks.reply_speculatively("What's 2+2?"), 1)
+
+    assert reply == calls[kept].reply
+    assert calls[dropped].started and calls[dropped].cancelled
+    assert not calls[kept].cancelled
+
+
+@pytest.mark.asyncio
+async def test_the_reply_that_does_not_fit_is_thrown_away(
+    calls: dict[str, Call],
+) -> None:
+    calls["classify"].reply = "hostile"
+    calls["answer"].finish.set()
+
+    speculating = asyncio.create_task(tasks.reply_speculatively("What's 2+2, idiot?"))
+    await asyncio.sleep(0.01)
+    assert not speculating.done()
+
+    # the answer was ready first, but the question turns out to be hostile
+    calls["classify"].finish.set()
+    calls["retort"].finish.set()
+
+    assert await asyncio.wait_for(speculating, 1) == "Ask nicely."
+
+
+@pytest.mark.asyncio
+async def test_no_calls_are_left_running_if_classifying_fails(
+    calls: dict[str, Call], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def classify(question: str) -> str:
+        await asyncio.sleep(0)
+        raise RuntimeError("Rate limited")
+
+    monkeypatch.setattr(tasks, "classify", classify)
+
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(tasks.reply_speculatively("What's 2+2?"), 1)
+
+    assert calls["answer"].cancelled and calls["retort"].cancelled
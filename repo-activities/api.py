@@ -1,31 +1,45 @@
 import typing
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Coroutine
 
 import marvin
 import uvicorn
 from config import settings
-from fastapi import FastAPI, Request
+from deliveries import Debouncer, DeliveryDeduplicator
+from event_log import event_log
+from fastapi import FastAPI, Request, Response
+from fastapi.routing import APIRoute
 from gh_util.types import GitHubWebhookRequest
-from handlers import handle_repo_request
+from handlers import handle_repo_burst, handle_repo_request
+from health import HealthMonitor, Readiness
+from ingest import RawWebhookRequest, WebhookRequest
+from marvin.utilities.redis import get_async_redis_client
+from prefect.client.orchestration import get_client
 from pydantic_core import from_json
 
 
-def save_request(request: GitHubWebhookRequest):
-    if not (path := settings.home / request.event.repository.name).exists():
-        path.mkdir()
-
-    event_log_path = (
-        path
-        / f"{request.event.action}_{request.headers.event}_{request.headers.delivery}.json"
-    )
-    event_log_path.write_text(request.model_dump_json(indent=2))
-
-
 class FasterRequest(Request):
     async def json(self) -> typing.Any:
         if not hasattr(self, "_json"):
             self._json = from_json(await self.body())
         return self._json
 
+    async def raw_webhook_request(self) -> RawWebhookRequest:
+        return RawWebhookRequest.from_request(self.headers, await self.body())
+
+
+class FasterRoute(APIRoute):
+    """FastAPI hands endpoints a plain `Request`, whatever they're annotated with, so
+    this route hands them a `FasterRequest` instead."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def faster_handler(request: Request) -> Response:
+            return await handler(FasterRequest(request.scope, request.receive))
+
+        return faster_handler
+
 
 @marvin.fn(model_kwargs={"model": "gpt-3.5-turbo", "temperature": 1.2})
 def say_you_are_healthy(in_the_style_of: str = "Top Boy (UK tv show)") -> str:
@@ -37,24 +51,105 @@ def say_you_are_healthy(in_the_style_of: str = "Top Boy (UK tv show)") -> str:
     """
 
 
-app = FastAPI()
+def submit(requests: list[WebhookRequest]) -> None:
+    if len(requests) == 1:
+        handle_repo_request.delay(requests[0])
+    else:
+        handle_repo_burst.delay(
+            requests[0].event.repository.full_name, requests[0].headers.event, requests
+        )
+
+
+deliveries = DeliveryDeduplicator(
+    max_entries=settings.dedup_max_entries,
+    ttl=settings.dedup_ttl_seconds,
+    redis=get_async_redis_client if settings.dedup_redis else None,
+)
+debouncer = Debouncer(
+    window=settings.debounce_seconds,
+    events=settings.debounce_events,
+    max_events=settings.debounce_max_events,
+    submit=submit,
+    on_failure=lambda requests: deliveries.forget(
+        [request.headers.delivery for request in requests]
+    ),
+)
+
+
+async def check_prefect() -> None:
+    async with get_client() as client:
+        if exc := await client.api_healthcheck():
+            raise exc
+
+
+async def check_redis() -> None:
+    redis = await get_async_redis_client()
+    await redis.ping()
+
+
+health = HealthMonitor(
+    checks={"prefect": check_prefect, "redis": check_redis},
+    interval=settings.health_check_seconds,
+    timeout=settings.health_check_timeout_seconds,
+    greet=say_you_are_healthy,
+    greeting_interval=settings.health_greeting_seconds,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(health)
+        await stack.enter_async_context(debouncer)
+        if settings.test_mode:
+            await stack.enter_async_context(event_log)
+        yield
+
+
+app = FastAPI(lifespan=lifespan)
+app.router.route_class = FasterRoute
 
 
 @app.get("/")
-def healthcheck() -> str:
-    return say_you_are_healthy()
+async def healthcheck() -> str:
+    # the greeting is refreshed in the background, not generated for every probe
+    return health.greeting
+
+
+@app.get("/healthz")
+async def liveness() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readiness(response: Response) -> Readiness:
+    readiness = health.readiness
+    if not readiness.ready:
+        response.status_code = 503
+    return readiness
 
 
 @app.post("/webhook")
 async def repo_event(request: FasterRequest):
-    req = GitHubWebhookRequest(
-        headers=dict(request.headers), event=await request.json()
-    )
+    req: WebhookRequest
+    if settings.fast_ingest:
+        # only validate what's needed to route the event, and leave the rest of the
+        # payload for the handler to validate
+        req = await request.raw_webhook_request()
+    else:
+        req = GitHubWebhookRequest(
+            headers=dict(request.headers), event=await request.json()
+        )
+
+    if settings.dedup_deliveries and not await deliveries.first_delivery(
+        req.headers.delivery
+    ):
+        return {"message": "repo event already received"}
 
     if settings.test_mode:
-        save_request(req)
+        event_log.append(req)
 
-    handle_repo_request.delay(req)
+    debouncer.add(req)
 
     return {"message": "repo event received"}
 
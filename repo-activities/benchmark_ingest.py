@@ -0,0 +1,133 @@
+"""Measures how many webhook requests per second the API ingests, with and without
+`fast_ingest`, by replaying recorded payloads against the app in-process.
+
+Payloads are read from the event logs that test mode keeps (NDJSON segments, gzipped
+or not), or from JSON files of single requests, under the given paths (by default,
+`REPO_ACTIVITIES_HOME`).  Submitting the handler task is stubbed out, so only
+receiving, parsing and validating requests is measured:
+
+    python benchmark_ingest.py ~/.repo_activities/events --requests 5000
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+import httpx
+from pydantic_core import from_json, to_json
+
+import api
+from config import settings
+
+
+class NotSubmitted:
+    def delay(self, request: Any) -> None:
+        pass
+
+
+def recorded_payloads(paths: list[Path]) -> Iterator[tuple[dict[str, str], bytes]]:
+    for path in paths:
+        if path.is_dir():
+            files = sorted(
+                [
+                    *path.rglob("*.json"),
+                    *path.rglob("*.ndjson"),
+                    *path.rglob("*.ndjson.gz"),
+                ]
+            )
+        else:
+            files = [path]
+
+        for file in files:
+            opener = gzip.open if file.suffix == ".gz" else open
+            with opener(file, "rb") as f:
+                records = [f.read()] if file.suffix == ".json" else f
+                for record in records:
+                    if record.strip():
+                        request = from_json(record)
+                        yield request["headers"], to_json(request["event"])
+
+
+async def benchmark(
+    payloads: list[tuple[dict[str, str], bytes]],
+    fast_ingest: bool,
+    requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    settings.fast_ingest = fast_ingest
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=api.app), base_url="http://api"
+    ) as client:
+
+        async def ingest(i: int) -> None:
+            headers, body = payloads[i % len(payloads)]
+            async with semaphore:
+                response = await client.post(
+                    "/webhook",
+                    content=body,
+                    headers=headers | {"content-type": "application/json"},
+                )
+                response.raise_for_status()
+
+        # warm up, so that both modes start from the same place
+        await asyncio.gather(*(ingest(i) for i in range(min(requests, 100))))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(ingest(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "fast_ingest": fast_ingest,
+        "elapsed": elapsed,
+        "requests_per_second": requests / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        default=[settings.home],
+        help="event logs or recorded requests to replay",
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    payloads = list(recorded_payloads(args.paths))
+    if not payloads:
+        sys.exit(f"No recorded payloads found in {', '.join(map(str, args.paths))}")
+
+    settings.test_mode = False
+    # the same payloads are replayed over and over
+    settings.dedup_deliveries = False
+    api.handle_repo_request = NotSubmitted()
+
+    full, fast = (
+        asyncio.run(benchmark(payloads, fast_ingest, args.requests, args.concurrency))
+        for fast_ingest in (False, True)
+    )
+    report = {
+        "payloads": len(payloads),
+        "mean_payload_bytes": sum(len(body) for _, body in payloads) / len(payloads),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "full_validation": full,
+        "fast_ingest": fast,
+        "speedup": fast["requests_per_second"] / full["requests_per_second"],
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
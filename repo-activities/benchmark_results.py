@@ -0,0 +1,188 @@
+"""Measures how big handler results are stored in each encoding, and how many per
+second are written to Redis, one `SET` at a time or batched into pipelines by the
+result sink.
+
+Results are the recorded requests themselves, which is what the default handler
+returns, read from event logs or JSON files as by `benchmark_ingest.py`.  Writes go
+to an in-process fakeredis (from `requirements-dev.txt`), which takes `--latency` seconds
+for each round trip, unless `--redis-url` is given:
+
+    python benchmark_results.py ~/.repo_activities/events --results 5000
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, get_args
+
+from benchmark_ingest import recorded_payloads
+from config import settings
+from fakeredis import FakeAsyncRedis, FakeAsyncRedisConnection
+from gh_util.types import GitHubWebhookRequest
+from pydantic_core import from_json
+from redis.asyncio import Redis
+from result_sink import ResultEncoding, ResultSink, dump_result, load_result
+
+
+def with_latency(latency: float) -> type[FakeAsyncRedisConnection]:
+    """A fakeredis connection that takes `latency` seconds to send each command, or
+    each pipeline of them, like a connection to a Redis elsewhere on the network."""
+
+    class Connection(FakeAsyncRedisConnection):
+        async def send_packed_command(self, *args, **kwargs) -> None:
+            await asyncio.sleep(latency)
+            await super().send_packed_command(*args, **kwargs)
+
+    return Connection
+
+
+def sizes(results: list[GitHubWebhookRequest]) -> dict[str, Any]:
+    report = {}
+    for encoding in get_args(ResultEncoding):
+        start = time.perf_counter()
+        values = [dump_result(result, encoding) for result in results]
+        encoded = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for value in values:
+            load_result(value)
+        decoded = time.perf_counter() - start
+
+        report[encoding] = {
+            "mean_bytes": sum(map(len, values)) / len(values),
+            "encode_us": encoded / len(values) * 1e6,
+            "decode_us": decoded / len(values) * 1e6,
+        }
+
+    unencoded = report["json"]["mean_bytes"]
+    for encoding in report.values():
+        encoding["ratio"] = encoding["mean_bytes"] / unencoded
+    return report
+
+
+async def throughput(
+    redis: Redis,
+    results: list[GitHubWebhookRequest],
+    count: int,
+    concurrency: int,
+    encoding: ResultEncoding | None,
+) -> dict[str, Any]:
+    """Writes `count` results from `concurrency` writers at once, with the result
+    sink in the given encoding, or with `encoding=None`, one `SET` of the result's
+    JSON at a time, as results used to be written."""
+
+    async def get_redis() -> Redis:
+        return redis
+
+    sink = encoding and ResultSink(
+        encoding=encoding,
+        ttl=settings.result_ttl_seconds,
+        ttls_by_event={},
+        batch_size=settings.result_batch_size,
+        flush_seconds=settings.result_flush_seconds,
+        redis=get_redis,
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    stored = 0
+
+    async def write(i: int) -> None:
+        nonlocal stored
+        result = results[i % len(results)]
+        async with semaphore:
+            if sink:
+                _, size = await sink.put(
+                    result.event.repository.full_name,
+                    result.headers.event,
+                    str(i),
+                    result,
+                )
+            else:
+                value = result.model_dump_json()
+                await redis.set(f"unbatched:{i}", value)
+                size = len(value)
+            stored += size
+
+    await redis.flushdb()
+    start = time.perf_counter()
+    await asyncio.gather(*(write(i) for i in range(count)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed": elapsed,
+        "results_per_second": count / elapsed,
+        "stored_bytes": stored,
+    }
+
+
+async def benchmark(
+    results: list[GitHubWebhookRequest],
+    redis_url: str | None,
+    latency: float,
+    count: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    if redis_url:
+        redis = Redis.from_url(redis_url)
+    else:
+        redis = FakeAsyncRedis(connection_class=with_latency(latency))
+    try:
+        report = {
+            "unbatched": await throughput(redis, results, count, concurrency, None)
+        }
+        for encoding in get_args(ResultEncoding):
+            report[encoding] = await throughput(
+                redis, results, count, concurrency, encoding
+            )
+        await redis.flushdb()
+    finally:
+        await redis.aclose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        default=[settings.home],
+        help="event logs or recorded requests to use as results",
+    )
+    parser.add_argument("--results", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.001,
+        help="seconds per round trip to fakeredis",
+    )
+    parser.add_argument(
+        "--redis-url", help="a Redis to write to (it's flushed!), instead of fakeredis"
+    )
+    args = parser.parse_args()
+
+    results = [
+        GitHubWebhookRequest(headers=headers, event=from_json(body))
+        for headers, body in recorded_payloads(args.paths)
+    ]
+    if not results:
+        sys.exit(f"No recorded payloads found in {', '.join(map(str, args.paths))}")
+
+    report = {
+        "results": len(results),
+        "sizes": sizes(results),
+        "throughput": asyncio.run(
+            benchmark(
+                results, args.redis_url, args.latency, args.results, args.concurrency
+            )
+        ),
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
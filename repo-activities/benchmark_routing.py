@@ -0,0 +1,82 @@
+"""Measures how long looking up an event's handlers takes as more repos and patterns
+are registered, against matching every registered pattern in turn.
+
+For each `--registrations` count, that many repos are registered by name, with a
+tenth as many `owner/*` patterns and a hundredth as many `owner/prefix-*` ones, and
+events for as many repos, most of them unregistered, are looked up:
+
+    python benchmark_routing.py --registrations 100 1000 10000 100000
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from fnmatch import translate
+from typing import Any
+
+from routing import HandlerRegistry
+
+
+async def handle(request: Any) -> None:
+    pass
+
+
+def benchmark(registrations: int, lookups: int) -> dict[str, Any]:
+    owners = [f"owner-{i}" for i in range(max(registrations // 10, 1))]
+    patterns = [
+        *(f"{owner}/repo-{i}" for i, owner in enumerate(owners * 10)),
+        *(f"{owner}/*" for owner in owners[::10]),
+        *(f"{owner}/prefix-*" for owner in owners[::100]),
+    ]
+
+    registry = HandlerRegistry(default=handle)
+    start = time.perf_counter()
+    for pattern in patterns:
+        registry.register(pattern, handle, event="push")
+    registered = time.perf_counter() - start
+
+    rng = random.Random(0)
+    repos = [
+        f"{rng.choice(owners)}/{rng.choice(['repo', 'prefix', 'other'])}-{i}"
+        for i in range(lookups)
+    ]
+
+    start = time.perf_counter()
+    for repo in repos:
+        registry.lookup(repo, "push", None)
+    indexed = time.perf_counter() - start
+
+    # scanning is too slow to look up every repo once there are many registrations
+    compiled = [re.compile(translate(pattern)) for pattern in patterns]
+    scanned_repos = repos[: max(lookups * 100 // len(patterns), 10)]
+    start = time.perf_counter()
+    for repo in scanned_repos:
+        [pattern for pattern in compiled if pattern.match(repo)]
+    scanned = time.perf_counter() - start
+
+    return {
+        "registrations": len(patterns),
+        "register_us": registered / len(patterns) * 1e6,
+        "indexed_lookup_us": indexed / len(repos) * 1e6,
+        "scanned_lookup_us": scanned / len(scanned_repos) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--registrations", type=int, nargs="+", default=[100, 1000, 10000, 100000]
+    )
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    report = [benchmark(count, args.lookups) for count in args.registrations]
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
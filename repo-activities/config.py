@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import AfterValidator, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -24,5 +24,40 @@ class Settings(BaseSettings):
 
     test_mode: bool = False
 
+    # only validate the parts of webhook payloads needed to route them in the API,
+    # leaving the rest to the handlers
+    fast_ingest: bool = False
+
+    # deliveries received before are ignored, if GitHub redelivers them
+    dedup_deliveries: bool = True
+    dedup_max_entries: int = 100_000
+    dedup_ttl_seconds: int = 24 * 60 * 60
+    dedup_redis: bool = True
+
+    # events of these types for the same repo that arrive within the window of each
+    # other are handled together, by one task run (a window of 0 turns this off)
+    debounce_seconds: float = 0
+    debounce_events: list[str] = ["push"]
+    debounce_max_events: int = 100
+
+    # readiness checks of prefect and redis, and the greeting, run in the background
+    health_check_seconds: float = 10
+    health_check_timeout_seconds: float = 2
+    health_greeting_seconds: float = 10 * 60
+
+    # the log of webhook events kept in test mode
+    event_log_queue_size: int = 10_000
+    event_log_batch_size: int = 500
+    event_log_segment_bytes: int = 64 * 1024 * 1024
+    event_log_segment_seconds: float = 60 * 60
+    event_log_compress: bool = False
+
+    # how handler results are stored in redis
+    result_encoding: Literal["json", "json+zlib", "msgpack", "msgpack+zlib"] = "json"
+    result_ttl_seconds: int = 7 * 24 * 60 * 60
+    result_ttl_seconds_by_event: dict[str, int] = {}
+    result_batch_size: int = 100
+    result_flush_seconds: float = 0.002
+
 
 settings = Settings()
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Self
+
+from ingest import WebhookRequest
+from marvin.utilities.redis import get_async_redis_client
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryDeduplicator:
+    """Recognizes deliveries that have been received before, by their
+    `X-GitHub-Delivery` IDs, so that redeliveries of a webhook aren't handled again.
+
+    The last `max_entries` delivery IDs are remembered in memory, and with `redis`,
+    in Redis for `ttl` seconds too, so that redeliveries are recognized across API
+    replicas and restarts.  If Redis can't be reached, deliveries are only checked
+    against the ones in memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: int,
+        redis: Callable[[], Awaitable[Redis]] | None = get_async_redis_client,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis = redis
+
+        self._seen: OrderedDict[str, None] = OrderedDict()
+        self._client: Redis | None = None
+        self._forgetting: set[asyncio.Task[int]] = set()
+
+    async def first_delivery(self, delivery: str) -> bool:
+        """Returns whether this is the first time the delivery has been received,
+        remembering it if it is."""
+        if delivery in self._seen:
+            self._seen.move_to_end(delivery)
+            return False
+
+        self._seen[delivery] = None
+        if len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+
+        if not self.redis:
+            return True
+        try:
+            if not self._client:
+                self._client = await self.redis()
+            # only the first replica to see a delivery gets to set its key
+            return bool(
+                await self._client.set(
+                    f"deliveries:{delivery}", 1, nx=True, ex=self.ttl
+                )
+            )
+        except Exception:
+            logger.warning(
+                "Couldn't check delivery %s against Redis", delivery, exc_info=True
+            )
+            return True
+
+    def forget(self, deliveries: list[str]) -> None:
+        """Forgets deliveries that couldn't be handled, so that they're handled if
+        they're redelivered."""
+        for delivery in deliveries:
+            self._seen.pop(delivery, None)
+
+        if self._client:
+            forget = asyncio.create_task(
+                self._client.delete(*(f"deliveries:{d}" for d in deliveries))
+            )
+            self._forgetting.add(forget)
+            forget.add_done_callback(self._forgetting.discard)
+
+
+class Debouncer:
+    """Gathers events of the same type for the same repo that arrive within `window`
+    seconds of each other, like the pushes of a force-push storm, so that they're
+    submitted together to be handled by one task run.
+
+    A burst is submitted `window` seconds after its first event, or as soon as it has
+    `max_events`.  Events of types other than `events`, or any events at all if
+    `window` is 0, are submitted right away.  If submitting events fails, they're
+    passed to `on_failure`.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        events: list[str],
+        max_events: int,
+        submit: Callable[[list[WebhookRequest]], None],
+        on_failure: Callable[[list[WebhookRequest]], None] | None = None,
+    ):
+        self.window = window
+        self.events = set(events)
+        self.max_events = max_events
+        self.submit = submit
+        self.on_failure = on_failure
+
+        self._bursts: dict[tuple[str, str], list[WebhookRequest]] = {}
+        self._timers: dict[tuple[str, str], asyncio.TimerHandle] = {}
+
+    def add(self, request: WebhookRequest) -> None:
+        """Submits the event, or adds it to its burst.  Raises if the event couldn't
+        be submitted right away."""
+        if not self.window or request.headers.event not in self.events:
+            self._submit([request])
+            return
+
+        key = (request.event.repository.full_name, request.headers.event)
+        burst = self._bursts.setdefault(key, [])
+        burst.append(request)
+        if len(burst) >= self.max_events:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self.window, self._flush, key
+            )
+
+    def _flush(self, key: tuple[str, str]) -> None:
+        if timer := self._timers.pop(key, None):
+            timer.cancel()
+        if burst := self._bursts.pop(key, None):
+            try:
+                self._submit(burst)
+            except Exception:
+                # already logged, and there's no request left to fail
+                pass
+
+    def _submit(self, requests: list[WebhookRequest]) -> None:
+        try:
+            self.submit(requests)
+        except Exception:
+            logger.exception(
+                "Failed to submit deliveries %s",
+                ", ".join(request.headers.delivery for request in requests),
+            )
+            if self.on_failure:
+                self.on_failure(requests)
+            raise
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Submit the bursts still waiting for their windows to end
+        for key in list(self._bursts):
+            self._flush(key)
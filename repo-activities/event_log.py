@@ -0,0 +1,175 @@
+import asyncio
+import gzip
+import logging
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Self
+
+from config import settings
+from gh_util.types import GitHubWebhookRequest
+from ingest import RawWebhookRequest, WebhookRequest
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Segment:
+    path: Path
+    created: float
+    size: int = 0
+
+
+class EventLog:
+    """An append-only log of webhook events, kept as NDJSON segment files per repo.
+
+    `append` only puts the event on a bounded queue, so the request path never waits
+    on the disk.  A background task takes events off the queue in batches, and
+    appends each repo's events to its current segment in a worker thread.  A repo's
+    segment is rotated once it grows past `segment_bytes` or gets older than
+    `segment_seconds`, and with `compress`, each batch is appended to it as its own
+    gzip member.  If the queue is full, events are dropped (and counted) rather than
+    holding up the request.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        queue_size: int,
+        batch_size: int,
+        segment_bytes: int,
+        segment_seconds: float,
+        compress: bool,
+    ):
+        self.path = path
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.compress = compress
+
+        self.dropped = 0
+        self._queue: asyncio.Queue[WebhookRequest | None] | None = None
+        self._writer: asyncio.Task[None] | None = None
+        self._segments: dict[str, Segment] = {}
+
+    def append(self, request: WebhookRequest) -> bool:
+        """Queues the event to be written, returning whether there was room for it."""
+        if not self._queue:
+            raise RuntimeError("The event log isn't running")
+
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(
+                "Event log queue is full, dropped delivery %s (%d dropped so far)",
+                request.headers.delivery,
+                self.dropped,
+            )
+            return False
+        return True
+
+    async def __aenter__(self) -> Self:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._writer = asyncio.create_task(self._write_forever())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Wait for everything queued so far to be written
+        assert self._queue and self._writer
+        await self._queue.put(None)
+        await self._writer
+        self._queue = self._writer = None
+
+    async def _write_forever(self) -> None:
+        assert self._queue
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            if stopping := None in batch:
+                batch = [request for request in batch if request is not None]
+
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception:
+                logger.exception("Failed to write %d events to the log", len(batch))
+
+            if stopping:
+                return
+
+    def _write(self, batch: list[WebhookRequest]) -> None:
+        lines: dict[str, list[bytes]] = defaultdict(list)
+        for request in batch:
+            if isinstance(request, RawWebhookRequest):
+                line = request.to_json()
+            else:
+                line = request.model_dump_json(by_alias=True).encode()
+            lines[request.event.repository.full_name].append(line + b"\n")
+
+        for repo, repo_lines in lines.items():
+            data = b"".join(repo_lines)
+            if self.compress:
+                data = gzip.compress(data)
+
+            segment = self._segment(repo)
+            with segment.path.open("ab") as file:
+                file.write(data)
+            segment.size += len(data)
+
+    def _segment(self, repo: str) -> Segment:
+        now = time.time()
+        segment = self._segments.get(repo)
+        if (
+            not segment
+            or segment.size >= self.segment_bytes
+            or now - segment.created >= self.segment_seconds
+        ):
+            directory = self.repo_path(repo)
+            directory.mkdir(parents=True, exist_ok=True)
+
+            # Segment names sort in the order they were created
+            started = datetime.fromtimestamp(now, timezone.utc)
+            name = f"{started:%Y%m%dT%H%M%S%fZ}-{uuid.uuid4().hex[:8]}.ndjson"
+            if self.compress:
+                name += ".gz"
+
+            segment = self._segments[repo] = Segment(path=directory / name, created=now)
+        return segment
+
+    def repo_path(self, repo: str) -> Path:
+        return self.path.joinpath(*repo.split("/"))
+
+    def read(self, repo: str) -> Iterator[GitHubWebhookRequest]:
+        """Yields the events logged for a repo (by its full name), oldest first,
+        reading one line at a time."""
+        directory = self.repo_path(repo)
+        if not directory.exists():
+            return
+
+        for path in sorted(directory.glob("*.ndjson*")):
+            opener = gzip.open if path.suffix == ".gz" else open
+            with opener(path, "rb") as file:
+                try:
+                    for line in file:
+                        # The end of the current segment may still be being written
+                        if not line.endswith(b"\n"):
+                            break
+                        yield GitHubWebhookRequest.model_validate_json(line)
+                except EOFError:
+                    pass
+
+
+event_log = EventLog(
+    path=settings.home / "events",
+    queue_size=settings.event_log_queue_size,
+    batch_size=settings.event_log_batch_size,
+    segment_bytes=settings.event_log_segment_bytes,
+    segment_seconds=settings.event_log_segment_seconds,
+    compress=settings.event_log_compress,
+)
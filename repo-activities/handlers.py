@@ -1,11 +1,17 @@
+import asyncio
+import logging
 from typing import Any
 
 from devtools import debug
 from gh_util.types import GitHubWebhookRequest
-from marvin.utilities.redis import get_async_redis_client
+from ingest import RawWebhookRequest, WebhookRequest
 from prefect import task
 from prefect.task_worker import serve
 from pydantic import BaseModel
+from result_sink import result_sink
+from routing import Handler, HandlerRegistry
+
+logger = logging.getLogger(__name__)
 
 
 # default handler
@@ -15,12 +21,13 @@ async def _default_handler(request: GitHubWebhookRequest) -> GitHubWebhookReques
     return request
 
 
-# handlers for specific repositories
-HANDLERS = {
-    "zzstoatzz/gh": _default_handler,
-    "prefecthq/marvin": _default_handler,
-    # add more handlers for specific repositories here
-}
+# handlers for specific repositories, or patterns of them, and optionally for
+# specific event types and actions
+HANDLERS = HandlerRegistry(default=_default_handler)
+HANDLERS.register("zzstoatzz/gh", _default_handler)
+HANDLERS.register("prefecthq/marvin", _default_handler)
+# add more handlers here, e.g.
+# @HANDLERS.handler("prefecthq/*", event="issues", action="opened")
 
 
 async def show_result_is_available_via_API(task, task_run, state):
@@ -37,29 +44,102 @@ async def show_result_is_available_via_API(task, task_run, state):
     get_run_logger().info(f"Actual result value: {await state.result()}")
 
 
+def _handler_name(handler: Handler) -> str:
+    # handlers may be partials or other callables, which don't have names
+    return getattr(handler, "__name__", repr(handler))
+
+
+async def _handle_request(request: WebhookRequest) -> Any:
+    full_repo_name = request.event.repository.full_name
+    if isinstance(request, RawWebhookRequest):
+        # with fast ingest, the API only validated what it needed to route the event
+        request = request.validate_fully()
+
+    request_handlers = HANDLERS.lookup(
+        full_repo_name, request.headers.event, request.event.action
+    )
+    handler_results = await asyncio.gather(
+        *(request_handler(request) for request_handler in request_handlers),
+        return_exceptions=True,
+    )
+
+    # failures are logged first, so that they're seen even if storing results fails
+    for request_handler, handler_result in zip(request_handlers, handler_results):
+        if isinstance(handler_result, BaseException):
+            logger.error(
+                "Handler %s failed on %s event %s",
+                _handler_name(request_handler),
+                request.headers.event,
+                request.headers.delivery,
+                exc_info=handler_result,
+            )
+
+    # results are stored together, so they're written in one pipeline
+    stored = await asyncio.gather(
+        *(
+            result_sink.put(
+                full_repo_name,
+                request.headers.event,
+                request.headers.delivery,
+                handler_result,
+                # when several handlers ran, each result is stored under its own key
+                handler=(
+                    _handler_name(request_handler)
+                    if len(request_handlers) > 1
+                    else None
+                ),
+            )
+            for request_handler, handler_result in zip(
+                request_handlers, handler_results
+            )
+            if isinstance(handler_result, BaseModel)
+        )
+    )
+    for request_key, size in stored:
+        print(f"serialized & saved to redis @ {request_key} ({size} bytes)")
+
+    # the other handlers' results are kept even if one of them failed
+    for handler_result in handler_results:
+        if isinstance(handler_result, BaseException):
+            raise handler_result
+
+    return handler_results[0] if len(handler_results) == 1 else handler_results
+
+
 # repo event handler task
 @task(
     log_prints=True,
     task_run_name="Handle {request.headers.event} event for {request.event.repository.full_name}",
     on_completion=[show_result_is_available_via_API],
 )
-async def handle_repo_request(request: GitHubWebhookRequest) -> Any:
-    full_repo_name = request.event.repository.full_name
-    request_handler = HANDLERS.get(full_repo_name, _default_handler)
-    handler_result = await request_handler(request)
-    if isinstance(handler_result, BaseModel) and (
-        serialized_result := handler_result.model_dump_json()
-    ):
-        redis = await get_async_redis_client()
-        request_key = (
-            f"{full_repo_name}:{request.headers.event}:{request.headers.delivery}"
-        )
-        await redis.set(request_key, serialized_result)
-        print(f"serialized & saved to redis @ {request_key}")
+async def handle_repo_request(request: WebhookRequest) -> Any:
+    return await _handle_request(request)
+
+
+# handler task for a burst of events of one type for one repo
+@task(
+    log_prints=True,
+    task_run_name="Handle {event} events for {repo}",
+    on_completion=[show_result_is_available_via_API],
+)
+async def handle_repo_burst(
+    repo: str, event: str, requests: list[WebhookRequest]
+) -> list[Any]:
+    handler_results = []
+    failures = []
+    # the events are handled in the order they were received, like pushes need to be
+    for request in requests:
+        try:
+            handler_results.append(await _handle_request(request))
+        except Exception as exc:
+            handler_results.append(exc)
+            failures.append(exc)
 
-    return handler_result
+    if failures:
+        raise failures[0]
+    return handler_results
 
 
-# serve the main task
+# serve the main tasks
 if __name__ == "__main__":
-    serve(handle_repo_request)
+    serve(handle_repo_request, handle_repo_burst)
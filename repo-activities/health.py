@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Self
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+Check = Callable[[], Awaitable[None]]
+
+
+class CheckResult(BaseModel):
+    ok: bool
+    latency_ms: float
+    error: str | None = None
+
+
+class Readiness(BaseModel):
+    ready: bool
+    checked_at: float | None = None
+    checks: dict[str, CheckResult] = {}
+
+
+class HealthMonitor:
+    """Checks that the services the API depends on are reachable, every `interval`
+    seconds in a background task, so that readiness probes are answered right away
+    with the last results.
+
+    Each check is an async callable that raises if its service isn't reachable, and
+    fails if it takes longer than `timeout` seconds.  The API isn't ready until every
+    check has passed, or once the last results are older than a few intervals, in
+    case the checks have stopped.  The greeting is refreshed in the background too,
+    every `greeting_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        checks: dict[str, Check],
+        interval: float,
+        timeout: float,
+        greet: Callable[[], str],
+        greeting_interval: float,
+    ):
+        self.checks = checks
+        self.interval = interval
+        self.timeout = timeout
+        self.greet = greet
+        self.greeting_interval = greeting_interval
+
+        self.greeting = "healthy"
+        self._readiness = Readiness(ready=False)
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def readiness(self) -> Readiness:
+        checked_at = self._readiness.checked_at
+        if checked_at and time.time() - checked_at > 3 * self.interval:
+            return self._readiness.model_copy(update={"ready": False})
+        return self._readiness
+
+    async def __aenter__(self) -> Self:
+        self._tasks = [
+            asyncio.create_task(self._check_forever()),
+            asyncio.create_task(self._greet_forever()),
+        ]
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def check(self) -> Readiness:
+        results = await asyncio.gather(
+            *(self._check(check) for check in self.checks.values())
+        )
+        self._readiness = Readiness(
+            ready=all(result.ok for result in results),
+            checked_at=time.time(),
+            checks=dict(zip(self.checks, results)),
+        )
+        return self._readiness
+
+    async def _check(self, check: Check) -> CheckResult:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+        else:
+            error = None
+        return CheckResult(
+            ok=error is None,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            error=error,
+        )
+
+    async def _check_forever(self) -> None:
+        while True:
+            readiness = await self.check()
+            if not readiness.ready:
+                logger.warning("Not ready: %s", readiness.model_dump_json())
+            await asyncio.sleep(self.interval)
+
+    async def _greet_forever(self) -> None:
+        while True:
+            try:
+                self.greeting = await asyncio.to_thread(self.greet)
+            except Exception:
+                logger.warning("Couldn't refresh the greeting", exc_info=True)
+            await asyncio.sleep(self.greeting_interval)
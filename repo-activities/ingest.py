@@ -0,0 +1,57 @@
+from typing import Mapping, Self
+
+from gh_util.types import GitHubWebhookRequest
+from pydantic import BaseModel, Field
+from pydantic_core import from_json, to_json
+
+
+class RoutingHeaders(BaseModel):
+    event: str = Field(validation_alias="x-github-event")
+    delivery: str = Field(validation_alias="x-github-delivery")
+
+
+class RoutingRepository(BaseModel):
+    full_name: str
+
+
+class RoutingEvent(BaseModel):
+    action: str | None = None
+    repository: RoutingRepository
+
+
+class RawWebhookRequest(BaseModel):
+    """A webhook request validated only as far as routing it needs, carrying the raw
+    payload along to be validated fully by whichever handler needs it.
+
+    `headers` and `event` have the same shape as `GitHubWebhookRequest`'s as far as
+    they go, so that the request can be routed (and named) the same way.
+    """
+
+    headers: RoutingHeaders
+    event: RoutingEvent
+    raw_headers: dict[str, str]
+    body: bytes
+
+    @classmethod
+    def from_request(cls, headers: Mapping[str, str], body: bytes) -> Self:
+        # Parsing into the narrow `RoutingEvent` skips over everything else in the
+        # payload without building any Python objects for it
+        return cls(
+            headers=RoutingHeaders.model_validate(headers),
+            event=RoutingEvent.model_validate_json(body),
+            raw_headers=dict(headers),
+            body=body,
+        )
+
+    def validate_fully(self) -> GitHubWebhookRequest:
+        return GitHubWebhookRequest(
+            headers=self.raw_headers, event=from_json(self.body)
+        )
+
+    def to_json(self) -> bytes:
+        """The request as `GitHubWebhookRequest` JSON, without validating it."""
+        return to_json({"headers": self.raw_headers, "event": from_json(self.body)})
+
+
+# A webhook request as the API hands it to the handlers
+WebhookRequest = GitHubWebhookRequest | RawWebhookRequest
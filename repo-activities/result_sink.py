@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Literal
+
+import msgpack
+from config import settings
+from marvin.utilities.redis import get_async_redis_client
+from pydantic import BaseModel
+from pydantic_core import from_json
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+ResultEncoding = Literal["json", "json+zlib", "msgpack", "msgpack+zlib"]
+
+
+def dump_result(result: BaseModel, encoding: ResultEncoding) -> bytes:
+    format, _, compression = encoding.partition("+")
+    if format == "msgpack":
+        encoded = msgpack.packb(result.model_dump(mode="json"))
+    else:
+        encoded = result.model_dump_json().encode()
+    return zlib.compress(encoded) if compression else encoded
+
+
+def load_result(value: bytes) -> Any:
+    """Decodes a stored result, whichever encoding it was stored with.
+
+    Results are always objects, so the first byte tells the encodings apart: `{` for
+    JSON, 0x78 for a zlib header, and anything else is a msgpack map.
+    """
+    if value[:1] == b"\x78":
+        value = zlib.decompress(value)
+    return from_json(value) if value[:1] == b"{" else msgpack.unpackb(value)
+
+
+@dataclass
+class Write:
+    key: str
+    value: bytes
+    ttl: int
+    written: asyncio.Future[None]
+
+
+class ResultSink:
+    """Stores handler results in Redis in the configured encoding, each with a TTL.
+
+    Writes from handler runs that happen at about the same time are sent to Redis
+    together, in one pipeline: the first write waits up to `flush_seconds` for others
+    to join it, or until there are `batch_size` of them.  `put` returns once its own
+    write has been executed, and raises if it failed.
+    """
+
+    def __init__(
+        self,
+        encoding: ResultEncoding,
+        ttl: int,
+        ttls_by_event: dict[str, int],
+        batch_size: int,
+        flush_seconds: float,
+        redis: Callable[[], Awaitable[Redis]] = get_async_redis_client,
+    ):
+        self.encoding = encoding
+        self.ttl = ttl
+        self.ttls_by_event = ttls_by_event
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.redis = redis
+
+        # The Redis client and the writes waiting for it belong to an event loop
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: Redis | None = None
+        self._pending: list[Write] = []
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task[None]] = set()
+
+    def key(
+        self, repo: str, event: str, delivery: str, handler: str | None = None
+    ) -> str:
+        key = f"{repo}:{event}:{delivery}"
+        return f"{key}:{handler}" if handler else key
+
+    async def put(
+        self,
+        repo: str,
+        event: str,
+        delivery: str,
+        result: BaseModel,
+        handler: str | None = None,
+    ) -> tuple[str, int]:
+        """Stores the result, returning the key it's stored under and its size.  The
+        handler's name is only part of the key if it's given."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop, self._client = loop, None
+            self._pending, self._flush_timer = [], None
+
+        write = Write(
+            key=self.key(repo, event, delivery, handler),
+            value=dump_result(result, self.encoding),
+            ttl=self.ttls_by_event.get(event, self.ttl),
+            written=loop.create_future(),
+        )
+        self._pending.append(write)
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif not self._flush_timer:
+            self._flush_timer = loop.call_later(self.flush_seconds, self._flush)
+
+        await write.written
+        return write.key, len(write.value)
+
+    def _flush(self) -> None:
+        if self._flush_timer:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            flush = asyncio.create_task(self._write(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: list[Write]) -> None:
+        try:
+            if not self._client:
+                self._client = await self.redis()
+            async with self._client.pipeline(transaction=False) as pipeline:
+                for write in batch:
+                    pipeline.set(write.key, write.value, ex=write.ttl)
+                await pipeline.execute()
+        except Exception as exc:
+            logger.exception("Failed to write %d results to Redis", len(batch))
+            for write in batch:
+                if not write.written.done():
+                    write.written.set_exception(exc)
+        else:
+            for write in batch:
+                if not write.written.done():
+                    write.written.set_result(None)
+
+
+result_sink = ResultSink(
+    encoding=settings.result_encoding,
+    ttl=settings.result_ttl_seconds,
+    ttls_by_event=settings.result_ttl_seconds_by_event,
+    batch_size=settings.result_batch_size,
+    flush_seconds=settings.result_flush_seconds,
+)
@@ -0,0 +1,129 @@
+import re
+from collections import defaultdict
+from fnmatch import translate
+from typing import Any, Awaitable, Callable, TypeVar
+
+from gh_util.types import GitHubWebhookRequest
+
+Handler = Callable[[GitHubWebhookRequest], Awaitable[Any]]
+H = TypeVar("H", bound=Handler)
+
+GLOB_CHARACTERS = re.compile(r"[*?\[]")
+
+
+class Routes:
+    """The handlers registered for one repo pattern, by event type and action, where
+    `None` matches any."""
+
+    def __init__(self) -> None:
+        self.handlers: dict[tuple[str | None, str | None], list[Handler]]
+        self.handlers = defaultdict(list)
+
+    def add(self, handler: Handler, event: str | None, action: str | None) -> None:
+        self.handlers[event, action].append(handler)
+
+    def match(self, event: str, action: str | None) -> list[Handler]:
+        matched = []
+        for key in dict.fromkeys([(event, action), (event, None), (None, None)]):
+            matched.extend(self.handlers.get(key, ()))
+        return matched
+
+
+class HandlerRegistry:
+    """Handlers for webhook events, registered for repos by their full names or by
+    glob patterns of them (like `prefecthq/*`), and optionally for just one type of
+    event, or one action of it.
+
+    Handlers registered for a repo by its name take precedence over those registered
+    for a pattern that matches it, and the default handler is only used if neither
+    match.  Patterns are indexed by whichever of their owner and name parts are
+    literal, so looking up a repo's handlers takes a few dict lookups however many
+    are registered, plus matching the few patterns whose owner is a wildcard too.
+    Repo names, like GitHub's, aren't case-sensitive.
+    """
+
+    def __init__(self, default: Handler):
+        self.default = default
+
+        self._repos: dict[str, Routes] = defaultdict(Routes)
+        # `owner/*`, `*/name`, and other patterns for an owner, like `owner/prefect-*`
+        self._owners: dict[str, Routes] = defaultdict(Routes)
+        self._names: dict[str, Routes] = defaultdict(Routes)
+        self._owner_patterns: dict[str, dict[str, Routes]] = defaultdict(dict)
+        self._patterns: dict[str, Routes] = {}
+        self._compiled: dict[str, re.Pattern[str]] = {}
+
+    def register(
+        self,
+        repo: str,
+        handler: Handler,
+        event: str | None = None,
+        action: str | None = None,
+    ) -> None:
+        self._routes(repo.lower()).add(handler, event, action)
+
+    def handler(
+        self, repo: str, event: str | None = None, action: str | None = None
+    ) -> Callable[[H], H]:
+        """Registers the decorated function as a handler."""
+
+        def register(handler: H) -> H:
+            self.register(repo, handler, event, action)
+            return handler
+
+        return register
+
+    def _routes(self, repo: str) -> Routes:
+        if repo == "*":
+            repo = "*/*"
+        owner, slash, name = repo.partition("/")
+        if not slash or "/" in name:
+            raise ValueError(f"{repo!r} isn't a repo's full name or a pattern of one")
+
+        literal_owner = not GLOB_CHARACTERS.search(owner)
+        literal_name = not GLOB_CHARACTERS.search(name)
+        if literal_owner and literal_name:
+            return self._repos[repo]
+        if literal_owner and name == "*":
+            return self._owners[owner]
+        if owner == "*" and literal_name:
+            return self._names[name]
+
+        if literal_owner:
+            patterns, pattern = self._owner_patterns[owner], name
+        else:
+            patterns, pattern = self._patterns, repo
+        if pattern not in patterns:
+            patterns[pattern] = Routes()
+            self._compiled[pattern] = re.compile(translate(pattern))
+        return patterns[pattern]
+
+    def lookup(self, repo: str, event: str, action: str | None) -> list[Handler]:
+        """The handlers for an event in a repo, in the order they were registered
+        for each pattern, and each only once."""
+        repo = repo.lower()
+        if (routes := self._repos.get(repo)) and (
+            matched := routes.match(event, action)
+        ):
+            return list(dict.fromkeys(matched))
+
+        owner, _, name = repo.partition("/")
+        candidates = [self._owners.get(owner), self._names.get(name)]
+        candidates.extend(
+            routes
+            for pattern, routes in self._owner_patterns.get(owner, {}).items()
+            if self._compiled[pattern].match(name)
+        )
+        candidates.extend(
+            routes
+            for pattern, routes in self._patterns.items()
+            if self._compiled[pattern].match(repo)
+        )
+
+        matched = [
+            handler
+            for routes in candidates
+            if routes
+            for handler in routes.match(event, action)
+        ]
+        return list(dict.fromkeys(matched)) or [self.default]
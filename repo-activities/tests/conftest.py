@@ -0,0 +1,78 @@
+import json
+from typing import Any, Callable
+
+import pytest
+from gh_util.types import GitHubWebhookRequest
+from ingest import RawWebhookRequest
+
+WebhookRequestFactory = Callable[..., GitHubWebhookRequest]
+RawWebhookRequestFactory = Callable[..., RawWebhookRequest]
+
+
+def webhook_headers(event: str, delivery: str) -> dict[str, str]:
+    """The headers GitHub sends with a webhook, as the API receives them."""
+    return {
+        "host": "repo-activities.example.com",
+        "content-type": "application/json",
+        "x-github-event": event,
+        "x-github-delivery": delivery,
+        "x-github-hook-id": "123456",
+    }
+
+
+def webhook_payload(repo: str, action: str | None = None, **fields: Any) -> dict:
+    owner, _, name = repo.partition("/")
+    return {
+        **({"action": action} if action else {}),
+        "repository": {
+            "id": 1,
+            "name": name,
+            "full_name": repo,
+            "url": f"https://api.github.com/repos/{repo}",
+        },
+        "sender": {
+            "id": 2,
+            "login": owner,
+            "url": f"https://api.github.com/users/{owner}",
+            "avatar_url": "https://avatars.githubusercontent.com/u/2",
+        },
+        **fields,
+    }
+
+
+@pytest.fixture
+def webhook_request() -> WebhookRequestFactory:
+    """Makes webhook requests as the API validates them, for `repo`'s `event`s."""
+
+    def make(
+        repo: str = "prefecthq/prefect",
+        event: str = "push",
+        delivery: str = "1",
+        action: str | None = None,
+        **fields: Any,
+    ) -> GitHubWebhookRequest:
+        return GitHubWebhookRequest(
+            headers=webhook_headers(event, delivery),
+            event=webhook_payload(repo, action, **fields),
+        )
+
+    return make
+
+
+@pytest.fixture
+def raw_webhook_request() -> RawWebhookRequestFactory:
+    """Makes webhook requests as the API routes them, before they're validated."""
+
+    def make(
+        repo: str = "prefecthq/prefect",
+        event: str = "push",
+        delivery: str = "1",
+        action: str | None = None,
+        **fields: Any,
+    ) -> RawWebhookRequest:
+        return RawWebhookRequest.from_request(
+            webhook_headers(event, delivery),
+            json.dumps(webhook_payload(repo, action, **fields)).encode(),
+        )
+
+    return make
@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+from conftest import WebhookRequestFactory
+from deliveries import Debouncer, DeliveryDeduplicator
+from fakeredis import FakeAsyncRedis
+from ingest import WebhookRequest
+
+
+def deduplicator(redis: FakeAsyncRedis | None, max_entries: int = 100):
+    async def client() -> FakeAsyncRedis:
+        assert redis
+        return redis
+
+    return DeliveryDeduplicator(
+        max_entries=max_entries, ttl=60, redis=client if redis else None
+    )
+
+
+@pytest.mark.asyncio
+async def test_redeliveries_are_recognized_across_replicas() -> None:
+    redis = FakeAsyncRedis()
+    first, second = deduplicator(redis), deduplicator(redis)
+
+    assert await first.first_delivery("1")
+    assert not await first.first_delivery("1")
+    assert not await second.first_delivery("1")
+    assert await second.first_delivery("2")
+    assert 0 < await redis.ttl("deliveries:1") <= 60
+
+
+@pytest.mark.asyncio
+async def test_recent_deliveries_are_remembered_without_redis() -> None:
+    deliveries = deduplicator(None, max_entries=2)
+
+    assert await deliveries.first_delivery("1")
+    assert await deliveries.first_delivery("2")
+    assert not await deliveries.first_delivery("1")
+
+    # the least recently seen delivery is forgotten first
+    assert await deliveries.first_delivery("3")
+    assert await deliveries.first_delivery("2")
+    assert not await deliveries.first_delivery("3")
+
+
+@pytest.mark.asyncio
+async def test_deliveries_are_checked_in_memory_if_redis_is_down() -> None:
+    async def unreachable() -> FakeAsyncRedis:
+        raise ConnectionError("Redis is down")
+
+    deliveries = DeliveryDeduplicator(max_entries=100, ttl=60, redis=unreachable)
+
+    assert await deliveries.first_delivery("1")
+    assert not await deliveries.first_delivery("1")
+
+
+@pytest.mark.asyncio
+async def test_forgotten_deliveries_are_handled_again() -> None:
+    redis = FakeAsyncRedis()
+    first, second = deduplicator(redis), deduplicator(redis)
+    assert await first.first_delivery("1")
+    assert await first.first_delivery("2")
+
+    first.forget(["1"])
+    await asyncio.gather(*first._forgetting)
+
+    assert await second.first_delivery("1")
+    assert not await second.first_delivery("2")
+    assert not await first.first_delivery("2")
+
+
+def debouncer(
+    submitted: list[list[WebhookRequest]], window: float = 0.05, **kwargs
+) -> Debouncer:
+    kwargs = {"events": ["push"], "max_events": 3, **kwargs}
+    return Debouncer(window=window, submit=submitted.append, **kwargs)
+
+
+def deliveries(submitted: list[list[WebhookRequest]]) -> list[list[str]]:
+    return [[request.headers.delivery for request in burst] for burst in submitted]
+
+
+@pytest.mark.asyncio
+async def test_bursts_are_submitted_after_their_window(
+    webhook_request: WebhookRequestFactory,
+) -> None:
+    submitted: list[list[WebhookRequest]] = []
+    bursts = debouncer(submitted)
+
+    bursts.add(webhook_request("prefecthq/prefect", "push", "1"))
+    bursts.add(webhook_request("prefecthq/marvin", "push", "2"))
+    bursts.add(webhook_request("prefecthq/prefect", "push", "3"))
+    assert not submitted
+
+    await asyncio.sleep(0.1)
+    assert sorted(deliveries(submitted)) == [["1", "3"], ["2"]]
+
+
+@pytest.mark.asyncio
+async def test_other_events_are_submitted_right_away(
+    webhook_request: WebhookRequestFactory,
+) -> None:
+    submitted: list[list[WebhookRequest]] = []
+
+    debouncer(submitted).add(webhook_request(event="issues", action="opened"))
+    debouncer(submitted, window=0).add(webhook_request(event="push", delivery="2"))
+
+    assert deliveries(submitted) == [["1"], ["2"]]
+
+
+@pytest.mark.asyncio
+async def test_full_bursts_are_submitted_right_away(
+    webhook_request: WebhookRequestFactory,
+) -> None:
+    submitted: list[list[WebhookRequest]] = []
+    bursts = debouncer(submitted, window=60)
+
+    for delivery in "1234":
+        bursts.add(webhook_request(delivery=delivery))
+
+    assert deliveries(submitted) == [["1", "2", "3"]]
+
+
+@pytest.mark.asyncio
+async def test_waiting_bursts_are_submitted_on_exit(
+    webhook_request: WebhookRequestFactory,
+) -> None:
+    submitted: list[list[WebhookRequest]] = []
+
+    async with debouncer(submitted, window=60) as bursts:
+        bursts.add(webhook_request(delivery="1"))
+        bursts.add(webhook_request(delivery="2"))
+        assert not submitted
+
+    assert deliveries(submitted) == [["1", "2"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_submissions_are_forgotten(
+    webhook_request: WebhookRequestFactory,
+) -> None:
+    redis = FakeAsyncRedis()
+    received = deduplicator(redis)
+
+    def submit(requests: list[WebhookRequest]) -> None:
+        raise ConnectionError("Prefect is down")
+
+    bursts = Debouncer(
+        window=0.05,
+        events=["push"],
+        max_events=3,
+        submit=submit,
+        on_failure=lambda requests: received.forget(
+            [request.headers.delivery for request in requests]
+        ),
+    )
+    for delivery in "12":
+        assert await received.first_delivery(delivery)
+
+    # events submitted right away fail their requests
+    with pytest.raises(ConnectionError):
+        bursts.add(webhook_request(event="issues", delivery="1"))
+
+    # bursts have no request left to fail
+    bursts.add(webhook_request(event="push", delivery="2"))
+    await asyncio.sleep(0.1)
+    await asyncio.gather(*received._forgetting)
+
+    # so both are handled if GitHub redelivers them
+    assert not await redis.keys()
+    for delivery in "12":
+        assert await received.first_delivery(delivery)
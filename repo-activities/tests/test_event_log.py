@@ -0,0 +1,161 @@
+import gzip
+from pathlib import Path
+
+import event_log
+import pytest
+from conftest import RawWebhookRequestFactory, WebhookRequestFactory
+from event_log import EventLog
+
+
+def log(path: Path, **kwargs) -> EventLog:
+    kwargs = {
+        "queue_size": 100,
+        "batch_size": 100,
+        "segment_bytes": 1024 * 1024,
+        "segment_seconds": 60,
+        "compress": False,
+        **kwargs,
+    }
+    return EventLog(path=path, **kwargs)
+
+
+def deliveries(events: EventLog, repo: str = "prefecthq/prefect") -> list[str]:
+    return [request.headers.delivery for request in events.read(repo)]
+
+
+def segments(events: EventLog, repo: str = "prefecthq/prefect") -> list[Path]:
+    return sorted(events.repo_path(repo).iterdir())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compress", [False, True])
+async def test_events_are_read_back_in_order(
+    tmp_path: Path,
+    webhook_request: WebhookRequestFactory,
+    raw_webhook_request: RawWebhookRequestFactory,
+    compress: bool,
+) -> None:
+    events = log(tmp_path, compress=compress)
+
+    async with events:
+        events.append(webhook_request("prefecthq/prefect", delivery="1"))
+        events.append(raw_webhook_request("prefecthq/marvin", delivery="2"))
+        events.append(raw_webhook_request("prefecthq/prefect", delivery="3"))
+    async with events:
+        events.append(webhook_request("prefecthq/prefect", delivery="4"))
+
+    assert deliveries(events) == ["1", "3", "4"]
+    assert deliveries(events, "prefecthq/marvin") == ["2"]
+    assert deliveries(events, "prefecthq/nothing") == []
+
+    # events are logged in the same shape, however much of them was parsed
+    logged = [request.model_dump() for request in events.read("prefecthq/prefect")]
+    assert logged[0] == webhook_request("prefecthq/prefect", delivery="1").model_dump()
+    assert logged[1] == webhook_request("prefecthq/prefect", delivery="3").model_dump()
+
+
+@pytest.mark.asyncio
+async def test_segments_are_rotated_once_they_are_big_enough(
+    tmp_path: Path, webhook_request: WebhookRequestFactory
+) -> None:
+    events = log(tmp_path, segment_bytes=1)
+
+    async with events:
+        events.append(webhook_request(delivery="1"))
+        events.append(webhook_request(delivery="2"))
+    async with events:
+        events.append(webhook_request(delivery="3"))
+
+    # a batch is never split across segments
+    assert len(segments(events)) == 2
+    assert deliveries(events) == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_segments_are_rotated_once_they_are_old_enough(
+    tmp_path: Path,
+    webhook_request: WebhookRequestFactory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    events = log(tmp_path, segment_seconds=60)
+    now = 1_700_000_000.0
+    monkeypatch.setattr(event_log.time, "time", lambda: now)
+
+    for delivery, elapsed in [("1", 0), ("2", 59), ("3", 60), ("4", 90)]:
+        now = 1_700_000_000.0 + elapsed
+        async with events:
+            events.append(webhook_request(delivery=delivery))
+
+    assert [path.name[:15] for path in segments(events)] == [
+        "20231114T221320",
+        "20231114T221420",
+    ]
+    assert deliveries(events) == ["1", "2", "3", "4"]
+
+
+@pytest.mark.asyncio
+async def test_segments_are_compressed(
+    tmp_path: Path, webhook_request: WebhookRequestFactory
+) -> None:
+    events = log(tmp_path, segment_bytes=1, compress=True)
+
+    async with events:
+        events.append(webhook_request(delivery="1"))
+        events.append(webhook_request(delivery="2"))
+    async with events:
+        events.append(webhook_request(delivery="3"))
+
+    first, second = segments(events)
+    assert first.name.endswith(".ndjson.gz")
+    assert gzip.decompress(first.read_bytes()).count(b"\n") == 2
+    assert gzip.decompress(second.read_bytes()).count(b"\n") == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compress", [False, True])
+async def test_segments_being_written_are_read_up_to_their_last_full_line(
+    tmp_path: Path, webhook_request: WebhookRequestFactory, compress: bool
+) -> None:
+    events = log(tmp_path, compress=compress)
+    async with events:
+        events.append(webhook_request(delivery="1"))
+        events.append(webhook_request(delivery="2"))
+
+    # the next batch is halfway written
+    line = webhook_request(delivery="3").model_dump_json(by_alias=True).encode()
+    data = gzip.compress(line + b"\n") if compress else line + b"\n"
+    with segments(events)[-1].open("ab") as file:
+        file.write(data[: len(data) // 2])
+
+    assert deliveries(events) == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_queued_events_are_written_on_exit(
+    tmp_path: Path, webhook_request: WebhookRequestFactory
+) -> None:
+    events = log(tmp_path, batch_size=2)
+
+    async with events:
+        for delivery in "12345":
+            assert events.append(webhook_request(delivery=delivery))
+
+    assert deliveries(events) == ["1", "2", "3", "4", "5"]
+
+
+@pytest.mark.asyncio
+async def test_events_are_dropped_while_the_queue_is_full(
+    tmp_path: Path, webhook_request: WebhookRequestFactory
+) -> None:
+    events = log(tmp_path, queue_size=2)
+
+    with pytest.raises(RuntimeError):
+        events.append(webhook_request(delivery="0"))
+
+    async with events:
+        assert events.append(webhook_request(delivery="1"))
+        assert events.append(webhook_request(delivery="2"))
+        assert not events.append(webhook_request(delivery="3"))
+
+    assert events.dropped == 1
+    assert deliveries(events) == ["1", "2"]
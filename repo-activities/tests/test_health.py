@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import api
+import health
+import httpx
+import pytest
+from health import HealthMonitor
+
+
+async def ok() -> None:
+    pass
+
+
+async def refused() -> None:
+    raise ConnectionError("connection refused")
+
+
+async def hanging() -> None:
+    await asyncio.sleep(60)
+
+
+def monitor(**checks) -> HealthMonitor:
+    return HealthMonitor(
+        checks=checks,
+        interval=0.01,
+        timeout=0.05,
+        greet=lambda: "all good",
+        greeting_interval=0.01,
+    )
+
+
+@pytest.mark.asyncio
+async def test_ready_once_every_check_passes() -> None:
+    readiness = await monitor(prefect=ok, redis=ok).check()
+
+    assert readiness.ready
+    assert readiness.checks["prefect"].ok
+    assert readiness.checks["redis"].error is None
+
+
+@pytest.mark.asyncio
+async def test_not_ready_while_any_check_fails() -> None:
+    readiness = await monitor(prefect=ok, redis=refused).check()
+
+    assert not readiness.ready
+    assert readiness.checks["prefect"].ok
+    assert readiness.checks["redis"].error == "ConnectionError: connection refused"
+
+
+@pytest.mark.asyncio
+async def test_checks_that_take_too_long_fail() -> None:
+    start = time.perf_counter()
+    readiness = await monitor(prefect=ok, redis=hanging).check()
+
+    assert time.perf_counter() - start < 1
+    assert not readiness.ready
+    assert readiness.checks["redis"].error == "TimeoutError"
+    assert readiness.checks["redis"].latency_ms >= 50
+
+
+@pytest.mark.asyncio
+async def test_not_ready_once_the_checks_have_stopped(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now = 1_700_000_000.0
+    monkeypatch.setattr(health.time, "time", lambda: now)
+    checked = monitor(prefect=ok)
+
+    assert not checked.readiness.ready
+    await checked.check()
+    assert checked.readiness.ready
+
+    now += 0.02
+    assert checked.readiness.ready
+    now += 0.02
+    assert not checked.readiness.ready
+    assert checked.readiness.checked_at == 1_700_000_000.0
+
+
+@pytest.mark.asyncio
+async def test_checks_and_greetings_are_refreshed_in_the_background() -> None:
+    checks = monitor(prefect=ok)
+
+    async with checks:
+        await asyncio.sleep(0.05)
+        assert checks.readiness.ready
+        assert checks.greeting == "all good"
+
+    assert not checks._tasks
+
+
+@pytest.mark.asyncio
+async def test_readiness_probes(monkeypatch: pytest.MonkeyPatch) -> None:
+    checks = monitor(prefect=ok, redis=refused)
+    monkeypatch.setattr(api, "health", checks)
+    transport = httpx.ASGITransport(app=api.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        response = await client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json() == {"ready": False, "checked_at": None, "checks": {}}
+
+        await checks.check()
+        response = await client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["checks"]["redis"]["ok"] is False
+
+        checks.checks["redis"] = ok
+        await checks.check()
+        response = await client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
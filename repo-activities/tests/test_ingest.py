@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from conftest import webhook_headers, webhook_payload
+from gh_util.types import GitHubWebhookRequest
+from ingest import RawWebhookRequest
+from pydantic import ValidationError
+from pydantic_core import from_json
+
+HEADERS = webhook_headers("pull_request", "72d3162e-cc78-11e3-81ab-4c9367dc0958")
+PAYLOAD = webhook_payload(
+    "prefecthq/prefect",
+    "opened",
+    number=1347,
+    pull_request={"title": "Fix the flaky test", "labels": [{"name": "bug"}]},
+)
+BODY = json.dumps(PAYLOAD).encode()
+
+
+def test_routing_fields_match_the_full_parse() -> None:
+    raw = RawWebhookRequest.from_request(HEADERS, BODY)
+    full = GitHubWebhookRequest(headers=HEADERS, event=PAYLOAD)
+
+    assert raw.headers.event == full.headers.event == "pull_request"
+    assert raw.headers.delivery == full.headers.delivery
+    assert raw.event.action == full.event.action == "opened"
+    assert raw.event.repository.full_name == full.event.repository.full_name
+
+
+def test_validating_fully() -> None:
+    raw = RawWebhookRequest.from_request(HEADERS, BODY)
+
+    assert raw.validate_fully().model_dump() == (
+        GitHubWebhookRequest(headers=HEADERS, event=PAYLOAD).model_dump()
+    )
+
+
+def test_payloads_are_only_validated_fully_when_asked() -> None:
+    # a sender missing its required fields doesn't matter for routing
+    payload = {**PAYLOAD, "sender": {"login": "marvin"}}
+    raw = RawWebhookRequest.from_request(HEADERS, json.dumps(payload).encode())
+
+    with pytest.raises(ValidationError):
+        raw.validate_fully()
+
+    # but a missing repo does
+    del payload["repository"]
+    with pytest.raises(ValidationError):
+        RawWebhookRequest.from_request(HEADERS, json.dumps(payload).encode())
+
+
+def test_raw_requests_are_dumped_like_full_ones() -> None:
+    raw = RawWebhookRequest.from_request(HEADERS, BODY)
+    full = GitHubWebhookRequest(headers=HEADERS, event=PAYLOAD)
+
+    dumped = from_json(raw.to_json())
+    expected = full.model_dump(mode="json", by_alias=True, exclude_unset=True)
+    assert dumped.keys() == expected.keys()
+    assert dumped["event"] == expected["event"]
+    # headers are kept as they were received
+    assert dumped["headers"] == HEADERS
+
+    # and read back the same way
+    assert GitHubWebhookRequest.model_validate(dumped).model_dump() == full.model_dump()
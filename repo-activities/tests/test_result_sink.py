@@ -0,0 +1,124 @@
+import asyncio
+import json
+from typing import get_args
+
+import msgpack
+import pytest
+from fakeredis import FakeAsyncRedis
+from pydantic import BaseModel
+from result_sink import ResultEncoding, ResultSink, dump_result, load_result
+
+
+class Result(BaseModel):
+    repo: str
+    commits: list[str]
+    forced: bool = False
+
+
+RESULT = Result(repo="prefecthq/prefect", commits=["abc123", "def456"])
+
+
+class Redis(FakeAsyncRedis):
+    """A fake Redis that counts the pipelines it's sent."""
+
+    pipelines = 0
+
+    def pipeline(self, *args, **kwargs):
+        self.pipelines += 1
+        return super().pipeline(*args, **kwargs)
+
+
+@pytest.fixture
+def redis() -> Redis:
+    return Redis()
+
+
+def sink(redis: Redis, **kwargs) -> ResultSink:
+    async def client() -> Redis:
+        return redis
+
+    kwargs = {
+        "encoding": "json",
+        "ttl": 60,
+        "ttls_by_event": {},
+        "batch_size": 100,
+        "flush_seconds": 0.01,
+        **kwargs,
+    }
+    return ResultSink(redis=client, **kwargs)
+
+
+@pytest.mark.parametrize("encoding", get_args(ResultEncoding))
+def test_results_round_trip(encoding: ResultEncoding) -> None:
+    assert load_result(dump_result(RESULT, encoding)) == RESULT.model_dump(mode="json")
+
+
+def test_encodings_are_told_apart_by_their_first_byte() -> None:
+    assert dump_result(RESULT, "json")[:1] == b"{"
+    assert dump_result(RESULT, "msgpack") == msgpack.packb(RESULT.model_dump())
+    for encoding in ("json+zlib", "msgpack+zlib"):
+        assert dump_result(RESULT, encoding)[:1] == b"\x78"
+
+
+def test_results_stored_as_plain_json_before_encodings_are_read() -> None:
+    legacy = json.dumps({"repo": "prefecthq/prefect", "commits": []}).encode()
+    assert load_result(legacy) == {"repo": "prefecthq/prefect", "commits": []}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", get_args(ResultEncoding))
+async def test_storing_results(redis: Redis, encoding: ResultEncoding) -> None:
+    results = sink(redis, encoding=encoding, ttls_by_event={"push": 30})
+
+    key, size = await results.put("prefecthq/prefect", "push", "1", RESULT)
+    assert key == "prefecthq/prefect:push:1"
+    assert load_result(await redis.get(key)) == RESULT.model_dump(mode="json")
+    assert size == len(await redis.get(key))
+    assert 0 < await redis.ttl(key) <= 30
+
+    key, _ = await results.put("prefecthq/prefect", "issues", "2", RESULT, "triage")
+    assert key == "prefecthq/prefect:issues:2:triage"
+    assert 30 < await redis.ttl(key) <= 60
+
+
+@pytest.mark.asyncio
+async def test_writes_are_batched_until_the_flush_timer(redis: Redis) -> None:
+    results = sink(redis, flush_seconds=0.05)
+
+    await asyncio.gather(
+        *(results.put("prefecthq/prefect", "push", str(i), RESULT) for i in range(5))
+    )
+    assert redis.pipelines == 1
+    assert len(await redis.keys()) == 5
+
+
+@pytest.mark.asyncio
+async def test_full_batches_are_written_right_away(redis: Redis) -> None:
+    results = sink(redis, batch_size=3, flush_seconds=60)
+
+    await asyncio.wait_for(
+        asyncio.gather(
+            *(
+                results.put("prefecthq/prefect", "push", str(i), RESULT)
+                for i in range(6)
+            )
+        ),
+        5,
+    )
+    assert redis.pipelines == 2
+
+    # an incomplete batch waits for the timer
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(
+            results.put("prefecthq/prefect", "push", "7", RESULT), 0.1
+        )
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_raise() -> None:
+    async def unreachable() -> Redis:
+        raise ConnectionError("Redis is down")
+
+    results = ResultSink("json", 60, {}, 100, 0.01, redis=unreachable)
+    with pytest.raises(ConnectionError):
+        await results.put("prefecthq/prefect", "push", "1", RESULT)
@@ -0,0 +1,92 @@
+from functools import partial
+from typing import Any
+
+import pytest
+from routing import HandlerRegistry
+
+
+async def default(request: Any) -> None:
+    pass
+
+
+async def handle(name: str, request: Any) -> None:
+    pass
+
+
+@pytest.fixture
+def registry() -> HandlerRegistry:
+    return HandlerRegistry(default=default)
+
+
+def test_unregistered_repos_get_the_default_handler(registry: HandlerRegistry) -> None:
+    assert registry.lookup("prefecthq/prefect", "push", None) == [default]
+
+
+def test_repos_are_matched_by_name(registry: HandlerRegistry) -> None:
+    prefect = partial(handle, "prefect")
+    registry.register("PrefectHQ/prefect", prefect)
+
+    assert registry.lookup("prefecthq/prefect", "push", None) == [prefect]
+    assert registry.lookup("PREFECTHQ/PREFECT", "issues", "opened") == [prefect]
+    assert registry.lookup("prefecthq/marvin", "push", None) == [default]
+
+
+def test_handlers_are_matched_by_event_and_action(registry: HandlerRegistry) -> None:
+    any_event, pushes, issues, opened = (
+        partial(handle, name) for name in ("any", "pushes", "issues", "opened")
+    )
+    registry.register("prefecthq/prefect", any_event)
+    registry.register("prefecthq/prefect", pushes, event="push")
+    registry.register("prefecthq/prefect", issues, event="issues")
+    registry.register("prefecthq/prefect", opened, event="issues", action="opened")
+
+    lookup = partial(registry.lookup, "prefecthq/prefect")
+    assert lookup("push", None) == [pushes, any_event]
+    assert lookup("issues", "opened") == [opened, issues, any_event]
+    assert lookup("issues", "closed") == [issues, any_event]
+    assert lookup("star", "created") == [any_event]
+
+
+def test_repos_are_matched_by_patterns(registry: HandlerRegistry) -> None:
+    owner, name, prefix, everything, tricky = (
+        partial(handle, pattern)
+        for pattern in ("owner", "name", "prefix", "everything", "tricky")
+    )
+    registry.register("prefecthq/*", owner)
+    registry.register("*/prefect", name)
+    registry.register("prefecthq/prefect-*", prefix)
+    registry.register("*", everything, event="release")
+    registry.register("prefect?q/mar[vw]in", tricky)
+
+    assert registry.lookup("prefecthq/prefect", "push", None) == [owner, name]
+    assert registry.lookup("prefecthq/prefect-aws", "push", None) == [owner, prefix]
+    assert registry.lookup("zzstoatzz/prefect", "push", None) == [name]
+    assert registry.lookup("prefecthq/marvin", "push", None) == [owner, tricky]
+    assert registry.lookup("zzstoatzz/gh", "push", None) == [default]
+    assert registry.lookup("zzstoatzz/gh", "release", "published") == [everything]
+
+
+def test_repo_names_take_precedence_over_patterns(registry: HandlerRegistry) -> None:
+    exact, pattern = partial(handle, "exact"), partial(handle, "pattern")
+    registry.register("prefecthq/prefect", exact, event="push")
+    registry.register("prefecthq/*", pattern)
+
+    assert registry.lookup("prefecthq/prefect", "push", None) == [exact]
+    # patterns are still used for the events that the repo has no handlers for
+    assert registry.lookup("prefecthq/prefect", "issues", "opened") == [pattern]
+
+
+def test_handlers_are_only_returned_once(registry: HandlerRegistry) -> None:
+    @registry.handler("prefecthq/*")
+    @registry.handler("*/prefect")
+    @registry.handler("prefecthq/prefect-*", event="push")
+    async def everywhere(request: Any) -> None:
+        pass
+
+    assert registry.lookup("prefecthq/prefect-aws", "push", None) == [everywhere]
+
+
+@pytest.mark.parametrize("repo", ["prefecthq", "prefecthq/prefect/aws", ""])
+def test_registering_invalid_repos_fails(registry: HandlerRegistry, repo: str) -> None:
+    with pytest.raises(ValueError):
+        registry.register(repo, default)